@@ -0,0 +1,428 @@
+"""
+EduBridge Ingestion and Retrieval Benchmark
+Generates synthetic PDFs (text and image-only pages) and measures each
+ingestion stage and search latency, writing the results as JSON so runs can
+be compared across commits. Runs offline on CPU; if the embedding model is
+not available locally, a hashing embedder is used instead (and reported).
+
+Usage: python benchmark.py [--pdfs 2] [--text-pages 40] [--image-pages 4]
+                           [--corpus-sizes 500,2000] [--queries 100]
+                           [--embeddings auto|model|hashing] [-o results.json]
+"""
+import os
+
+# Offline and CPU-only, before any model library is imported
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+import argparse
+import hashlib
+import json
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.config import Config
+
+ROOT = Path(__file__).parent
+
+VOCABULARY = """
+agent tool memory planner prompt context retrieval embedding vector index
+token model inference latency throughput batch cache schema parser compiler
+graph node edge tree queue stack heap hash table array matrix tensor gradient
+loss optimizer network layer attention transformer encoder decoder dataset
+training evaluation metric precision recall accuracy protocol request response
+server client thread process kernel memory disk network packet router switch
+database query transaction commit rollback replica shard partition lock
+""".split()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process and its finished children, in MB (None if unknown)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(own, children) / scale, 1)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+class SyntheticCorpus:
+    """Deterministic pseudo-technical text"""
+
+    def __init__(self, seed: int):
+        self.random = random.Random(seed)
+
+    def sentence(self) -> str:
+        words = self.random.choices(VOCABULARY, k=self.random.randint(8, 16))
+        return " ".join(words).capitalize() + "."
+
+    def paragraph(self) -> str:
+        return " ".join(self.sentence() for _ in range(self.random.randint(3, 6)))
+
+    def page(self, chars: int = 2500) -> str:
+        paragraphs = []
+        while sum(len(p) for p in paragraphs) < chars:
+            paragraphs.append(self.paragraph())
+        return "\n\n".join(paragraphs)
+
+    def query(self) -> str:
+        return " ".join(self.random.sample(VOCABULARY, self.random.randint(2, 5)))
+
+
+def make_pdf(path: Path, corpus: SyntheticCorpus, text_pages: int, image_pages: int):
+    """Write a PDF with text pages followed by image-only (scanned-looking) pages"""
+    import fitz
+    from PIL import Image, ImageDraw
+
+    document = fitz.open()
+    for _ in range(text_pages):
+        page = document.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 545, 790), corpus.page(), fontsize=9)
+
+    for _ in range(image_pages):
+        image = Image.new("L", (1240, 1754), 255)
+        draw = ImageDraw.Draw(image)
+        y = 80
+        for line in re.findall(r".{1,70}(?:\s|$)", corpus.page(1500)):
+            draw.text((80, y), line.strip(), fill=0)
+            y += 22
+        png = path.with_suffix(".tmp.png")
+        image.save(png)
+        page = document.new_page()
+        page.insert_image(page.rect, filename=str(png))
+        png.unlink()
+
+    document.save(str(path))
+    document.close()
+
+
+class HashingEmbeddings:
+    """Model-free stand-in embedder: hashed bag of words, L2-normalized"""
+
+    def __init__(self, dimensions: int = 384):
+        self.dimensions = dimensions
+
+    def _embed(self, text: str) -> List[float]:
+        import numpy as np
+
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for token in re.findall(r"[a-z0-9]+", text.lower()):
+            vector[zlib.crc32(token.encode()) % self.dimensions] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+class Benchmark:
+    """Runs each stage and collects results"""
+
+    def __init__(self, args, workdir: Path):
+        self.args = args
+        self.workdir = workdir
+        self.corpus = SyntheticCorpus(args.seed)
+        self.results: Dict[str, Dict] = {}
+        self.pdfs: List[Path] = []
+        self.documents = []
+        self.chunks = []
+        self.embedder = None
+        self.embedder_name = None
+
+        # Keep every cache and store the benchmark writes inside workdir
+        Config.OCR_CACHE_PATH = str(workdir / "ocr_cache")
+
+    def stage(self, name: str, function):
+        """Run one stage, recording its result, error and peak RSS"""
+        print(f"[{name}] running...")
+        try:
+            result = function()
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {e}"}
+            print(f"[{name}] FAILED: {result['error']}")
+        result["peak_rss_mb"] = peak_rss_mb()
+        self.results[name] = result
+
+    def generate(self) -> Dict:
+        start = time.perf_counter()
+        for index in range(self.args.pdfs):
+            path = self.workdir / f"synthetic_{index}.pdf"
+            make_pdf(path, self.corpus, self.args.text_pages, self.args.image_pages)
+            self.pdfs.append(path)
+        return {
+            "pdfs": len(self.pdfs),
+            "pages": len(self.pdfs) * (self.args.text_pages + self.args.image_pages),
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+
+    def extraction(self) -> Dict:
+        from src.pdf_extractor import PageExtractor, pages_to_documents
+
+        extractor = PageExtractor(workers=self.args.workers)
+        start = time.perf_counter()
+        pages = 0
+        for pdf_path, extracted, error in extractor.iter_pages(self.pdfs):
+            if error:
+                raise RuntimeError(error)
+            pages += len(extracted)
+            self.documents.extend(pages_to_documents(pdf_path, extracted))
+        seconds = time.perf_counter() - start
+        return {
+            "workers": extractor.workers,
+            "pages": pages,
+            "seconds": round(seconds, 3),
+            "pages_per_sec": round(pages / seconds, 1),
+        }
+
+    def ocr(self) -> Dict:
+        import pytesseract
+        from src.ocr import OCRStage
+
+        if self.args.image_pages == 0:
+            return {"skipped": "no image pages"}
+        try:
+            pytesseract.get_tesseract_version()
+        except Exception:
+            return {"skipped": "Tesseract not installed"}
+
+        stage = OCRStage()
+        first_image_page = self.args.text_pages
+        page_nums = list(range(first_image_page, first_image_page + self.args.image_pages))
+        start = time.perf_counter()
+        pages = 0
+        for pdf_path in self.pdfs:
+            digest = hashlib.sha256(pdf_path.read_bytes()).hexdigest()
+            results, _ = stage.run(pdf_path, digest, page_nums, pytesseract.pytesseract.tesseract_cmd)
+            pages += len(results)
+        seconds = time.perf_counter() - start
+        return {
+            "workers": stage.workers,
+            "dpi": stage.dpi,
+            "pages": pages,
+            "seconds": round(seconds, 3),
+            "pages_per_sec": round(pages / seconds, 2),
+        }
+
+    @staticmethod
+    def _chunk_stats(chunks: List, seconds: float) -> Dict:
+        lengths = [len(chunk.page_content) for chunk in chunks]
+        target = Config.CHUNK_TOKENS * Config.CHARS_PER_TOKEN
+        return {
+            "chunks": len(chunks),
+            "seconds": round(seconds, 3),
+            "chunks_per_sec": round(len(chunks) / seconds, 1),
+            "mean_tokens": round(sum(lengths) / max(1, len(lengths)) / Config.CHARS_PER_TOKEN, 1),
+            "small_chunks": sum(1 for length in lengths if length < target / 4),
+            "cross_page_chunks": sum(
+                1 for chunk in chunks if chunk.metadata.get("page_end", chunk.metadata["page"]) != chunk.metadata["page"]
+            ),
+        }
+
+    def splitting(self) -> Dict:
+        """Chunk the extracted pages with both chunkers; later stages use the configured one"""
+        from src.chunker import PageAwareChunker, PageSplitter, split_documents
+        from src.pdf_processor import PDFProcessor
+
+        splitter = PDFProcessor().text_splitter
+        chunkers = {"recursive": lambda: PageSplitter(splitter), "page_aware": PageAwareChunker}
+        compare = {}
+        for name, factory in chunkers.items():
+            start = time.perf_counter()
+            chunks = split_documents(factory, self.documents)
+            compare[name] = self._chunk_stats(chunks, time.perf_counter() - start)
+            if name == Config.CHUNKER:
+                self.chunks = chunks
+
+        configured = compare[Config.CHUNKER]
+        return {
+            "pages": len(self.documents),
+            "chunker": Config.CHUNKER,
+            "chunks": configured["chunks"],
+            "seconds": configured["seconds"],
+            "chunks_per_sec": configured["chunks_per_sec"],
+            "compare": compare,
+        }
+
+    def _load_embedder(self):
+        if self.args.embeddings in ("auto", "model"):
+            try:
+                from src.pdf_processor import PDFProcessor
+                self.embedder = PDFProcessor().embeddings
+                self.embedder.embed_query("warm up")
+                self.embedder_name = Config.EMBEDDING_MODEL
+                return
+            except Exception as e:
+                if self.args.embeddings == "model":
+                    raise
+                print(f"Warning: Embedding model unavailable offline ({type(e).__name__}), using hashing embeddings")
+        self.embedder = HashingEmbeddings()
+        self.embedder_name = "hashing"
+
+    def embedding(self) -> Dict:
+        load_start = time.perf_counter()
+        self._load_embedder()
+        load_seconds = time.perf_counter() - load_start
+
+        texts = [chunk.page_content for chunk in self.chunks[:self.args.embed_sample]]
+        start = time.perf_counter()
+        self.embedder.embed_documents(texts)
+        seconds = time.perf_counter() - start
+        return {
+            "embedder": self.embedder_name,
+            "load_seconds": round(load_seconds, 3),
+            "texts": len(texts),
+            "seconds": round(seconds, 3),
+            "embeddings_per_sec": round(len(texts) / seconds, 1),
+        }
+
+    def _documents_for(self, chunk_target: int):
+        """Synthetic page documents that split into about chunk_target chunks"""
+        from langchain_core.documents import Document
+
+        per_page = max(1, len(self.chunks) // max(1, len(self.documents)))
+        pages = max(1, chunk_target // per_page)
+        return [
+            Document(page_content=self.corpus.page(), metadata={"source": "corpus.pdf", "page": page + 1})
+            for page in range(pages)
+        ]
+
+    def store_and_search(self, corpus_size: int) -> Dict:
+        from src.ingest_pipeline import IngestPipeline
+        from src.pdf_processor import PDFProcessor
+
+        store_dir = self.workdir / f"store_{corpus_size}"
+        Config.VECTOR_STORE_PATH = str(store_dir)
+        Config.MANIFEST_PATH = str(store_dir / "ingest_manifest.json")
+        Config.LEXICAL_INDEX_PATH = str(store_dir / "lexical_index.json")
+        Config.FLAT_INDEX_PATH = str(store_dir / "flat_index")
+        Config.IVFPQ_INDEX_PATH = str(store_dir / "ivfpq_index")
+
+        processor = PDFProcessor()
+        processor._embeddings = self.embedder
+        documents = self._documents_for(corpus_size)
+
+        start = time.perf_counter()
+        processor._open_vectorstore()
+        chunk_count = IngestPipeline(processor).index_documents(self.pdfs[0], "benchmark", documents)
+        processor._save_indexes()
+        build_seconds = time.perf_counter() - start
+
+        queries = [self.corpus.query() for _ in range(self.args.queries)]
+        processor.search(queries[0])  # first query opens lazily-built structures
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            processor.search(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        return {
+            "chunks": chunk_count,
+            "build_seconds": round(build_seconds, 3),
+            "build_chunks_per_sec": round(chunk_count / build_seconds, 1),
+            "vector_backend": Config.VECTOR_BACKEND,
+            "retrieval_mode": Config.RETRIEVAL_MODE,
+            "queries": len(queries),
+            "search_ms": {
+                "p50": round(percentile(latencies, 0.50), 3),
+                "p95": round(percentile(latencies, 0.95), 3),
+                "p99": round(percentile(latencies, 0.99), 3),
+                "mean": round(sum(latencies) / len(latencies), 3),
+            },
+        }
+
+    def run(self) -> Dict:
+        self.stage("generate", self.generate)
+        self.stage("extraction", self.extraction)
+        self.stage("ocr", self.ocr)
+        self.stage("splitting", self.splitting)
+        self.stage("embedding", self.embedding)
+        if self.embedder is not None:
+            for size in self.args.corpus_sizes:
+                self.stage(f"store_search_{size}", lambda: self.store_and_search(size))
+
+        return {
+            "meta": {
+                "commit": git_commit(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "args": {key: value for key, value in vars(self.args).items() if key != "output"},
+                "config": {
+                    "chunk_size": Config.CHUNK_SIZE,
+                    "chunk_overlap": Config.CHUNK_OVERLAP,
+                    "chunker": Config.CHUNKER,
+                    "chunk_tokens": Config.CHUNK_TOKENS,
+                    "chunk_overlap_tokens": Config.CHUNK_OVERLAP_TOKENS,
+                    "extract_workers": Config.EXTRACT_WORKERS,
+                    "ocr_workers": Config.OCR_WORKERS,
+                    "ocr_dpi": Config.OCR_DPI,
+                    "vector_backend": Config.VECTOR_BACKEND,
+                    "retrieval_mode": Config.RETRIEVAL_MODE,
+                },
+            },
+            "results": self.results,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark EduBridge ingestion and retrieval")
+    parser.add_argument("--pdfs", type=int, default=2, help="Synthetic PDFs to generate")
+    parser.add_argument("--text-pages", type=int, default=40, help="Text pages per PDF")
+    parser.add_argument("--image-pages", type=int, default=4, help="Image-only pages per PDF")
+    parser.add_argument("--workers", type=int, help="Extraction workers (default: EXTRACT_WORKERS)")
+    parser.add_argument("--embed-sample", type=int, default=256, help="Chunks embedded for embeddings/sec")
+    parser.add_argument(
+        "--corpus-sizes", default="500,2000",
+        type=lambda value: [int(size) for size in value.split(",") if size],
+        help="Comma-separated chunk counts for store build and search latency"
+    )
+    parser.add_argument("--queries", type=int, default=100, help="Search queries per corpus size")
+    parser.add_argument("--embeddings", choices=["auto", "model", "hashing"], default="auto",
+                        help="auto = embedding model if available offline, else hashing")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("-o", "--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="edubridge-bench-") as workdir:
+        report = Benchmark(args, Path(workdir)).run()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+        print(f"[OK] Results written to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
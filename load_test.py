@@ -0,0 +1,246 @@
+"""
+EduBridge Load Test
+Drives the full question path (intent, retrieval, prompt, streamed LLM
+generation) of an in-process AITutor at a fixed concurrency or a fixed
+arrival rate, and reports throughput, latency and time-to-first-token
+percentiles. Point OLLAMA_BASE_URL at stub_ollama.py for a fast,
+deterministic backend:
+
+    python stub_ollama.py --latency 0.3 --latency-dist lognormal --token-rate 40 &
+    OLLAMA_BASE_URL=http://localhost:11435 python load_test.py --concurrency 4 --requests 200
+
+Usage: python load_test.py [--concurrency N | --rate R] [--requests N | --duration S]
+                           [--questions file.jsonl] [--load] [--cache] [--extractive]
+                           [-o results.json]
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.config import Config
+
+ERROR_PREFIX = "Error generating response"
+
+DEFAULT_QUESTIONS = [
+    "What is an AI agent?",
+    "How do agents use tools?",
+    "Explain the role of memory in an agent",
+    "What is prompt engineering?",
+    "How does retrieval augmented generation work?",
+    "What are the limitations of large language models?",
+    "Describe the planning step of an agent",
+    "What is the difference between an agent and a chatbot?",
+]
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def summarize(values: List[float]) -> Dict:
+    """Percentiles in milliseconds"""
+    return {
+        name: round(percentile(values, fraction) * 1000, 1) if values else None
+        for name, fraction in (("p50", 0.50), ("p90", 0.90), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))
+    }
+
+
+class LoadGenerator:
+    """Sends questions through AITutor.stream_answer and records timings"""
+
+    def __init__(self, tutor, questions: List[str], seed: int = 7):
+        self.tutor = tutor
+        self.questions = questions
+        self.random = random.Random(seed)
+        self.results: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def _next_question(self) -> str:
+        with self._lock:
+            return self.random.choice(self.questions)
+
+    def _ask(self, question: str, scheduled: float):
+        """
+        Answer one question, timing from its scheduled start
+
+        Timing from the schedule rather than the actual start means time
+        spent waiting for a free worker (open loop) counts as latency.
+        """
+        first_token = None
+        chunks = []
+        for chunk in self.tutor.stream_answer(question):
+            if first_token is None:
+                first_token = time.perf_counter() - scheduled
+            chunks.append(chunk)
+        latency = time.perf_counter() - scheduled
+
+        response = "".join(chunks).strip()
+        # Errors are reported as the last chunk, possibly after partial output
+        if chunks and chunks[-1].startswith(ERROR_PREFIX):
+            outcome = "error"
+            response = chunks[-1]
+        elif response == "Not Found":
+            outcome = "not_found"
+        else:
+            outcome = "answered"
+
+        with self._lock:
+            self.results.append({
+                "outcome": outcome,
+                "latency": latency,
+                "ttft": first_token if first_token is not None else latency,
+                "error": response[:200] if outcome == "error" else None,
+            })
+
+    def run_closed(self, concurrency: int, requests: Optional[int], duration: Optional[float]) -> float:
+        """Keep `concurrency` questions in flight until the request count or duration is reached"""
+        issued = [0]
+        deadline = time.perf_counter() + duration if duration else None
+
+        def worker():
+            while True:
+                with self._lock:
+                    if requests is not None and issued[0] >= requests:
+                        return
+                    issued[0] += 1
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return
+                self._ask(self._next_question(), time.perf_counter())
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start
+
+    def run_open(self, rate: float, requests: Optional[int], duration: Optional[float], max_inflight: int) -> float:
+        """Start questions at Poisson arrivals of `rate` per second, regardless of completions"""
+        start = time.perf_counter()
+        next_arrival = start
+        sent = 0
+        with ThreadPoolExecutor(max_workers=max_inflight) as pool:
+            while True:
+                if requests is not None and sent >= requests:
+                    break
+                if duration is not None and next_arrival - start >= duration:
+                    break
+                delay = next_arrival - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(self._ask, self._next_question(), next_arrival)
+                sent += 1
+                next_arrival += self.random.expovariate(rate)
+        return time.perf_counter() - start
+
+    def report(self, elapsed: float) -> Dict:
+        completed = [r for r in self.results if r["outcome"] != "error"]
+        errors = [r for r in self.results if r["outcome"] == "error"]
+        return {
+            "requests": len(self.results),
+            "answered": sum(1 for r in self.results if r["outcome"] == "answered"),
+            "not_found": sum(1 for r in self.results if r["outcome"] == "not_found"),
+            "errors": len(errors),
+            "error_samples": sorted({r["error"] for r in errors})[:5],
+            "seconds": round(elapsed, 2),
+            "throughput_rps": round(len(completed) / elapsed, 2) if elapsed else None,
+            "latency_ms": summarize([r["latency"] for r in completed]),
+            "ttft_ms": summarize([r["ttft"] for r in completed]),
+        }
+
+
+def read_question_file(path: Path) -> List[str]:
+    from src.batch import read_questions
+    return [item["question"] for item in read_questions(path)]
+
+
+def stub_stats(base_url: str) -> Optional[Dict]:
+    """Counters from stub_ollama.py, if that is what OLLAMA_BASE_URL points at"""
+    import requests
+
+    stats = {}
+    for url in [u.strip().rstrip("/") for u in base_url.split(",") if u.strip()]:
+        try:
+            response = requests.get(f"{url}/stub/stats", timeout=2)
+            if response.status_code == 200:
+                stats[url] = response.json()
+        except requests.RequestException:
+            pass
+    return stats or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the EduBridge question path")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("-c", "--concurrency", type=int, default=4, help="Questions in flight (closed loop)")
+    load.add_argument("-r", "--rate", type=float, help="Questions started per second (open loop)")
+    parser.add_argument("-n", "--requests", type=int, help="Total questions (default 100 unless --duration)")
+    parser.add_argument("-d", "--duration", type=float, help="Seconds to run")
+    parser.add_argument("--max-inflight", type=int, default=64, help="Open loop: maximum concurrent questions")
+    parser.add_argument("-q", "--questions", type=Path, help="JSONL/CSV question file (default: built-in list)")
+    parser.add_argument("--load", action="store_true", help="Load all PDFs from src/syllabus first")
+    parser.add_argument("--cache", action="store_true", help="Keep the semantic answer cache enabled")
+    parser.add_argument("--extractive", action="store_true", help="Keep extractive (no-LLM) answers enabled")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("-o", "--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    if args.requests is None and args.duration is None:
+        args.requests = 100
+    if not args.cache:
+        # Repeated questions would otherwise be served from the cache
+        Config.ANSWER_CACHE_ENABLED = False
+    if not args.extractive:
+        # Conceptual questions would otherwise be answered without calling the LLM
+        Config.EXTRACTIVE_ANSWERS = False
+
+    from src.ai_tutor import AITutor
+
+    Config.validate()
+    tutor = AITutor()
+    if args.load:
+        success, _ = tutor.load_all_pdfs()
+        if not success:
+            raise SystemExit("[FAILED] Could not load PDFs from src/syllabus")
+    elif not tutor.restore_knowledge_base():
+        raise SystemExit("[FAILED] No knowledge base - run with --load or load PDFs in the CLI first")
+
+    print(f"Warming up against {Config.OLLAMA_BASE_URL}...")
+    tutor.pdf_processor.prewarm()
+    tutor.llm.warm_up()
+
+    questions = read_question_file(args.questions) if args.questions else DEFAULT_QUESTIONS
+    generator = LoadGenerator(tutor, questions, args.seed)
+    if args.rate:
+        print(f"Open loop: {args.rate}/s, up to {args.max_inflight} in flight")
+        elapsed = generator.run_open(args.rate, args.requests, args.duration, args.max_inflight)
+        mode = {"mode": "open", "rate": args.rate, "max_inflight": args.max_inflight}
+    else:
+        print(f"Closed loop: {args.concurrency} in flight")
+        elapsed = generator.run_closed(args.concurrency, args.requests, args.duration)
+        mode = {"mode": "closed", "concurrency": args.concurrency}
+
+    report = dict(mode, **generator.report(elapsed))
+    # Answered from a retrieved sentence without the LLM (only with --extractive)
+    report["extractive"] = tutor.usage["extractive"]
+    report["ollama"] = {"base_url": Config.OLLAMA_BASE_URL, "stub": stub_stats(Config.OLLAMA_BASE_URL)}
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+        print(f"[OK] Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
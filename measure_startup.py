@@ -0,0 +1,101 @@
+"""
+EduBridge Startup Time Check
+Measures how long it takes to import the CLI and verifies that heavy
+dependencies are not imported until they are actually needed.
+
+Usage: python measure_startup.py [--budget-ms 500] [--top 10]
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+# Modules that must only be imported on first load/question
+HEAVY_MODULES = [
+    "fitz",
+    "pytesseract",
+    "PIL",
+    "numpy",
+    "torch",
+    "sentence_transformers",
+    "chromadb",
+    "langchain_community",
+    "langchain_ollama",
+    "langchain_text_splitters",
+]
+
+ROOT = Path(__file__).parent
+
+
+def measure_import_time(module: str):
+    """
+    Import a module in a fresh interpreter with -X importtime
+
+    Returns:
+        Tuple of (total microseconds, [(cumulative us, module name), ...])
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        raise SystemExit(f"[FAIL] Could not import {module}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((int(cumulative_us), name.rstrip()))
+
+    # Top-level imports are indented by a single space; nested ones by more
+    total = sum(cumulative for cumulative, name in entries if not name.startswith("  "))
+    return total, entries
+
+
+def find_heavy_imports(module: str):
+    """List heavy modules that get imported as a side effect of importing module"""
+    code = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    return [m for m in result.stdout.strip().split(",") if m]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure EduBridge CLI import time")
+    parser.add_argument("--module", default="src.cli", help="Module to import (default: src.cli)")
+    parser.add_argument("--budget-ms", type=float, default=500.0, help="Maximum allowed import time")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to list")
+    args = parser.parse_args()
+
+    total_us, entries = measure_import_time(args.module)
+    print(f"Import time for {args.module}: {total_us / 1000:.1f} ms")
+
+    print(f"\nSlowest {args.top} imports (cumulative):")
+    for cumulative, name in sorted(entries, reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name.strip()}")
+
+    ok = True
+    heavy = find_heavy_imports(args.module)
+    if heavy:
+        print(f"\n[FAIL] Heavy modules imported at startup: {', '.join(heavy)}")
+        ok = False
+    else:
+        print("\n[OK] No heavy modules imported at startup")
+
+    if total_us / 1000 > args.budget_ms:
+        print(f"[FAIL] Import time exceeds budget of {args.budget_ms:.0f} ms")
+        ok = False
+    else:
+        print(f"[OK] Import time within budget of {args.budget_ms:.0f} ms")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
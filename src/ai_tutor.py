@@ -1,18 +1,71 @@
 """
 AI Tutor Engine - Core RAG and Response Generation
 """
-from typing import Optional, Dict, Tuple
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, Iterator, List, Tuple
 from pathlib import Path
-from langchain_ollama import OllamaLLM
-from langchain_core.prompts import PromptTemplate
 from .config import Config
 from .pdf_processor import PDFProcessor
 from .intent_detector import IntentDetector, IntentType
+from .context_packer import ContextPacker, estimate_tokens, page_label
+from .telemetry import telemetry
+
+
+class QuestionPlan:
+    """State of one question as it moves through the answering stages"""
+    
+    def __init__(self, question: str):
+        self.question = question
+        self.query = question
+        self.intent = None
+        self.intent_plan = None  # Retrieval depth, context budget and model for the intent
+        self.model = None  # Model generating the answer
+        self.escalated = False  # True if the fast model's answer was retried on the larger model
+        self.extractive = False  # True if the response was taken from the context without the LLM
+        self.embedding = None
+        self.docs = []  # (document, retrieval score) pairs used as context
+        self.prompt = None  # Set when the LLM has to be called
+        self.response = None  # Final response (set early when no LLM call is needed)
+        self.cache_key = None
+        self.cache_hit = False
+        self.context_tokens = 0  # Estimated tokens of packed context
+        self.prompt_tokens = 0  # Prompt tokens as counted by Ollama (estimated until generated)
+        self.timings = {}  # stage -> seconds
+    
+    @contextmanager
+    def timed(self, stage: str):
+        """Record the wall-clock time spent in a stage (also as a question.<stage> span)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[stage] = self.timings.get(stage, 0.0) + elapsed
+            telemetry.record(f"question.{stage}", elapsed)
+    
+    def dense_relevance(self) -> float:
+        """Best cosine similarity of the context chunks to the question (0 for keyword-only hits)"""
+        return max((doc.metadata.get("dense_score", 0.0) for doc, _ in self.docs), default=0.0)
+
+    def sources(self) -> List[Dict]:
+        """Source PDF and page (first and last, for chunks spanning pages) of every context chunk"""
+        return [
+            {
+                "source": doc.metadata.get("source"),
+                "page": doc.metadata.get("page"),
+                "page_end": doc.metadata.get("page_end", doc.metadata.get("page")),
+            }
+            for doc, _ in self.docs
+        ]
 
 
 class AITutor:
     """Core AI tutor with RAG capabilities"""
     
+    # Static instructions first so every prompt shares the same prefix,
+    # which Ollama can keep in its KV cache between questions
     SYSTEM_PROMPT = """You are EduBridge AI Tutor - a friendly, helpful mentor who explains things clearly and concisely.
 
 TEACHING STYLE:
@@ -28,34 +81,126 @@ CRITICAL RULES:
 3. Never make up facts - stay truthful to the PDF content
 4. Keep it SHORT and SIMPLE - students want quick, clear answers
 
-Context from the study materials:
-{context}
-
-Student's Question: {question}
-
 Respond in this format (keep it concise!):
 
 Answer: [1-3 sentences max - clear and friendly explanation]
 
 Explanation: [2-4 sentences - break it down simply, explain why it matters]
 
-Source: [PDF name, Page number - e.g., "22-promptengg.pdf, Page 5"]
+Do not list sources - they are added automatically.
 
 Remember: Be friendly but BRIEF. Quality over quantity!
+
+"""
+    
+    # Per-question part of the prompt, appended after SYSTEM_PROMPT
+    QUESTION_PROMPT = """Context from the study materials:
+{context}
+
+Student's Question: {question}
 """
     
+    # Generation stops if the model starts writing its own citations or a new turn
+    STOP_SEQUENCES = ["\nSource:", "\nSources:", "\nStudent's Question:"]
+    
+    # Responses treated as "the answer is not in the PDFs"
+    NOT_FOUND_RESPONSES = ["not found", "unknown", ""]
+    
     def __init__(self):
-        self.llm = OllamaLLM(
-            base_url=Config.OLLAMA_BASE_URL,
-            model=Config.OLLAMA_MODEL,
-            temperature=Config.TEMPERATURE
-        )
         self.pdf_processor = PDFProcessor()
         self.intent_detector = IntentDetector()
-        self.prompt_template = PromptTemplate(
-            template=self.SYSTEM_PROMPT,
-            input_variables=["context", "question"]
-        )
+        self.context_packer = ContextPacker()
+        self.last_plan = None  # Plan of the most recent answer_question / stream_answer call
+        self.document_filter = None  # Source names set by the 'focus' command; None routes automatically
+        
+        # The LLM client, prompt template and answer cache pull in heavy
+        # dependencies, so they are built on first use (or by prewarm)
+        self._llm = None
+        self._prompt_template = None
+        self._answer_cache = None
+        self._extractive = None
+        self._init_lock = threading.Lock()
+        # Questions planned, answers started on FAST_MODEL and retried, and answered extractively
+        self.usage = {"questions": 0, "fast": 0, "escalated": 0, "extractive": 0}
+        self._usage_lock = threading.Lock()
+    
+    @property
+    def llm(self):
+        """Ollama LLM client, created on first use"""
+        if self._llm is None:
+            with self._init_lock:
+                if self._llm is None:
+                    from .ollama_client import OllamaClient
+                    self._llm = OllamaClient()
+        return self._llm
+    
+    @property
+    def prompt_template(self):
+        """Prompt template, created on first use"""
+        if self._prompt_template is None:
+            from langchain_core.prompts import PromptTemplate
+            self._prompt_template = PromptTemplate(
+                template=self.SYSTEM_PROMPT + self.QUESTION_PROMPT,
+                input_variables=["context", "question"]
+            )
+        return self._prompt_template
+    
+    @property
+    def answer_cache(self):
+        """Semantic answer cache, or None if disabled; loaded on first use"""
+        if self._answer_cache is None and Config.ANSWER_CACHE_ENABLED:
+            with self._init_lock:
+                if self._answer_cache is None:
+                    from .answer_cache import SemanticAnswerCache
+                    self._answer_cache = SemanticAnswerCache()
+        return self._answer_cache
+    
+    @property
+    def extractive(self):
+        """Extractive answerer sharing the chunk embedding model, created on first use"""
+        if self._extractive is None:
+            with self._init_lock:
+                if self._extractive is None:
+                    from .extractive import ExtractiveAnswerer
+                    self._extractive = ExtractiveAnswerer(self.pdf_processor.embed_queries)
+        return self._extractive
+    
+    def _count(self, key: str):
+        with self._usage_lock:
+            self.usage[key] += 1
+    
+    def prewarm(self) -> threading.Thread:
+        """
+        Build the embedding model, LLM client and answer cache in a background thread
+        
+        Also asks Ollama to load the model, in a second thread so the
+        model load overlaps loading the embedding model.
+        
+        Returns:
+            The started daemon thread
+        """
+        def warm():
+            try:
+                threading.Thread(target=self.llm.warm_up, name="edubridge-llm-warmup", daemon=True).start()
+                if Config.FAST_MODEL:
+                    threading.Thread(
+                        target=self.llm.warm_up, args=(Config.FAST_MODEL,), name="edubridge-fast-warmup", daemon=True
+                    ).start()
+                self.pdf_processor.prewarm()
+                self.llm
+                self.prompt_template
+                self.answer_cache
+            except Exception:
+                # Anything that fails here fails again, with a message, on first use
+                pass
+        
+        thread = threading.Thread(target=warm, name="edubridge-prewarm", daemon=True)
+        thread.start()
+        return thread
+    
+    def restore_knowledge_base(self) -> bool:
+        """Reuse the knowledge base persisted by a previous session, if valid"""
+        return self.pdf_processor.warm_start()
     
     def load_pdf(self, pdf_path: str) -> bool:
         """Load a PDF for tutoring"""
@@ -93,62 +238,334 @@ Remember: Be friendly but BRIEF. Quality over quantity!
         else:
             return False, 0
     
-    def answer_question(self, question: str) -> str:
+    def _cache_fingerprint(self) -> str:
+        """Identity of the corpus and of every answer path (models, extractive) cached answers depend on"""
+        focus = ",".join(self.document_filter) if self.document_filter is not None else "*"
+        extractive = f"extractive@{Config.EXTRACTIVE_MIN_SCORE}" if Config.EXTRACTIVE_ANSWERS else "llm"
+        models = f"{Config.OLLAMA_MODEL}+{Config.FAST_MODEL or '-'}"
+        return f"{self.pdf_processor.corpus_fingerprint()}:{models}:{extractive}:{focus}"
+    
+    def plan_question(self, question: str, embedding: List[float] = None) -> QuestionPlan:
         """
-        Answer a question using RAG
+        Run every stage before generation: intent, embedding, cache, retrieval, prompt
         
         Args:
             question: User's question
+            embedding: Precomputed query embedding (e.g. from a batch), if any
             
         Returns:
-            Formatted answer or "Not Found"
+            QuestionPlan with either a prompt for the LLM or a final response
         """
+        plan = QuestionPlan(question)
+        
         # Check if PDF is loaded
         if not self.pdf_processor.is_loaded():
-            return "Need to validate: No PDF loaded. Use 'load <pdf_path>' command first."
+            plan.response = "Need to validate: No PDF loaded. Use 'load <pdf_path>' command first."
+            return plan
+        self._count("questions")
         
-        # Detect intent
-        intent, processed_query = self.intent_detector.detect(question)
+        # Detect intent; it decides how deep to search, the context budget and the model
+        with plan.timed("intent"):
+            plan.intent, plan.query = self.intent_detector.detect(question)
+            plan.intent_plan = self.intent_detector.plan(plan.intent, plan.query)
         
-        # Search for relevant context
-        relevant_docs = self.pdf_processor.search(processed_query)
+        # Embed once for both the answer cache and the vector search
+        with plan.timed("embed"):
+            plan.embedding = embedding if embedding is not None else self.pdf_processor.embed_query(plan.query)
         
-        if not relevant_docs:
-            return "Not Found"
+        if self.answer_cache is not None:
+            with plan.timed("cache"):
+                plan.cache_key = (plan.query, plan.embedding, self._cache_fingerprint())
+                cached = self.answer_cache.lookup(plan.embedding, plan.cache_key[2])
+            if cached is not None:
+                plan.response = cached
+                plan.cache_key = None
+                plan.cache_hit = True
+                return plan
         
-        # Build context from retrieved documents
-        context_parts = []
-        for doc in relevant_docs:
-            page = doc.metadata.get('page', 'Unknown')
-            source = doc.metadata.get('source', 'Unknown PDF')
-            content = doc.page_content.strip()
-            context_parts.append(f"[Source: {source}, Page {page}]\n{content}")
+        # Search for relevant context; nothing relevant means no LLM call at all
+        with plan.timed("retrieve"):
+            plan.docs = self.pdf_processor.search_with_scores(
+                plan.query, k=plan.intent_plan.top_k, embedding=plan.embedding, sources=self.document_filter
+            )
         
-        context = "\n\n".join(context_parts)
+        if not plan.docs:
+            plan.response = "Not Found"
+            plan.cache_key = None
+            return plan
         
-        # Generate response
-        try:
-            prompt = self.prompt_template.format(
+        if plan.intent_plan.extractive:
+            # A sentence of the context that answers the question outright needs no LLM
+            with plan.timed("extract"):
+                extracted = self.extractive.answer(plan.embedding, plan.docs)
+            if extracted is not None:
+                plan.docs = [(extracted.doc, extracted.relevance)]
+                plan.response = extracted.render() + self._citation(plan)
+                plan.extractive = True
+                self._count("extractive")
+                self._remember(plan.cache_key, plan.response)
+                plan.cache_key = None
+                return plan
+        
+        plan.model = plan.intent_plan.model
+        if plan.intent_plan.fallback_model and plan.dense_relevance() < Config.FAST_MODEL_MIN_RELEVANCE:
+            # Weakly matching context needs the larger model from the start; keyword
+            # matches alone say nothing about how well the context answers the question
+            plan.model = plan.intent_plan.fallback_model
+        
+        with plan.timed("prompt"):
+            # Merge overlapping chunks and fit the best of them into the token budget
+            context, plan.context_tokens, blocks = self.context_packer.pack(plan.docs, plan.intent_plan.context_budget)
+            plan.docs = [pair for block in blocks for pair in block.docs]
+            
+            plan.prompt = self.prompt_template.format(
                 context=context,
-                question=processed_query
+                question=plan.query
             )
+            plan.prompt_tokens = estimate_tokens(plan.prompt)
+        return plan
+    
+    def _count_prompt_tokens(self, plan: QuestionPlan):
+        """Replace the prompt token estimate with Ollama's count, if it reported one"""
+        counted = self.llm.last_stats.get("prompt_eval_count")
+        if counted:
+            plan.prompt_tokens = counted
+    
+    def generate(self, plan: QuestionPlan) -> str:
+        """
+        Produce the final response for a planned question, calling the LLM if needed
+        
+        If the plan's fast model answers "Not Found", the question is asked
+        again on the larger model.
+        
+        Args:
+            plan: Result of plan_question
             
-            response = self.llm.invoke(prompt)
-            
-            # Validate response
-            if not response or response.strip().lower() in ["not found", "unknown", ""]:
-                return "Not Found"
+        Returns:
+            Formatted answer or "Not Found"
+        """
+        if plan.prompt is None:
+            return plan.response
+        
+        self._count_model(plan)
+        with plan.timed("generate"):
+            response = self.llm.invoke(plan.prompt, model=plan.model, stop=self.STOP_SEQUENCES)
+        self._count_prompt_tokens(plan)
+        
+        # Validate response
+        plan.response = self._normalize_response(response)
+        if plan.response == "Not Found" and self._escalate(plan):
+            with plan.timed("escalate"):
+                response = self.llm.invoke(plan.prompt, model=plan.model, stop=self.STOP_SEQUENCES)
+            self._count_prompt_tokens(plan)
+            plan.response = self._normalize_response(response)
+        plan.response = self._with_citation(plan, plan.response)
+        self._remember(plan.cache_key, plan.response)
+        return plan.response
+    
+    def _count_model(self, plan: QuestionPlan):
+        """Count answers started on the fast model"""
+        if plan.intent_plan is not None and plan.intent_plan.fallback_model and plan.model != plan.intent_plan.fallback_model:
+            self._count("fast")
+    
+    def _escalate(self, plan: QuestionPlan) -> bool:
+        """
+        Switch a plan whose fast-model answer was "Not Found" to the larger model
+        
+        Returns:
+            bool: True if the plan should be generated again
+        """
+        fallback = plan.intent_plan.fallback_model if plan.intent_plan is not None else None
+        if not fallback or plan.model == fallback:
+            return False
+        plan.model = fallback
+        plan.escalated = True
+        self._count("escalated")
+        return True
+    
+    def _citation(self, plan: QuestionPlan) -> str:
+        """Source section built from the metadata of the context actually sent"""
+        pages = []
+        for source in plan.sources():
+            page = (source["source"], source["page"], source["page_end"])
+            if page not in pages:
+                pages.append(page)
+        return "\n\nSource: " + "; ".join(f"{name}, {page_label(first, last)}" for name, first, last in pages)
+    
+    def _with_citation(self, plan: QuestionPlan, response: str) -> str:
+        """Append the Source section to a normalized response, unless it is Not Found"""
+        if response == "Not Found":
+            return response
+        return response + self._citation(plan)
+    
+    def _remember(self, cache_key: Optional[Tuple], response: str):
+        """
+        Store a generated response in the answer cache
+        
+        "Not Found" is not stored, so a question the LLM could not answer
+        once is asked again instead of staying stuck at Not Found.
+        """
+        if cache_key is not None and response != "Not Found":
+            question, embedding, fingerprint = cache_key
+            self.answer_cache.store(question, embedding, response, fingerprint)
+    
+    def _normalize_response(self, response: str) -> str:
+        """Collapse empty or "not found"-style responses to Not Found"""
+        if not response or response.strip().lower() in self.NOT_FOUND_RESPONSES:
+            return "Not Found"
+        return response.strip()
+    
+    def _may_be_not_found(self, partial: str) -> bool:
+        """Check whether a partial response could still become a "not found" response"""
+        partial = partial.strip().lower()
+        return any(sentinel.startswith(partial) for sentinel in self.NOT_FOUND_RESPONSES)
+    
+    def answer_question(self, question: str) -> str:
+        """
+        Answer a question using RAG
+        
+        Args:
+            question: User's question
             
-            return response.strip()
+        Returns:
+            Formatted answer or "Not Found"
+        """
+        # Generate response
+        try:
+            with telemetry.span("question.total"):
+                self.last_plan = self.plan_question(question)
+                return self.generate(self.last_plan)
             
         except Exception as e:
             return f"Error generating response: {str(e)}"
     
+    def stream_answer(self, question: str) -> Iterator[str]:
+        """
+        Answer a question using RAG, yielding text chunks as the LLM generates them
+        
+        Output is held back only while it could still turn out to be a
+        "not found" response, so the streamed text always matches what
+        answer_question would return. A "not found" answer from the fast
+        model is therefore retried on the larger model before anything is shown.
+        
+        Args:
+            question: User's question
+            
+        Returns:
+            Iterator of response text chunks
+        """
+        try:
+            with telemetry.span("question.total"):
+                plan = self.last_plan = self.plan_question(question)
+                if plan.prompt is None:
+                    yield plan.response
+                    return
+                
+                self._count_model(plan)
+                generate_start = time.perf_counter()
+                first_token = None
+                while True:
+                    pending = ""
+                    streamed = []
+                    attempt_start = time.perf_counter()
+                    for chunk in self.llm.stream(plan.prompt, model=plan.model, stop=self.STOP_SEQUENCES):
+                        if first_token is None:
+                            first_token = time.perf_counter() - generate_start
+                            telemetry.record("question.first_token", first_token)
+                        if pending is None:
+                            streamed.append(chunk)
+                            yield chunk
+                            continue
+                        pending += chunk
+                        if not self._may_be_not_found(pending):
+                            streamed.append(pending.lstrip())
+                            yield streamed[-1]
+                            pending = None
+                    
+                    stage = "escalate" if plan.escalated else "generate"
+                    plan.timings[stage] = time.perf_counter() - attempt_start
+                    telemetry.record(f"question.{stage}", plan.timings[stage])
+                    # Nothing has been shown yet if the answer was "Not Found", so retrying is invisible
+                    if pending is None or self._normalize_response(pending) != "Not Found" or not self._escalate(plan):
+                        break
+                
+                if pending is not None:
+                    # The whole response was short enough to still look like "not found"
+                    response = self._with_citation(plan, self._normalize_response(pending))
+                    yield response
+                else:
+                    citation = self._citation(plan)
+                    yield citation
+                    response = "".join(streamed).strip() + citation
+                self._count_prompt_tokens(plan)
+                self._remember(plan.cache_key, response)
+                
+        except Exception as e:
+            yield f"Error generating response: {str(e)}"
+    
     def get_status(self) -> Dict[str, str]:
         """Get current system status"""
         return {
             "PDF Loaded": self.pdf_processor.get_current_pdf(),
-            "Model": Config.OLLAMA_MODEL,
+            "Model": self._model_status(),
             "Ollama URL": Config.OLLAMA_BASE_URL,
-            "Status": "Ready" if self.pdf_processor.is_loaded() else "No PDF loaded"
+            "Vector Store": Config.VECTOR_BACKEND,
+            "Focus": ", ".join(self.document_filter) if self.document_filter is not None else self._routing_status(),
+            "Status": "Ready" if self.pdf_processor.is_loaded() else "No PDF loaded",
+            "Answer Cache": self._cache_status(),
+            "Fast Path": self._fast_path_status(),
+            "LLM Latency": self._llm.latency_summary() if self._llm is not None else "No requests yet",
+            "Ollama Nodes": self._llm.nodes_summary() if self._llm is not None else "Not connected yet"
         }
+    
+    def _model_status(self) -> str:
+        """Generation model, plus fast-model usage when one is configured"""
+        if not Config.FAST_MODEL:
+            return Config.OLLAMA_MODEL
+        return (
+            f"{Config.OLLAMA_MODEL} (fast: {Config.FAST_MODEL}, {self.usage['fast']} answers, "
+            f"{self.usage['escalated']} escalated)"
+        )
+    
+    def _fast_path_status(self) -> str:
+        """Share of questions answered extractively, without an LLM call"""
+        if not Config.EXTRACTIVE_ANSWERS:
+            return "Disabled"
+        questions = self.usage["questions"]
+        if not questions:
+            return "No questions yet"
+        extractive = self.usage["extractive"]
+        return f"{extractive}/{questions} questions answered without the LLM ({extractive / questions:.0%})"
+    
+    def _routing_status(self) -> str:
+        """Describe automatic document routing"""
+        if Config.ROUTE_TOP_DOCS <= 0:
+            return "All documents"
+        return f"Auto (top {Config.ROUTE_TOP_DOCS} documents)"
+    
+    def focus(self, patterns: List[str]) -> List[str]:
+        """
+        Restrict answers to the documents matching the given names
+        
+        Args:
+            patterns: Case-insensitive parts of document file names; empty clears the focus
+            
+        Returns:
+            Matching document names (the focus is left unchanged when none match)
+        """
+        if not patterns:
+            self.document_filter = None
+            return []
+        names = self.pdf_processor.router.match(patterns)
+        if names:
+            self.document_filter = names
+        return names
+    
+    def _cache_status(self) -> str:
+        """Summarize answer cache effectiveness"""
+        if not Config.ANSWER_CACHE_ENABLED:
+            return "Disabled"
+        cache = self._answer_cache
+        if cache is None:
+            return "Not loaded yet"
+        return f"{cache.hits}/{cache.lookups} hits, {len(cache)} entries"
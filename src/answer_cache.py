@@ -0,0 +1,159 @@
+"""
+Semantic Answer Cache - reuse answers for questions asked in different words
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+
+from .config import Config
+
+
+class SemanticAnswerCache:
+    """
+    LRU/TTL cache of answers keyed by question embedding.
+
+    A lookup matches when the cosine similarity between the incoming question
+    and a previously answered one reaches `threshold`. Every entry belongs to
+    a fingerprint of the loaded corpus and answering models; when the fingerprint
+    changes the whole cache is dropped, since the old answers may no longer
+    hold.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        threshold: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None
+    ):
+        self.path = Path(path) if path else (Path(Config.ANSWER_CACHE_PATH) if Config.ANSWER_CACHE_PATH else None)
+        self.threshold = threshold if threshold is not None else Config.ANSWER_CACHE_THRESHOLD
+        self.max_entries = max_entries or Config.ANSWER_CACHE_MAX_ENTRIES
+        self.ttl = ttl if ttl is not None else Config.ANSWER_CACHE_TTL
+
+        self.fingerprint = None
+        self.entries = OrderedDict()  # id -> {question, answer, created}
+        self.hits = 0
+        self.lookups = 0
+
+        self._vectors = {}  # id -> normalized embedding
+        self._matrix = None
+        self._matrix_ids = []
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _load(self):
+        """Read persisted entries, ignoring a missing or corrupt file"""
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.fingerprint = data.get("fingerprint")
+            for entry in data.get("entries", []):
+                self._add(entry["question"], entry["embedding"], entry["answer"], entry["created"])
+        except (OSError, ValueError, KeyError):
+            self._clear()
+
+    def _save(self):
+        """Persist entries if a cache file is configured"""
+        if not self.path:
+            return
+        entries = [
+            {
+                "question": entry["question"],
+                "answer": entry["answer"],
+                "created": entry["created"],
+                "embedding": [round(float(x), 6) for x in self._vectors[entry_id]],
+            }
+            for entry_id, entry in self.entries.items()
+        ]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": self.fingerprint, "entries": entries}, f)
+        tmp_path.replace(self.path)
+
+    def _clear(self):
+        self.entries.clear()
+        self._vectors.clear()
+        self._matrix = None
+
+    def _add(self, question: str, embedding: List[float], answer: str, created: float):
+        entry_id = self._next_id
+        self._next_id += 1
+        self.entries[entry_id] = {"question": question, "answer": answer, "created": created}
+        self._vectors[entry_id] = self._normalize(embedding)
+        self._matrix = None
+
+        while len(self.entries) > self.max_entries:
+            oldest, _ = self.entries.popitem(last=False)
+            del self._vectors[oldest]
+
+    def _evict_expired(self, now: float) -> bool:
+        expired = [i for i, entry in self.entries.items() if now - entry["created"] > self.ttl]
+        for entry_id in expired:
+            del self.entries[entry_id]
+            del self._vectors[entry_id]
+        if expired:
+            self._matrix = None
+        return bool(expired)
+
+    def _check_fingerprint(self, fingerprint: str):
+        """Drop every entry if the corpus or model changed"""
+        if fingerprint != self.fingerprint:
+            self._clear()
+            self.fingerprint = fingerprint
+
+    def lookup(self, embedding: List[float], fingerprint: str) -> Optional[str]:
+        """
+        Find a cached answer for a semantically equivalent question
+
+        Args:
+            embedding: Query embedding of the incoming question
+            fingerprint: Current corpus/model fingerprint
+
+        Returns:
+            Cached answer, or None on a miss
+        """
+        with self._lock:
+            self.lookups += 1
+            self._check_fingerprint(fingerprint)
+            self._evict_expired(time.time())
+            if not self.entries:
+                return None
+
+            if self._matrix is None:
+                self._matrix_ids = list(self.entries.keys())
+                self._matrix = np.stack([self._vectors[i] for i in self._matrix_ids])
+
+            scores = self._matrix @ self._normalize(embedding)
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+
+            entry_id = self._matrix_ids[best]
+            self.entries.move_to_end(entry_id)
+            self.hits += 1
+            return self.entries[entry_id]["answer"]
+
+    def store(self, question: str, embedding: List[float], answer: str, fingerprint: str):
+        """Remember the answer to a question"""
+        with self._lock:
+            self._check_fingerprint(fingerprint)
+            self._add(question, embedding, answer, time.time())
+            self._save()
+
+    def __len__(self) -> int:
+        return len(self.entries)
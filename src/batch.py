@@ -0,0 +1,141 @@
+"""
+Batch Question Mode - answer a file of questions without the interactive prompt
+"""
+import csv
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+from .config import Config
+from .ai_tutor import AITutor, QuestionPlan
+
+# Fields tried, in order, when a record has no explicit question field
+QUESTION_FIELDS = ["question", "text", "title"]
+ID_FIELDS = ["id", "request_id"]
+
+
+def read_questions(input_path: Path, field: Optional[str] = None) -> List[Dict]:
+    """
+    Read questions from a JSONL or CSV file
+
+    Args:
+        input_path: .jsonl or .csv file, one question per record
+        field: Record field holding the question (default: first of QUESTION_FIELDS present)
+
+    Returns:
+        List of {"id", "question"} dicts in file order
+    """
+    if input_path.suffix.lower() == ".csv":
+        with open(input_path, "r", encoding="utf-8", newline="") as f:
+            records = list(csv.DictReader(f))
+    else:
+        with open(input_path, "r", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+
+    questions = []
+    for index, record in enumerate(records, start=1):
+        fields = [field] if field else QUESTION_FIELDS
+        text = next((record[name] for name in fields if record.get(name)), None)
+        if not text:
+            raise ValueError(f"Record {index} in {input_path.name} has no question field ({', '.join(fields)})")
+        record_id = next((record[name] for name in ID_FIELDS if record.get(name)), index)
+        questions.append({"id": record_id, "question": str(text).strip()})
+    return questions
+
+
+class BatchRunner:
+    """
+    Answers a list of questions with bounded LLM concurrency.
+
+    Query embeddings are computed in one batched model call, retrieval runs
+    on the calling thread, and LLM generations run on a thread pool of
+    `concurrency` workers so at most that many requests are in flight at
+    Ollama. Results are written in input order.
+    """
+
+    def __init__(self, tutor: AITutor, concurrency: Optional[int] = None):
+        self.tutor = tutor
+        self.concurrency = max(1, concurrency or Config.BATCH_CONCURRENCY)
+
+    def _plan(self, question: str, embedding: List[float]) -> QuestionPlan:
+        """Run the pre-generation stages, turning failures into an error response"""
+        try:
+            return self.tutor.plan_question(question, embedding=embedding)
+        except Exception as e:
+            plan = QuestionPlan(question)
+            plan.response = f"Error generating response: {str(e)}"
+            return plan
+
+    def _generate(self, plan: QuestionPlan) -> str:
+        """Worker: call the LLM for one planned question"""
+        try:
+            return self.tutor.generate(plan)
+        except Exception as e:
+            return f"Error generating response: {str(e)}"
+
+    def run(self, input_path: Path, output_path: Path, field: Optional[str] = None) -> Dict:
+        """
+        Answer every question in input_path and write JSONL results to output_path
+
+        Returns:
+            Summary with question count, LLM calls, cache hits and elapsed seconds
+        """
+        start = time.perf_counter()
+        questions = read_questions(input_path, field)
+        print(f"Read {len(questions)} question(s) from {input_path.name}")
+        if not questions:
+            return {"questions": 0, "llm_calls": 0, "cache_hits": 0, "seconds": 0.0}
+
+        # One batched embedding call for every question
+        embed_start = time.perf_counter()
+        queries = [self.tutor.intent_detector.detect(q["question"])[1] for q in questions]
+        embeddings = self.tutor.pdf_processor.embed_queries(queries)
+        embed_each = (time.perf_counter() - embed_start) / len(questions)
+
+        plans = []
+        futures = []
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for item, embedding in zip(questions, embeddings):
+                plan = self._plan(item["question"], embedding)
+                plan.timings["embed"] = embed_each
+                plans.append(plan)
+                # Generation for earlier questions overlaps retrieval of later ones
+                futures.append(pool.submit(self._generate, plan) if plan.prompt else None)
+
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            llm_calls = 0
+            cache_hits = 0
+            with open(output_path, "w", encoding="utf-8") as out:
+                for index, (item, plan, future) in enumerate(zip(questions, plans, futures), start=1):
+                    if future is not None:
+                        answer = future.result()
+                        llm_calls += 1
+                    else:
+                        answer = plan.response
+                    cache_hits += plan.cache_hit
+
+                    record = {
+                        "id": item["id"],
+                        "question": item["question"],
+                        "answer": answer,
+                        "sources": plan.sources(),
+                        "cache_hit": plan.cache_hit,
+                        "prompt_tokens": plan.prompt_tokens,
+                        "intent": plan.intent.value if plan.intent is not None else None,
+                        "model": plan.model,
+                        "escalated": plan.escalated,
+                        "extractive": plan.extractive,
+                        "timings_ms": {stage: round(seconds * 1000, 2) for stage, seconds in plan.timings.items()},
+                    }
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    print(f"[{index}/{len(questions)}] {item['question'][:60]}")
+
+        summary = {
+            "questions": len(questions),
+            "llm_calls": llm_calls,
+            "cache_hits": cache_hits,
+            "seconds": round(time.perf_counter() - start, 2),
+        }
+        return summary
@@ -0,0 +1,310 @@
+"""
+Page-Aware Chunker - single-pass, sentence-aligned chunks that may span pages
+"""
+import bisect
+import re
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from .config import Config
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+CHUNKERS = ["page_aware", "recursive"]
+
+# Sentence ends: terminal punctuation followed by whitespace and a likely sentence start
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[])")
+_WHITESPACE = re.compile(r"\s+")
+# Line patterns start at the newline before the line (pages get one prepended): with a
+# literal first character the regex engine skips from line to line
+# Standalone page numbers ("12", "Page 3 of 40") are layout, not text
+_PAGE_NUMBER = re.compile(r"\n[ \t]*(?:page[ \t]+)?\d+(?:[ \t]*(?:/|of)[ \t]*\d+)?[ \t]*$", re.IGNORECASE | re.MULTILINE)
+# Headings: short lines starting with a capital or digit, without closing punctuation, that
+# open the page or follow a blank line or finished sentence and are not continued in lowercase
+_HEADING = re.compile(
+    r"\n(?:(?<=^\n)|(?<=[.!?]\n)|(?<=[.!?][\"')\]]\n))[ \t]*"
+    r"((?=[^\n]*[A-Za-z])[A-Z0-9][^\n.!?,;:]{0,78}[^\n.!?,;:\s])[ \t]*$(?!\n[ \t]*[a-z])",
+    re.MULTILINE
+)
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n\s*")
+_HYPHEN_BREAK = re.compile(r"-\n(?=[a-z])")
+# Chunk boundaries are found with str.find/rfind: a mark followed by a likely sentence start
+_SENTENCE_MARKS = (". ", "! ", "? ")
+_SENTENCE_STARTS = tuple("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789\"'([")
+_TERMINALS = tuple(".!?\"')]")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences, joining the line breaks PDF extraction leaves"""
+    text = _WHITESPACE.sub(" ", text).strip()
+    return [sentence for sentence in _SENTENCE_END.split(text) if sentence]
+
+
+class PageAwareChunker:
+    """
+    Chunks the pages of one document in a single pass.
+
+    Each page is normalized with a few whole-page regex passes: standalone
+    page numbers are dropped, short title-like lines become headings on
+    their own line, wrapped and hyphenated lines are joined and each
+    paragraph ends in a newline. Pages are appended to a running buffer
+    from which chunks of about `chunk_tokens` tokens (estimated at
+    CHARS_PER_TOKEN characters, like the context budget) are cut: at the
+    first heading past half the target, otherwise at the last sentence end
+    or paragraph break within it. Each chunk then starts with the whole
+    sentences in the last `overlap_tokens` of the previous one (never
+    across a heading). With `across_pages`, sentences and chunks continue
+    over page breaks and each chunk records the pages it covers
+    (page .. page_end). A short final chunk is folded into the one before it.
+
+    Pages are fed in order with feed(), which returns the chunks completed
+    so far (one is held back in case the tail is folded into it); finish()
+    returns the rest.
+    """
+
+    # A heading starts a new chunk once the current one is this full
+    MIN_FILL = 0.5
+    # A short final chunk may grow the previous chunk up to this much of the target
+    TAIL_GROW = 1.25
+    # Buffer text no chunk needs any more is dropped once it is this long
+    TRIM_CHARS = 1 << 16
+
+    def __init__(
+        self,
+        chunk_tokens: Optional[int] = None,
+        overlap_tokens: Optional[int] = None,
+        across_pages: Optional[bool] = None
+    ):
+        self.target = (chunk_tokens or Config.CHUNK_TOKENS) * Config.CHARS_PER_TOKEN
+        overlap = overlap_tokens if overlap_tokens is not None else Config.CHUNK_OVERLAP_TOKENS
+        self.overlap = min(overlap * Config.CHARS_PER_TOKEN, self.target // 2)
+        self.min_fill = int(self.MIN_FILL * self.target)
+        self.across_pages = Config.CHUNK_ACROSS_PAGES if across_pages is None else across_pages
+        self.source = None
+
+        self._buffer = ""
+        self._start = 0  # Buffer offset of the next chunk
+        self._page_offsets: List[int] = []  # Buffer offset where each page's text begins
+        self._page_numbers: List[int] = []
+        self._headings: List[int] = []  # Buffer offsets of headings
+        self._held: Optional[Tuple[int, int]] = None  # Last completed chunk (start, end), not yet returned
+        self._out: List["Document"] = []
+
+    # --- Reading pages ---
+
+    @staticmethod
+    def _join_lines(text: str) -> str:
+        """Join wrapped lines, keeping one newline per paragraph break"""
+        if "-\n" in text:
+            text = _HYPHEN_BREAK.sub("", text)
+        return "\n".join(paragraph.replace("\n", " ") for paragraph in _PARAGRAPH_BREAK.split(text))
+
+    def _append_page(self, text: str, page: int):
+        text = _PAGE_NUMBER.sub("", "\n" + text).strip()
+        if not text:
+            return
+        text = "\n" + text
+        parts, last = [], 0  # (text, is heading)
+        for match in _HEADING.finditer(text):
+            body = self._join_lines(text[last:match.start()]).strip()
+            if body:
+                parts.append((body, False))
+            parts.append((match.group(1), True))
+            last = match.end()
+        body = self._join_lines(text[last:]).strip()
+        if body:
+            parts.append((body, False))
+
+        buffer = self._buffer
+        # A sentence left unfinished at the bottom of the last page continues on this one
+        open_sentence = bool(buffer) and not parts[0][1] and not buffer.endswith(_TERMINALS)
+        separator = (" " if open_sentence else "\n") if buffer else ""
+        offset = len(buffer) + len(separator)
+        self._page_offsets.append(offset)
+        self._page_numbers.append(page)
+        for part, heading in parts:
+            if heading:
+                self._headings.append(offset)
+            offset += len(part) + 1
+        self._buffer = buffer + separator + "\n".join(part for part, _ in parts)
+
+    # --- Cutting chunks ---
+
+    def _boundary_before(self, low: int, high: int) -> int:
+        """Offset of the last sentence start or paragraph start in [low, high), or -1"""
+        buffer = self._buffer
+        position = buffer.rfind("\n", max(low - 1, 0), high - 1)
+        best = position + 1 if position >= 0 else -1
+        for mark in _SENTENCE_MARKS:
+            floor = max(low - 2, best - 1, 0)
+            position = buffer.rfind(mark, floor, high - 1)
+            while position >= 0 and not buffer.startswith(_SENTENCE_STARTS, position + 2):
+                position = buffer.rfind(mark, floor, position + 1)
+            if position >= 0:
+                best = max(best, position + 2)
+        return best
+
+    def _boundary_after(self, low: int, high: int) -> int:
+        """Offset of the first sentence start or paragraph start in [low, high), or high"""
+        buffer = self._buffer
+        position = buffer.find("\n", max(low - 1, 0), high - 1)
+        best = position + 1 if position >= 0 else high
+        for mark in _SENTENCE_MARKS:
+            position = buffer.find(mark, max(low - 2, 0), best - 1)
+            while position >= 0 and not buffer.startswith(_SENTENCE_STARTS, position + 2):
+                position = buffer.find(mark, position + 1, best - 1)
+            if position >= 0:
+                best = position + 2
+        return best
+
+    def _next_cut(self) -> Optional[Tuple[int, int]]:
+        """(end of the next chunk, start of the one after), or None until more text is read"""
+        start = self._start
+        end = start + self.target
+        if len(self._buffer) <= end:
+            return None
+
+        headings = self._headings
+        while headings and headings[0] <= start:
+            headings.pop(0)
+        for heading in headings:
+            if heading > end:
+                break
+            if heading - start >= self.min_fill:
+                return heading, heading
+
+        cut = self._boundary_before(start + self.min_fill, end + 1)
+        if cut < 0:
+            # No sentence ends in reach (tables, lists): cut between words
+            space = self._buffer.rfind(" ", start + self.min_fill, end)
+            cut = space + 1 if space >= 0 else end
+        low = max(cut - self.overlap, start + 1)
+        # Overlap never reaches back over a heading
+        for heading in headings:
+            if heading >= cut:
+                break
+            low = max(low, heading)
+        return cut, self._boundary_after(low, cut)
+
+    def _pages(self, start: int, end: int) -> Tuple[int, int]:
+        offsets = self._page_offsets
+        first = max(bisect.bisect_right(offsets, start) - 1, 0)
+        last = max(bisect.bisect_right(offsets, max(start, end - 1)) - 1, 0)
+        return self._page_numbers[first], self._page_numbers[last]
+
+    def _render(self, start: int, end: int) -> "Document":
+        from langchain_core.documents import Document
+
+        page, page_end = self._pages(start, end)
+        return Document(
+            page_content=self._buffer[start:end].strip(),
+            metadata={"source": self.source, "page": page, "page_end": page_end}
+        )
+
+    def _complete(self, start: int, end: int):
+        """Hold a finished chunk back, releasing the one held before it"""
+        if self._held is not None:
+            self._out.append(self._render(*self._held))
+        self._held = (start, end)
+
+    def _cut_chunks(self):
+        while True:
+            cut = self._next_cut()
+            if cut is None:
+                break
+            end, next_start = cut
+            if self._buffer[self._start:end].strip():
+                self._complete(self._start, end)
+            self._start = next_start
+        self._trim()
+
+    def _trim(self):
+        """Drop buffer text no chunk can still need"""
+        keep = min(self._start, self._held[0]) if self._held else self._start
+        if keep < self.TRIM_CHARS:
+            return
+        self._buffer = self._buffer[keep:]
+        self._start -= keep
+        if self._held:
+            self._held = (self._held[0] - keep, self._held[1] - keep)
+        self._headings = [heading - keep for heading in self._headings if heading >= keep]
+        # Keep the page the remaining text starts on
+        first = max(bisect.bisect_right(self._page_offsets, keep) - 1, 0)
+        self._page_offsets = [max(offset - keep, 0) for offset in self._page_offsets[first:]]
+        self._page_numbers = self._page_numbers[first:]
+
+    def _close(self):
+        """Emit everything read so far, folding a short tail into the chunk before it"""
+        end, held = len(self._buffer), self._held
+        fresh = max(self._start, held[1]) if held else self._start
+        if self._buffer[fresh:end].strip():
+            if (
+                held is not None
+                and end - fresh < self.min_fill
+                and end - held[0] <= self.TAIL_GROW * self.target
+            ):
+                self._held = (held[0], end)
+            else:
+                self._complete(self._start, end)
+        if self._held is not None:
+            self._out.append(self._render(*self._held))
+            self._held = None
+        self._buffer, self._start = "", 0
+        self._page_offsets, self._page_numbers, self._headings = [], [], []
+
+    def feed(self, documents: List["Document"]) -> List["Document"]:
+        """
+        Read the next pages of the document
+
+        Args:
+            documents: Page documents (source/page metadata), in page order
+
+        Returns:
+            Chunks completed so far
+        """
+        for document in documents:
+            self.source = document.metadata.get("source", self.source)
+            self._append_page(document.page_content, document.metadata.get("page", 0))
+            self._cut_chunks()
+            if not self.across_pages:
+                self._close()
+        out, self._out = self._out, []
+        return out
+
+    def finish(self) -> List["Document"]:
+        """Chunks left once every page has been fed"""
+        self._close()
+        out, self._out = self._out, []
+        return out
+
+
+class PageSplitter:
+    """Per-page RecursiveCharacterTextSplitter behind the chunker interface (CHUNKER=recursive)"""
+
+    def __init__(self, splitter):
+        self.splitter = splitter
+
+    def feed(self, documents: List["Document"]) -> List["Document"]:
+        return self.splitter.split_documents(documents)
+
+    def finish(self) -> List["Document"]:
+        return []
+
+
+def split_documents(chunker_factory, documents: List["Document"]) -> List["Document"]:
+    """
+    Chunk page documents of one or more PDFs, one chunker per source
+
+    Args:
+        chunker_factory: Returns a new chunker (e.g. PDFProcessor.new_chunker)
+        documents: Page documents, grouped by source and in page order
+    """
+    chunks, chunker, source = [], None, object()
+    for document in documents:
+        if document.metadata.get("source") != source:
+            if chunker is not None:
+                chunks.extend(chunker.finish())
+            chunker, source = chunker_factory(), document.metadata.get("source")
+        chunks.extend(chunker.feed([document]))
+    if chunker is not None:
+        chunks.extend(chunker.finish())
+    return chunks
@@ -2,9 +2,12 @@
 CLI Interface for EduBridge AI Tutor
 """
 import sys
+import time
+import argparse
 from pathlib import Path
 from .ai_tutor import AITutor
 from .config import Config
+from .telemetry import telemetry
 
 
 class EduBridgeCLI:
@@ -25,6 +28,11 @@ AVAILABLE COMMANDS:
 load                Load all PDFs from src/syllabus directory
 load <pdf_path>     Load a specific PDF document
 status              Show current system status
+stats               Show per-stage timings (stats json|prometheus [file], stats reset)
+recall [k]          Measure IVF-PQ index recall@k against exact search
+docs                List loaded documents and their chunk counts
+focus <names>       Answer only from documents whose names contain these words
+focus off           Go back to routing each question automatically
 help                Show this help message
 exit/quit           Exit the application
 
@@ -54,6 +62,14 @@ If the answer is not found in the PDF, you will see: "Not Found"
         # Check Ollama connectivity
         self._check_ollama()
         
+        # Reopen the knowledge base from the previous session
+        if self.tutor.restore_knowledge_base():
+            print(f"[OK] Knowledge base restored: {self.tutor.pdf_processor.get_current_pdf()}")
+        
+        # Load models in the background while the user types
+        if Config.PREWARM:
+            self.tutor.prewarm()
+        
         while self.running:
             try:
                 user_input = input("\nEduBridge> ").strip()
@@ -71,13 +87,37 @@ If the answer is not found in the PDF, you will see: "Not Found"
             except Exception as e:
                 print(f"Error: {str(e)}")
     
+    # Commands whose first word also starts ordinary questions ("focus on...", "stats show...")
+    QUESTION_LIKE_COMMANDS = ("stats", "recall", "docs", "focus")
+    FOCUS_OFF = ("off", "all", "none")
+    
+    def _is_command(self, command: str, args: str) -> bool:
+        """Check that a question-like command has valid arguments; otherwise it is a question"""
+        words = args.replace(",", " ").split()
+        if command == "docs":
+            return not words
+        if command == "stats":
+            return not words or words[0] in ("reset", "json", "prometheus")
+        if command == "recall":
+            return not words or (len(words) == 1 and words[0].isdigit())
+        if command == "focus":
+            if not words or args.lower() in self.FOCUS_OFF:
+                return True
+            router = self.tutor.pdf_processor.router
+            return all(router.match([word]) for word in words)
+        return True
+    
     def _process_input(self, user_input: str):
         """Process user input"""
         parts = user_input.split(maxsplit=1)
         command = parts[0].lower()
+        args = parts[1].strip() if len(parts) > 1 else ""
+        
+        if command in self.QUESTION_LIKE_COMMANDS and not self._is_command(command, args):
+            self._answer_question(user_input)
         
         # System commands
-        if command == "help":
+        elif command == "help":
             print(self.HELP_TEXT)
         
         elif command in ["exit", "quit"]:
@@ -87,6 +127,18 @@ If the answer is not found in the PDF, you will see: "Not Found"
         elif command == "status":
             self._show_status()
         
+        elif command == "stats":
+            self._show_stats(args.split())
+        
+        elif command == "recall":
+            self._show_recall(args or "10")
+        
+        elif command == "docs":
+            self._show_documents()
+        
+        elif command == "focus":
+            self._set_focus(args)
+        
         elif command == "load":
             if len(parts) < 2:
                 # Load all PDFs from src/syllabus directory
@@ -127,14 +179,32 @@ If the answer is not found in the PDF, you will see: "Not Found"
             print("\n[FAILED] Failed to load PDFs from src/syllabus directory")
     
     def _answer_question(self, question: str):
-        """Answer a user question"""
+        """Answer a user question, printing the response as it is generated"""
         print("\nProcessing question...")
         
-        response = self.tutor.answer_question(question)
+        start = time.perf_counter()
+        first_token = None
         
         print("\n" + "="*60)
-        print(response)
+        for chunk in self.tutor.stream_answer(question):
+            if first_token is None:
+                first_token = time.perf_counter() - start
+            print(chunk, end="", flush=True)
+        print()
         print("="*60)
+        
+        total = time.perf_counter() - start
+        if first_token is None:
+            first_token = total
+        timing = f"Time to first token: {first_token:.2f}s | Total time: {total:.2f}s"
+        plan = self.tutor.last_plan
+        if plan is not None and plan.prompt_tokens:
+            timing += f" | Prompt tokens: {plan.prompt_tokens} (context {plan.context_tokens})"
+        if plan is not None and plan.extractive:
+            timing += " | Answered from the text (no LLM call)"
+        if plan is not None and plan.model and Config.FAST_MODEL:
+            timing += f" | Model: {plan.model}" + (" (escalated)" if plan.escalated else "")
+        print(timing)
     
     def _show_status(self):
         """Show system status"""
@@ -146,23 +216,164 @@ If the answer is not found in the PDF, you will see: "Not Found"
             print(f"{key:15}: {value}")
         print("-" * 40)
     
+    def _show_stats(self, args: list):
+        """Show or export per-stage timing histograms"""
+        if not telemetry.enabled:
+            print("Telemetry is disabled (set TELEMETRY_ENABLED=true)")
+            return
+        
+        if args and args[0] == "reset":
+            telemetry.reset()
+            print("Stats cleared")
+            return
+        
+        if args and args[0] in ("json", "prometheus"):
+            output = telemetry.to_json() if args[0] == "json" else telemetry.to_prometheus()
+            if len(args) > 1:
+                Path(args[1]).write_text(output, encoding="utf-8")
+                print(f"[OK] Stats written to {args[1]}")
+            else:
+                print(output)
+            return
+        
+        spans = telemetry.snapshot()
+        if not spans:
+            print("No timings recorded yet - load PDFs or ask a question first")
+            return
+        
+        print("\nSTAGE TIMINGS (ms, percentiles over recent samples):")
+        print("-" * 72)
+        print(f"{'Stage':24}{'Count':>8}{'Mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+        for name, summary in spans.items():
+            print(
+                f"{name:24}{summary['count']:>8}{summary['mean_ms']:>10.1f}"
+                f"{summary['p50_ms']:>10.1f}{summary['p95_ms']:>10.1f}{summary['p99_ms']:>10.1f}"
+            )
+        print("-" * 72)
+    
+    def _show_recall(self, k: str):
+        """Report approximate vector index recall against exact search"""
+        if not k.isdigit() or int(k) < 1:
+            print("Usage: recall [k]")
+            return
+        if not self.tutor.pdf_processor.is_loaded():
+            print("No knowledge base loaded - run 'load' first")
+            return
+        
+        report = self.tutor.pdf_processor.recall_report(int(k))
+        if report is None:
+            print(f"The '{Config.VECTOR_BACKEND}' vector store searches exactly (set VECTOR_BACKEND=ivfpq)")
+            return
+        if not report["trained"]:
+            print(f"Index not trained yet: {report['rows']} chunks, exact search until {report['min_train']}")
+            return
+        
+        print(f"\nIVF-PQ RECALL@{report['k']} ({report['queries']} queries, {report['rows']} chunks):")
+        print("-" * 40)
+        print(f"Clusters: {report['nlist']} | Subquantizers: {report['m']}")
+        print(f"Vector bytes/chunk: {report['pq_code_bytes']} B PQ code (float32: {report['float32_bytes']} B)")
+        print(f"Exact search: {report['exact_ms']:.2f} ms/query")
+        for nprobe, result in report["nprobe"].items():
+            print(f"nprobe {nprobe:>4}: recall {result['recall']:.3f}, {result['ms']:.2f} ms/query")
+        print("-" * 40)
+    
+    def _show_documents(self):
+        """List loaded documents"""
+        documents = self.tutor.pdf_processor.documents()
+        if not documents:
+            print("No documents loaded - run 'load' first")
+            return
+        
+        focus = self.tutor.document_filter
+        print(f"\nDOCUMENTS ({len(documents)}):")
+        print("-" * 40)
+        for doc in documents:
+            marker = "*" if focus is not None and doc["name"] in focus else " "
+            print(f"{marker} {doc['name']} ({doc['chunks']} chunks)")
+        print("-" * 40)
+        if focus is not None:
+            print("* = in focus (use 'focus off' to search all documents)")
+    
+    def _set_focus(self, names: str):
+        """Restrict questions to some documents, or clear the restriction"""
+        if not names:
+            print("Usage: focus <names> | focus off")
+            return
+        if names.lower() in self.FOCUS_OFF:
+            self.tutor.focus([])
+            print("[OK] Focus cleared - questions are routed across all documents")
+            return
+        
+        matched = self.tutor.focus(names.replace(",", " ").split())
+        if not matched:
+            print(f"No loaded document matches '{names}' (see 'docs')")
+            return
+        print(f"[OK] Focused on {len(matched)} document(s): {', '.join(matched)}")
+    
     def _check_ollama(self):
         """Check if Ollama is running"""
-        try:
-            import requests
-            response = requests.get(f"{Config.OLLAMA_BASE_URL}/api/tags", timeout=2)
-            if response.status_code == 200:
-                print("[OK] Ollama connection successful")
-            else:
-                print("[WARNING] Ollama may not be running properly")
-        except Exception:
+        status_code = self.tutor.llm.check()
+        if status_code == 200:
+            print("[OK] Ollama connection successful")
+        elif status_code is not None:
+            print("[WARNING] Ollama may not be running properly")
+        else:
             print("[WARNING] Cannot connect to Ollama")
             print(f"  Make sure Ollama is running at {Config.OLLAMA_BASE_URL}")
             print(f"  Model required: {Config.OLLAMA_MODEL}")
 
 
+def run_batch(args):
+    """Answer a file of questions non-interactively"""
+    from .batch import BatchRunner
+    
+    Config.validate()
+    tutor = AITutor()
+    
+    if args.load:
+        success, _ = tutor.load_all_pdfs()
+        if not success:
+            print("\n[FAILED] Failed to load PDFs from src/syllabus directory")
+            sys.exit(1)
+    elif not tutor.restore_knowledge_base():
+        print("[FAILED] No knowledge base found. Run 'load' first or pass --load")
+        sys.exit(1)
+    
+    output_path = Path(args.output) if args.output else Path(args.input).with_suffix(".answers.jsonl")
+    runner = BatchRunner(tutor, concurrency=args.concurrency)
+    summary = runner.run(Path(args.input), output_path, field=args.field)
+    
+    print(f"\n[SUCCESS] Wrote {summary['questions']} answer(s) to {output_path}")
+    print(f"LLM calls: {summary['llm_calls']} | Cache hits: {summary['cache_hits']} | Time: {summary['seconds']}s")
+
+
 def main():
     """Entry point for CLI application"""
+    parser = argparse.ArgumentParser(description="EduBridge AI Tutor")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    batch = subparsers.add_parser("batch", help="Answer questions from a JSONL or CSV file")
+    batch.add_argument("input", help="Questions file (.jsonl or .csv)")
+    batch.add_argument("-o", "--output", help="Output JSONL file (default: <input>.answers.jsonl)")
+    batch.add_argument("-c", "--concurrency", type=int, help="Maximum concurrent LLM requests")
+    batch.add_argument("--field", help="Record field holding the question")
+    batch.add_argument("--load", action="store_true", help="Load all PDFs from src/syllabus first")
+    
+    serve = subparsers.add_parser("serve", help="Run the HTTP server for a whole classroom")
+    serve.add_argument("--host", help=f"Bind address (default: {Config.SERVER_HOST})")
+    serve.add_argument("--port", type=int, help=f"Port (default: {Config.SERVER_PORT})")
+    
+    args = parser.parse_args()
+    
+    if args.command == "batch":
+        run_batch(args)
+        return
+    
+    if args.command == "serve":
+        from .server import serve as run_server
+        run_server(args.host, args.port)
+        return
+    
     cli = EduBridgeCLI()
     cli.start()
 
@@ -11,8 +11,17 @@ class Config:
     """Application configuration"""
     
     # Ollama Settings
-    OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+    OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")  # Comma-separated for several nodes
     OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2:1b")
+    OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")  # How long Ollama keeps the model loaded
+    OLLAMA_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "3"))  # seconds
+    OLLAMA_READ_TIMEOUT = float(os.getenv("OLLAMA_READ_TIMEOUT", "120"))  # seconds
+    OLLAMA_NUM_PREDICT = int(os.getenv("OLLAMA_NUM_PREDICT", "256"))  # Max generated tokens
+    OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "4096"))  # Context window in tokens
+    OLLAMA_POOL_SIZE = int(os.getenv("OLLAMA_POOL_SIZE", "8"))  # Pooled HTTP connections
+    OLLAMA_CIRCUIT_FAILURES = int(os.getenv("OLLAMA_CIRCUIT_FAILURES", "3"))  # Failures in a row before eviction
+    OLLAMA_CIRCUIT_COOLDOWN = float(os.getenv("OLLAMA_CIRCUIT_COOLDOWN", "30"))  # Seconds a failing node is evicted
+    OLLAMA_HEDGE = os.getenv("OLLAMA_HEDGE", "false").lower() == "true"  # Duplicate slow requests on another node
     
     # Vector Store Settings
     BASE_DIR = Path(__file__).parent.parent
@@ -20,15 +29,122 @@ class Config:
         "VECTOR_STORE_PATH", 
         str(BASE_DIR / "data" / "vectorstore")
     )
+    MANIFEST_PATH = os.getenv(
+        "MANIFEST_PATH",
+        str(Path(VECTOR_STORE_PATH) / "ingest_manifest.json")
+    )
+    LEXICAL_INDEX_PATH = os.getenv(
+        "LEXICAL_INDEX_PATH",
+        str(Path(VECTOR_STORE_PATH) / "lexical_index.json")
+    )
+    # "chroma", "flat" (memory-mapped matrix, exact brute-force search) or "ivfpq"
+    VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()
+    FLAT_INDEX_PATH = os.getenv(
+        "FLAT_INDEX_PATH",
+        str(Path(VECTOR_STORE_PATH) / "flat_index")
+    )
+    FLAT_INDEX_DTYPE = os.getenv("FLAT_INDEX_DTYPE", "float32")  # float16 halves the file, searches slower
+    # IVF-PQ backend ("ivfpq"): compressed codes in RAM, exact re-rank from disk
+    IVFPQ_INDEX_PATH = os.getenv(
+        "IVFPQ_INDEX_PATH",
+        str(Path(VECTOR_STORE_PATH) / "ivfpq_index")
+    )
+    IVFPQ_NLIST = int(os.getenv("IVFPQ_NLIST", "0"))  # Coarse clusters; 0 = about 4 * sqrt(chunks)
+    IVFPQ_M = int(os.getenv("IVFPQ_M", "48"))  # Code bytes per chunk
+    IVFPQ_NPROBE = int(os.getenv("IVFPQ_NPROBE", "8"))  # Clusters scanned per query
+    IVFPQ_SHORTLIST = int(os.getenv("IVFPQ_SHORTLIST", "64"))  # Candidates re-ranked exactly
+    IVFPQ_MIN_TRAIN = int(os.getenv("IVFPQ_MIN_TRAIN", "4096"))  # Exact search below this many chunks
+    IVFPQ_TRAIN_SAMPLE = int(os.getenv("IVFPQ_TRAIN_SAMPLE", "20000"))
+    
+    # Embedding Settings
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
     
     # Chunking Settings
     CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1000"))
     CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
+    CHARS_PER_TOKEN = 4  # Rough characters-per-token ratio for chunk sizes and context budgets
+    
+    # Chunker: "recursive" (per-page character splitter using CHUNK_SIZE / CHUNK_OVERLAP) or
+    # "page_aware" (sentence-aligned, token-sized, may span pages; uses the CHUNK_* settings below)
+    CHUNKER = os.getenv("CHUNKER", "recursive").lower()
+    CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", str(CHUNK_SIZE // CHARS_PER_TOKEN)))  # Target chunk length
+    CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", str(CHUNK_OVERLAP // CHARS_PER_TOKEN)))
+    CHUNK_ACROSS_PAGES = os.getenv("CHUNK_ACROSS_PAGES", "true").lower() == "true"
+    
+    # Extraction Settings (1 worker = serial extraction in-process)
+    EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+    EXTRACT_PAGES_PER_TASK = int(os.getenv("EXTRACT_PAGES_PER_TASK", "32"))
+    
+    # Ingestion Settings (streaming page -> chunk -> embedding -> store pipeline)
+    INGEST_EMBED_BATCH = int(os.getenv("INGEST_EMBED_BATCH", "64"))  # Chunks per embedding call and upsert
+    INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "4"))  # Items buffered between pipeline stages
+    
+    # OCR Settings (scanned pages only)
+    OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(min(4, os.cpu_count() or 1))))
+    OCR_DPI = int(os.getenv("OCR_DPI", "144"))
+    OCR_BLANK_CHECK_DPI = 24  # Thumbnail resolution for the blank-page check
+    OCR_BLANK_STDDEV = float(os.getenv("OCR_BLANK_STDDEV", "3.0"))
+    OCR_CACHE_PATH = os.getenv(
+        "OCR_CACHE_PATH",
+        str(BASE_DIR / "data" / "ocr_cache")
+    )
+    
+    # Telemetry Settings (per-stage timing shown by the `stats` command)
+    TELEMETRY_ENABLED = os.getenv("TELEMETRY_ENABLED", "true").lower() == "true"
+    TELEMETRY_WINDOW = int(os.getenv("TELEMETRY_WINDOW", "1000"))  # Recent samples kept for percentiles
+    
+    # Startup Settings (load models in a background thread at launch)
+    PREWARM = os.getenv("PREWARM", "true").lower() == "true"
+    
+    # Retrieval Settings
+    RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")  # dense, lexical or hybrid
+    HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))  # Per retriever before fusion
+    RRF_K = 60  # Reciprocal-rank fusion constant
+    RELEVANCE_THRESHOLD = float(os.getenv("RELEVANCE_THRESHOLD", "0.25"))  # Min cosine similarity
+    LEXICAL_MIN_COVERAGE = float(os.getenv("LEXICAL_MIN_COVERAGE", "0.5"))  # Min share of query terms matched
+    LEXICAL_MIN_TERMS = int(os.getenv("LEXICAL_MIN_TERMS", "2"))  # Min query terms matched (all, for shorter queries)
+    RELATIVE_SCORE_CUTOFF = float(os.getenv("RELATIVE_SCORE_CUTOFF", "0.8"))  # Drop hits below best * cutoff
+    
+    # Document Routing (search only the N documents whose centroid best matches the query; 0 = off)
+    ROUTE_TOP_DOCS = int(os.getenv("ROUTE_TOP_DOCS", "3"))
     
     # Response Settings
     MAX_CONTEXT_DOCS = 3
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1024"))  # Max tokens of retrieved context per prompt
     TEMPERATURE = 0.2  # Lower temperature for concise, focused tutoring
     
+    # Intent Plans (chunks retrieved and context budget per question type; others use the settings above)
+    CONCEPTUAL_TOP_K = int(os.getenv("CONCEPTUAL_TOP_K", "3"))  # "What is X?", "Explain Y"
+    CONCEPTUAL_CONTEXT_BUDGET = int(os.getenv("CONCEPTUAL_CONTEXT_BUDGET", "768"))
+    TECHNICAL_TOP_K = int(os.getenv("TECHNICAL_TOP_K", "6"))  # "How to...", algorithms, procedures
+    TECHNICAL_CONTEXT_BUDGET = int(os.getenv("TECHNICAL_CONTEXT_BUDGET", "1536"))
+    # Smaller model for short conceptual questions; empty = always use OLLAMA_MODEL
+    FAST_MODEL = os.getenv("FAST_MODEL", "")
+    FAST_MODEL_MAX_WORDS = int(os.getenv("FAST_MODEL_MAX_WORDS", "12"))  # Longer questions skip the fast model
+    FAST_MODEL_MIN_RELEVANCE = float(os.getenv("FAST_MODEL_MIN_RELEVANCE", "0.5"))  # Best cosine below this goes to OLLAMA_MODEL
+    # Answer conceptual questions with a retrieved sentence, skipping the LLM, when one matches this well
+    EXTRACTIVE_ANSWERS = os.getenv("EXTRACTIVE_ANSWERS", "true").lower() == "true"
+    EXTRACTIVE_MIN_SCORE = float(os.getenv("EXTRACTIVE_MIN_SCORE", "0.7"))  # Min sentence cosine similarity
+    
+    # Batch Settings
+    BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "2"))  # Max in-flight LLM requests
+    
+    # Server Settings
+    SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+    SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "2"))  # Concurrent LLM generations
+    SERVER_QUEUE_SIZE = int(os.getenv("SERVER_QUEUE_SIZE", "16"))  # Waiting questions before 429
+    
+    # Answer Cache Settings (semantic match on question embeddings)
+    ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+    ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))
+    ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "500"))
+    ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "86400"))  # seconds
+    ANSWER_CACHE_PATH = os.getenv(
+        "ANSWER_CACHE_PATH",
+        str(BASE_DIR / "data" / "answer_cache.json")
+    )  # Empty string keeps the cache in memory only
+    
     @classmethod
     def validate(cls):
         """Validate configuration"""
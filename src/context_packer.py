@@ -0,0 +1,166 @@
+"""
+Context Packer - merge, de-duplicate and budget retrieved chunks for the prompt
+"""
+import math
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from .config import Config
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the number of LLM tokens in text"""
+    return math.ceil(len(text) / Config.CHARS_PER_TOKEN) if text else 0
+
+
+def page_label(page, page_end=None) -> str:
+    """ "Page 3", or "Pages 3-4" for text running over a page break"""
+    if page_end is not None and page_end != page:
+        return f"Pages {page}-{page_end}"
+    return f"Page {page}"
+
+
+def _chunk_index(doc: "Document") -> Optional[int]:
+    """Position of a chunk within its PDF, from its "<prefix>:<n>" chunk id"""
+    chunk_id = doc.metadata.get("chunk_id", "")
+    _, _, index = chunk_id.rpartition(":")
+    return int(index) if index.isdigit() else None
+
+
+class ContextBlock:
+    """Contiguous text from one PDF, built from one or more chunks"""
+
+    def __init__(self, doc: "Document", score: float):
+        self.source = doc.metadata.get("source", "Unknown PDF")
+        self.page = doc.metadata.get("page", "Unknown")
+        self.page_end = doc.metadata.get("page_end", self.page)
+        self.text = doc.page_content.strip()
+        self.score = score
+        self.docs = [(doc, score)]
+
+    def absorb(self, other: "ContextBlock", overlap: int):
+        """Append another block whose first `overlap` characters repeat our tail"""
+        if overlap < len(other.text):
+            self.text += other.text[overlap:]
+            self.page_end = other.page_end
+        self.score = max(self.score, other.score)
+        self.docs.extend(other.docs)
+
+    def render(self) -> str:
+        return f"[Source: {self.source}, {page_label(self.page, self.page_end)}]\n{self.text}"
+
+
+class ContextPacker:
+    """
+    Builds the prompt context from retrieved (document, relevance) pairs.
+
+    Chunks from the same PDF are put back in document order and adjacent
+    ones are joined, dropping the overlap text they share;
+    chunks whose text is already contained in another block are dropped.
+    The merged blocks are then added best-scoring first until the token
+    budget is reached, the last one truncated at a sentence boundary if
+    enough budget is left for it to be useful.
+    """
+
+    # Shared text shorter than this is treated as coincidence, not overlap
+    MIN_OVERLAP = 20
+    # Don't bother adding a truncated block smaller than this many tokens
+    MIN_PARTIAL_TOKENS = 64
+
+    def __init__(self, token_budget: Optional[int] = None):
+        self.token_budget = token_budget or Config.CONTEXT_TOKEN_BUDGET
+
+    @classmethod
+    def _overlap(cls, head: str, tail: str) -> int:
+        """Length of the longest suffix of head that is a prefix of tail"""
+        overlap_chars = max(Config.CHUNK_OVERLAP, Config.CHUNK_OVERLAP_TOKENS * Config.CHARS_PER_TOKEN)
+        longest = min(len(head), len(tail), overlap_chars + cls.MIN_OVERLAP)
+        for size in range(longest, cls.MIN_OVERLAP - 1, -1):
+            if head.endswith(tail[:size]):
+                return size
+        return 0
+
+    def merge(self, docs: List[Tuple["Document", float]]) -> List[ContextBlock]:
+        """
+        Join overlapping chunks from the same source
+
+        Args:
+            docs: Retrieved (document, relevance) pairs
+
+        Returns:
+            De-duplicated context blocks, best score first
+        """
+        sources = {}
+        for rank, (doc, score) in enumerate(docs):
+            block = ContextBlock(doc, score)
+            index = _chunk_index(doc)
+            # Without chunk ids only chunks of one page can be put in order
+            key = (block.source,) if index is not None else (block.source, block.page)
+            sources.setdefault(key, []).append((index if index is not None else rank, block))
+
+        blocks = []
+        for members in sources.values():
+            members.sort(key=lambda member: member[0])
+            current = members[0][1]
+            for _, block in members[1:]:
+                if block.text in current.text:
+                    current.absorb(block, len(block.text))
+                    continue
+                overlap = self._overlap(current.text, block.text)
+                if overlap:
+                    current.absorb(block, overlap)
+                else:
+                    blocks.append(current)
+                    current = block
+            blocks.append(current)
+
+        # The same passage can appear in two PDFs (or twice on one page)
+        blocks.sort(key=lambda block: block.score, reverse=True)
+        unique = []
+        for block in blocks:
+            if not any(block.text in kept.text for kept in unique):
+                unique.append(block)
+        return unique
+
+    @staticmethod
+    def _truncate(text: str, max_chars: int) -> str:
+        """Cut text to at most max_chars, preferring a sentence boundary"""
+        cut = text[:max_chars]
+        boundary = max(cut.rfind(". "), cut.rfind(".\n"), cut.rfind("\n\n"))
+        if boundary > max_chars // 2:
+            cut = cut[:boundary + 1]
+        return cut.rstrip()
+
+    def pack(
+        self,
+        docs: List[Tuple["Document", float]],
+        token_budget: Optional[int] = None
+    ) -> Tuple[str, int, List[ContextBlock]]:
+        """
+        Assemble prompt context within the token budget
+
+        Args:
+            docs: Retrieved (document, relevance) pairs
+            token_budget: Overrides the packer's budget for this call
+
+        Returns:
+            Tuple of (context text, estimated context tokens, blocks used)
+        """
+        separator_tokens = estimate_tokens("\n\n")
+        remaining = token_budget or self.token_budget
+        used = []
+        for block in self.merge(docs):
+            cost = estimate_tokens(block.render()) + (separator_tokens if used else 0)
+            if cost <= remaining:
+                used.append(block)
+                remaining -= cost
+                continue
+            header_cost = cost - estimate_tokens(block.text)
+            if remaining - header_cost >= self.MIN_PARTIAL_TOKENS:
+                block.text = self._truncate(block.text, (remaining - header_cost) * Config.CHARS_PER_TOKEN)
+                used.append(block)
+            break
+
+        context = "\n\n".join(block.render() for block in used)
+        return context, estimate_tokens(context), used
@@ -0,0 +1,66 @@
+"""
+Document Router - picks which PDFs (shards) a query should search
+
+Each ingested PDF has a centroid: the normalized mean of its chunk
+embeddings, recorded in the ingestion manifest. A query is compared with
+every centroid first and chunk-level search is restricted to the best
+matching documents, so questions stop scanning unrelated courses.
+"""
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+
+class DocumentRouter:
+    """Cosine routing of query embeddings to document centroids"""
+
+    def __init__(self, documents: List[Dict]):
+        """
+        Args:
+            documents: IngestManifest.documents() entries (name, chunks, centroid)
+        """
+        # One entry per source name; PDFs sharing a name share a shard
+        self.names = sorted({doc["name"] for doc in documents})
+        centroids: Dict[str, np.ndarray] = {}
+        for doc in documents:
+            if doc.get("centroid") is None:
+                continue
+            vector = np.asarray(doc["centroid"], dtype=np.float32) * doc["chunks"]
+            centroids[doc["name"]] = centroids.get(doc["name"], 0) + vector
+
+        self.routed = [name for name in self.names if name in centroids]
+        # Documents ingested before centroids were recorded are always searched
+        self.unrouted = [name for name in self.names if name not in centroids]
+        self.matrix = None
+        if self.routed:
+            matrix = np.stack([centroids[name] for name in self.routed])
+            self.matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def route(self, embedding: Sequence[float], top_n: int) -> Optional[List[str]]:
+        """
+        Names of the documents worth searching for a query
+
+        Args:
+            embedding: Query embedding
+            top_n: Documents to keep (0 disables routing)
+
+        Returns:
+            Source names, or None when every document should be searched
+        """
+        if top_n <= 0 or self.matrix is None or len(self.routed) <= top_n:
+            return None
+        scores = self.matrix @ np.asarray(embedding, dtype=np.float32)
+        best = np.argsort(-scores, kind="stable")[:top_n]
+        return [self.routed[i] for i in best] + self.unrouted
+
+    def match(self, patterns: Sequence[str]) -> List[str]:
+        """
+        Resolve user-typed document names (case-insensitive substrings)
+
+        Returns:
+            Matching source names, sorted
+        """
+        wanted = [pattern.strip().lower() for pattern in patterns if pattern.strip()]
+        return [name for name in self.names if any(pattern in name.lower() for pattern in wanted)]
@@ -0,0 +1,132 @@
+"""
+Extractive Answerer - answer from a retrieved sentence without calling the LLM
+"""
+import re
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, List, Optional, Sequence, Tuple
+import numpy as np
+
+from .chunker import split_sentences
+from .config import Config
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+# Complete statements only: headings, questions and "..." fragments make poor answers
+_COMPLETE = re.compile(r"[^.][.!][\"')\]]?$")
+
+
+class ExtractiveAnswer:
+    """A sentence picked from a retrieved chunk, with its neighbours as explanation"""
+
+    def __init__(self, doc: "Document", relevance: float, answer: str, explanation: str, score: float):
+        self.doc = doc
+        self.relevance = relevance  # Retrieval score of the chunk
+        self.answer = answer
+        self.explanation = explanation
+        self.score = score  # Cosine similarity of the answer sentence to the question
+
+    def render(self) -> str:
+        return f"Answer: {self.answer}\n\nExplanation: {self.explanation}"
+
+
+class ExtractiveAnswerer:
+    """
+    Scores every sentence of the retrieved chunks against the question.
+
+    Sentences of all chunks are embedded in one batched model call and
+    scored with a single matrix-vector product. If the best sentence
+    reaches `threshold` cosine similarity it becomes the answer, and the
+    sentences after it (or before it, at the end of a chunk) the
+    explanation. Sentence embeddings are kept per chunk in a small LRU,
+    since the same chunks come back for related questions.
+    """
+
+    # Length of sentences the tutor would quote as an answer
+    MIN_WORDS = 5
+    MAX_WORDS = 60
+    EXPLANATION_SENTENCES = 2
+    # Chunks whose sentence embeddings are kept
+    CACHE_CHUNKS = 512
+
+    def __init__(self, embed_documents: Callable[[List[str]], List[List[float]]], threshold: Optional[float] = None):
+        """
+        Args:
+            embed_documents: Batched embedding function (the model used for the chunks)
+            threshold: Minimum sentence similarity (defaults to Config.EXTRACTIVE_MIN_SCORE)
+        """
+        self.embed_documents = embed_documents
+        self.threshold = threshold if threshold is not None else Config.EXTRACTIVE_MIN_SCORE
+        self._cache = OrderedDict()  # chunk key -> (sentences, candidate indexes, normalized vectors)
+        self._lock = threading.Lock()
+
+    def _chunk_sentences(self, docs: Sequence["Document"]) -> List[Tuple[List[str], List[int], np.ndarray]]:
+        """Sentences, candidate sentence indexes and their embeddings for each chunk"""
+        keys = [doc.metadata.get("chunk_id") or doc.page_content for doc in docs]
+        with self._lock:
+            cached = {key: self._cache[key] for key in keys if key in self._cache}
+            for key in cached:
+                self._cache.move_to_end(key)
+
+        missing = {}
+        for key, doc in zip(keys, docs):
+            if key in cached or key in missing:
+                continue
+            sentences = split_sentences(doc.page_content)
+            candidates = [
+                index for index, sentence in enumerate(sentences)
+                if self.MIN_WORDS <= len(sentence.split()) <= self.MAX_WORDS and _COMPLETE.search(sentence)
+            ]
+            missing[key] = (sentences, candidates)
+
+        texts = [sentences[index] for sentences, candidates in missing.values() for index in candidates]
+        if texts:
+            vectors = np.asarray(self.embed_documents(texts), dtype=np.float32)
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        offset = 0
+        for key, (sentences, candidates) in missing.items():
+            chunk_vectors = vectors[offset:offset + len(candidates)] if candidates else np.empty((0, 0), np.float32)
+            offset += len(candidates)
+            cached[key] = (sentences, candidates, chunk_vectors)
+
+        with self._lock:
+            for key in missing:
+                self._cache[key] = cached[key]
+            while len(self._cache) > self.CACHE_CHUNKS:
+                self._cache.popitem(last=False)
+        return [cached[key] for key in keys]
+
+    def answer(self, embedding: Sequence[float], docs: List[Tuple["Document", float]]) -> Optional[ExtractiveAnswer]:
+        """
+        Pick the sentence that best answers the question
+
+        Args:
+            embedding: Question embedding
+            docs: Retrieved (document, score) pairs
+
+        Returns:
+            ExtractiveAnswer, or None if no sentence reaches the threshold
+        """
+        if not docs:
+            return None
+        chunks = self._chunk_sentences([doc for doc, _ in docs])
+        owners = [(position, index) for position, (_, candidates, _) in enumerate(chunks) for index in candidates]
+        if not owners:
+            return None
+
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        scores = np.concatenate([vectors for _, candidates, vectors in chunks if candidates]) @ query
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+
+        position, index = owners[best]
+        # Neighbouring statements explain the answer; questions in the text would not
+        sentences = [sentence if not sentence.endswith("?") else "" for sentence in chunks[position][0]]
+        following = [s for s in sentences[index + 1:index + 1 + self.EXPLANATION_SENTENCES] if s]
+        preceding = [s for s in sentences[max(0, index - self.EXPLANATION_SENTENCES):index] if s]
+        explanation = " ".join(following or preceding) or "This is stated directly in the study materials."
+        doc, relevance = docs[position]
+        return ExtractiveAnswer(doc, relevance, sentences[index], explanation, float(scores[best]))
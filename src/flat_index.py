@@ -0,0 +1,418 @@
+"""
+Flat Vector Index - brute-force search over a memory-mapped embedding matrix
+
+Layout of FLAT_INDEX_PATH:
+
+    vectors.bin   row-major float16/float32 matrix of unit-length embeddings
+    table.bin     one fixed-size record per row: text offset/length, first/last page, source
+    text.bin      chunk texts, UTF-8, back to back
+    ids.txt       chunk ids, one per line
+    deleted.bin   int64 row numbers of deleted or replaced rows
+    meta.json     dimension, dtype, source names and committed sizes
+
+Writes are appended to the data files straight away; meta.json is
+rewritten (atomically) by persist() and is the commit point - anything
+past the sizes it records is cut off when the index is next opened. The
+files are compacted once more than COMPACT_FRACTION of the rows are dead.
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .config import Config
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+TABLE_DTYPE = np.dtype([
+    ("offset", "<i8"), ("length", "<i4"), ("page", "<i4"), ("page_end", "<i4"), ("source", "<i4")
+])
+
+DTYPES = {"float16": np.float16, "float32": np.float32}
+
+
+def normalize(vectors) -> np.ndarray:
+    """Float32 copy of the rows scaled to unit length"""
+    vectors = np.array(vectors, dtype=np.float32, ndmin=2)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    return vectors
+
+
+class FlatVectorStore:
+    """Vector store backend (see vector_store.py) scanning every row per query"""
+
+    VERSION = 2
+    FILES = ("vectors.bin", "table.bin", "text.bin", "ids.txt", "deleted.bin", "meta.json")
+    # Rows converted to float32 and multiplied per step, bounding scratch memory
+    BLOCK_ROWS = 16384
+    COMPACT_FRACTION = 0.25
+
+    def __init__(self, path: Optional[str] = None, dtype: Optional[str] = None):
+        """
+        Args:
+            path: Directory holding the index files (defaults to Config.FLAT_INDEX_PATH)
+            dtype: "float16" or "float32" for new indexes (defaults to Config.FLAT_INDEX_DTYPE);
+                an existing index keeps the dtype it was built with
+        """
+        self.path = Path(path or Config.FLAT_INDEX_PATH)
+        self.default_dtype = dtype or Config.FLAT_INDEX_DTYPE
+        if self.default_dtype not in DTYPES:
+            raise ValueError(f"FLAT_INDEX_DTYPE must be one of: {', '.join(DTYPES)}")
+        self._lock = threading.RLock()
+        self._open()
+
+    # --- Files ---
+
+    def _file(self, name: str) -> Path:
+        return self.path / name
+
+    def _empty_meta(self) -> Dict:
+        return {
+            "version": self.VERSION,
+            "dim": None,
+            "dtype": self.default_dtype,
+            "rows": 0,
+            "text_bytes": 0,
+            "ids_bytes": 0,
+            "deleted": 0,
+            "sources": [],
+        }
+
+    def _open(self):
+        """Map the committed part of the index files"""
+        meta = None
+        meta_path = self._file("meta.json")
+        if meta_path.exists():
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                if meta.get("version") != self.VERSION:
+                    meta = None
+            except (OSError, ValueError):
+                meta = None
+        self.meta = meta or self._empty_meta()
+        self._dtype = np.dtype(DTYPES[self.meta["dtype"]])
+        self._source_names = list(self.meta["sources"])
+        self._sources = {name: index for index, name in enumerate(self._source_names)}
+
+        if meta is None:
+            self._unmap()
+            self._remove_files()
+        else:
+            self._truncate_uncommitted()
+
+        self._rows = self.meta["rows"]
+        self._text_bytes = self.meta["text_bytes"]
+        self._ids_bytes = self.meta["ids_bytes"]
+        self._deleted = self.meta["deleted"]
+
+        ids_path = self._file("ids.txt")
+        self.ids = ids_path.read_text(encoding="utf-8").split("\n")[:self._rows] if self._rows else []
+        self.alive = np.ones(self._rows, dtype=bool)
+        if self._deleted:
+            dead = np.fromfile(self._file("deleted.bin"), dtype="<i8", count=self._deleted)
+            self.alive[dead] = False
+        self._row_of = None  # chunk id -> live row, built on first write
+        self._remap()
+
+    def _committed_sizes(self) -> Dict[str, int]:
+        """Byte size of each data file as of the last persist()"""
+        dim = self.meta["dim"] or 0
+        return {
+            "vectors.bin": self.meta["rows"] * dim * self._dtype.itemsize,
+            "table.bin": self.meta["rows"] * TABLE_DTYPE.itemsize,
+            "text.bin": self.meta["text_bytes"],
+            "ids.txt": self.meta["ids_bytes"],
+            "deleted.bin": self.meta["deleted"] * 8,
+        }
+
+    def _truncate_uncommitted(self):
+        """Cut data appended after the last persist() (e.g. by an interrupted load)"""
+        for name, size in self._committed_sizes().items():
+            file_path = self._file(name)
+            if file_path.exists() and file_path.stat().st_size != size:
+                with open(file_path, "r+b") as f:
+                    f.truncate(size)
+
+    def _remap(self):
+        """(Re)create the memory maps after rows were appended"""
+        self._shards = None
+        dim = self.meta["dim"]
+        if not self._rows or not dim:
+            self._unmap()
+            return
+        self._vectors = np.memmap(self._file("vectors.bin"), dtype=self._dtype, mode="r", shape=(self._rows, dim))
+        self._table = np.memmap(self._file("table.bin"), dtype=TABLE_DTYPE, mode="r", shape=(self._rows,))
+        self._text = (
+            np.memmap(self._file("text.bin"), dtype=np.uint8, mode="r", shape=(self._text_bytes,))
+            if self._text_bytes else np.zeros(0, dtype=np.uint8)
+        )
+
+    def _unmap(self):
+        self._vectors = None
+        self._table = None
+        self._text = None
+
+    def _remove_files(self):
+        for name in self.FILES:
+            file_path = self._file(name)
+            if file_path.exists():
+                file_path.unlink()
+
+    def persist(self):
+        """Commit everything written so far by atomically rewriting meta.json"""
+        with self._lock:
+            if self._deleted > max(1000, self.COMPACT_FRACTION * self._rows):
+                self._compact()
+            self.meta.update({
+                "rows": self._rows,
+                "text_bytes": self._text_bytes,
+                "ids_bytes": self._ids_bytes,
+                "deleted": self._deleted,
+                "sources": list(self._source_names),
+            })
+            self.path.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._file("meta.json.tmp")
+            tmp_path.write_text(json.dumps(self.meta), encoding="utf-8")
+            os.replace(tmp_path, self._file("meta.json"))
+
+    def _compact(self):
+        """Rewrite the data files without dead rows"""
+        live = np.flatnonzero(self.alive)
+        tmp = {name: self._file(name + ".tmp") for name in ("vectors.bin", "table.bin", "text.bin", "ids.txt")}
+        offset = 0
+        ids_bytes = 0
+        with open(tmp["vectors.bin"], "wb") as vectors_out, open(tmp["table.bin"], "wb") as table_out, \
+                open(tmp["text.bin"], "wb") as text_out, open(tmp["ids.txt"], "wb") as ids_out:
+            for start in range(0, len(live), self.BLOCK_ROWS):
+                rows = live[start:start + self.BLOCK_ROWS]
+                np.ascontiguousarray(self._vectors[rows]).tofile(vectors_out)
+                table = np.array(self._table[rows])
+                for start_byte, length in zip(table["offset"], table["length"]):
+                    text_out.write(self._text[start_byte:start_byte + length].tobytes())
+                ends = offset + np.cumsum(table["length"], dtype=np.int64)
+                table["offset"] = ends - table["length"]
+                offset = int(ends[-1])
+                table.tofile(table_out)
+                ids = "".join(self.ids[row] + "\n" for row in rows).encode("utf-8")
+                ids_out.write(ids)
+                ids_bytes += len(ids)
+
+        # Without meta.json a crash mid-swap leaves an empty index (rebuilt by
+        # the next load) rather than files that disagree with their sizes
+        self._unmap()
+        self._file("meta.json").unlink(missing_ok=True)
+        for name, tmp_path in tmp.items():
+            os.replace(tmp_path, self._file(name))
+        deleted_path = self._file("deleted.bin")
+        if deleted_path.exists():
+            deleted_path.unlink()
+
+        self.ids = [self.ids[row] for row in live]
+        self._rows = len(live)
+        self._text_bytes = offset
+        self._ids_bytes = ids_bytes
+        self._deleted = 0
+        self.alive = np.ones(self._rows, dtype=bool)
+        self._row_of = None
+        self._remap()
+
+    # --- Writes ---
+
+    def _rows_by_id(self) -> Dict[str, int]:
+        if self._row_of is None:
+            self._row_of = {self.ids[row]: int(row) for row in np.flatnonzero(self.alive)}
+        return self._row_of
+
+    def _mark_deleted(self, rows: List[int]):
+        if not rows:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self._file("deleted.bin"), "ab") as f:
+            np.asarray(rows, dtype="<i8").tofile(f)
+        self.alive[rows] = False
+        self._deleted += len(rows)
+
+    def _source_index(self, name: str) -> int:
+        if name not in self._sources:
+            self._sources[name] = len(self._source_names)
+            self._source_names.append(name)
+        return self._sources[name]
+
+    def upsert(self, ids: List[str], embeddings: List[List[float]], documents: List[str], metadatas: List[Dict]):
+        """Append chunks, replacing any stored under the same ids"""
+        if not ids:
+            return
+        vectors = normalize(embeddings)
+
+        with self._lock:
+            if self.meta["dim"] is None:
+                self.meta["dim"] = vectors.shape[1]
+            elif vectors.shape[1] != self.meta["dim"]:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match index ({self.meta['dim']})")
+
+            row_of = self._rows_by_id()
+            self._mark_deleted([row_of[chunk_id] for chunk_id in ids if chunk_id in row_of])
+
+            table = np.zeros(len(ids), dtype=TABLE_DTYPE)
+            texts = []
+            offset = self._text_bytes
+            for index, (text, metadata) in enumerate(zip(documents, metadatas)):
+                encoded = text.encode("utf-8")
+                texts.append(encoded)
+                table[index] = (
+                    offset,
+                    len(encoded),
+                    metadata.get("page", -1),
+                    metadata.get("page_end", -1),
+                    self._source_index(metadata.get("source", "")),
+                )
+                offset += len(encoded)
+            id_bytes = "".join(chunk_id + "\n" for chunk_id in ids).encode("utf-8")
+
+            self.path.mkdir(parents=True, exist_ok=True)
+            with open(self._file("vectors.bin"), "ab") as f:
+                vectors.astype(self._dtype).tofile(f)
+            with open(self._file("table.bin"), "ab") as f:
+                table.tofile(f)
+            with open(self._file("text.bin"), "ab") as f:
+                f.write(b"".join(texts))
+            with open(self._file("ids.txt"), "ab") as f:
+                f.write(id_bytes)
+
+            for index, chunk_id in enumerate(ids):
+                row_of[chunk_id] = self._rows + index
+            self.ids.extend(ids)
+            self.alive = np.concatenate([self.alive, np.ones(len(ids), dtype=bool)])
+            self._appended(vectors)
+            self._rows += len(ids)
+            self._text_bytes = offset
+            self._ids_bytes += len(id_bytes)
+            self._remap()
+
+    def _appended(self, vectors: np.ndarray):
+        """Hook for subclasses: rows starting at self._rows were just written"""
+
+    def delete(self, ids: List[str]):
+        with self._lock:
+            row_of = self._rows_by_id()
+            self._mark_deleted([row_of.pop(chunk_id) for chunk_id in ids if chunk_id in row_of])
+
+    def reset(self):
+        """Remove every chunk and the files on disk"""
+        with self._lock:
+            self._unmap()
+            self._remove_files()
+            self._open()
+
+    # --- Reads ---
+
+    def count(self) -> int:
+        return self._rows - self._deleted
+
+    def _document(self, row: int, table, text, ids) -> "Document":
+        from langchain_core.documents import Document
+
+        record = table[row]
+        offset, length = int(record["offset"]), int(record["length"])
+        metadata = {"source": self._source_names[record["source"]]}
+        if record["page"] >= 0:
+            metadata["page"] = int(record["page"])
+        if record["page_end"] >= 0:
+            metadata["page_end"] = int(record["page_end"])
+        metadata["chunk_id"] = ids[row]
+        return Document(page_content=text[offset:offset + length].tobytes().decode("utf-8"), metadata=metadata)
+
+    def get_all(self) -> Tuple[List[str], List[str], List[Dict]]:
+        with self._lock:
+            ids, texts, metadatas = [], [], []
+            for row in np.flatnonzero(self.alive):
+                doc = self._document(int(row), self._table, self._text, self.ids)
+                ids.append(doc.metadata["chunk_id"])
+                texts.append(doc.page_content)
+                metadatas.append(doc.metadata)
+            return ids, texts, metadatas
+
+    def search(
+        self,
+        embedding: Sequence[float],
+        k: int,
+        sources: Optional[Sequence[str]] = None
+    ) -> List[Tuple["Document", float]]:
+        return self.search_batch([embedding], k, sources)[0]
+
+    def _shard_rows(self, sources: Sequence[str]) -> np.ndarray:
+        """Rows (including deleted ones) belonging to the given source documents"""
+        if self._shards is None:
+            # Rows grouped by source, rebuilt after writes
+            source_of = np.asarray(self._table["source"]) if self._table is not None else np.zeros(0, dtype=np.int32)
+            order = np.argsort(source_of, kind="stable")
+            bounds = np.searchsorted(source_of[order], np.arange(len(self._source_names) + 1))
+            self._shards = [order[bounds[i]:bounds[i + 1]] for i in range(len(self._source_names))]
+        parts = []
+        for name in sources:
+            index = self._sources.get(name)
+            if index is not None and index < len(self._shards):
+                parts.append(self._shards[index])
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    def search_batch(
+        self,
+        embeddings: Sequence[Sequence[float]],
+        k: int,
+        sources: Optional[Sequence[str]] = None
+    ) -> List[List[Tuple["Document", float]]]:
+        """
+        Exact top-k by cosine similarity for several queries at once
+
+        Args:
+            embeddings: Query embeddings (normalized here)
+            k: Results per query
+            sources: Only search chunks of these source documents (None = all)
+
+        Returns:
+            One list of (document, cosine similarity) per query, best first
+        """
+        queries = normalize(embeddings)
+
+        with self._lock:
+            # Snapshot so concurrent writes cannot change the arrays mid-scan
+            vectors, table, text, ids, alive = self._vectors, self._table, self._text, self.ids, self.alive
+            live = self.count()
+            rows = self._shard_rows(sources) if sources is not None else None
+        if vectors is None or not live or k <= 0:
+            return [[] for _ in queries]
+
+        if rows is None:
+            columns = None
+            scores = np.empty((len(queries), vectors.shape[0]), dtype=np.float32)
+            for start in range(0, vectors.shape[0], self.BLOCK_ROWS):
+                block = np.asarray(vectors[start:start + self.BLOCK_ROWS], dtype=np.float32)
+                scores[:, start:start + len(block)] = queries @ block.T
+            if live < vectors.shape[0]:
+                scores[:, ~alive[:vectors.shape[0]]] = -np.inf
+        else:
+            # Only the selected shards are read from the memory map
+            columns = np.sort(rows[alive[rows]])
+            live = len(columns)
+            if not live:
+                return [[] for _ in queries]
+            scores = np.empty((len(queries), live), dtype=np.float32)
+            for start in range(0, live, self.BLOCK_ROWS):
+                block = np.asarray(vectors[columns[start:start + self.BLOCK_ROWS]], dtype=np.float32)
+                scores[:, start:start + len(block)] = queries @ block.T
+
+        k = min(k, live)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for query_index, candidates in enumerate(top):
+            ordered = candidates[np.argsort(-scores[query_index, candidates], kind="stable")]
+            results.append([
+                (
+                    self._document(int(column if columns is None else columns[column]), table, text, ids),
+                    float(scores[query_index, column])
+                )
+                for column in ordered
+            ])
+        return results
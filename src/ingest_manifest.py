@@ -0,0 +1,173 @@
+"""
+Ingestion Manifest - tracks which PDFs are already embedded in the vector store
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from .config import Config
+
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    """Compute the SHA-256 hex digest of a file without reading it all at once"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestManifest:
+    """
+    Persisted record of every PDF ingested into the vector store.
+
+    Each entry stores the file's size, mtime, content hash and the ids of the
+    chunks it produced, so a later `load` can skip unchanged files, replace
+    the chunks of changed ones and purge files that no longer exist. The
+    chunking parameters and embedding model are stored alongside; if they
+    differ from the current Config the whole store must be rebuilt.
+    """
+
+    VERSION = 1
+
+    # File states reported by check()
+    NEW = "new"
+    CHANGED = "changed"
+    UNCHANGED = "unchanged"
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or Config.MANIFEST_PATH)
+        self.settings: Dict = {}
+        self.files: Dict[str, Dict] = {}
+        self._load()
+
+    @staticmethod
+    def current_settings() -> Dict:
+        """Settings that invalidate every stored chunk when they change"""
+        settings = {
+            "version": IngestManifest.VERSION,
+            "chunk_size": Config.CHUNK_SIZE,
+            "chunk_overlap": Config.CHUNK_OVERLAP,
+            "embedding_model": Config.EMBEDDING_MODEL,
+            "vector_backend": Config.VECTOR_BACKEND,
+        }
+        # Recorded only for the opt-in chunker, so existing recursive stores still match
+        if Config.CHUNKER != "recursive":
+            settings.update({
+                "chunker": Config.CHUNKER,
+                "chunk_tokens": Config.CHUNK_TOKENS,
+                "chunk_overlap_tokens": Config.CHUNK_OVERLAP_TOKENS,
+                "chunk_across_pages": Config.CHUNK_ACROSS_PAGES,
+            })
+        return settings
+
+    @staticmethod
+    def key_for(pdf_path: Path) -> str:
+        """Stable manifest key for a PDF path"""
+        return str(Path(pdf_path).resolve())
+
+    def _load(self):
+        """Read the manifest from disk, starting empty if missing or corrupt"""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.settings = data.get("settings", {})
+            self.files = data.get("files", {})
+        except (OSError, ValueError):
+            self.settings = {}
+            self.files = {}
+
+    def save(self):
+        """Atomically write the manifest next to the vector store"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"settings": self.settings, "files": self.files}, f, indent=2)
+        tmp_path.replace(self.path)
+
+    def settings_match(self) -> bool:
+        """Check whether stored chunks were built with the current settings"""
+        return self.settings == self.current_settings()
+
+    def reset(self):
+        """Forget every file and adopt the current settings"""
+        self.settings = self.current_settings()
+        self.files = {}
+
+    def check(self, pdf_path: Path) -> Tuple[str, Optional[str]]:
+        """
+        Compare a PDF on disk against its manifest entry.
+
+        Size and mtime are checked first; the file is only hashed when they
+        differ, so an unchanged directory costs one stat() per file.
+
+        Args:
+            pdf_path: Path to PDF file
+
+        Returns:
+            Tuple of (state, content hash or None if not computed)
+        """
+        entry = self.files.get(self.key_for(pdf_path))
+        stat = Path(pdf_path).stat()
+
+        if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            return self.UNCHANGED, entry["sha256"]
+
+        digest = file_sha256(pdf_path)
+        if entry is None:
+            return self.NEW, digest
+
+        if entry["sha256"] == digest:
+            # Touched but identical - refresh the stat fields only
+            entry["size"] = stat.st_size
+            entry["mtime"] = stat.st_mtime
+            return self.UNCHANGED, digest
+
+        return self.CHANGED, digest
+
+    def record(
+        self,
+        pdf_path: Path,
+        digest: str,
+        chunk_ids: List[str],
+        pages: int,
+        centroid: Optional[List[float]] = None
+    ):
+        """Store the result of ingesting a PDF, with the normalized mean of its chunk embeddings"""
+        stat = Path(pdf_path).stat()
+        self.files[self.key_for(pdf_path)] = {
+            "name": Path(pdf_path).name,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "sha256": digest,
+            "pages": pages,
+            "chunk_ids": chunk_ids,
+            "centroid": centroid,
+        }
+
+    def chunk_ids(self, pdf_path: Path) -> List[str]:
+        """Chunk ids currently stored for a PDF"""
+        entry = self.files.get(self.key_for(pdf_path))
+        return list(entry["chunk_ids"]) if entry else []
+
+    def remove(self, key: str) -> List[str]:
+        """Drop a manifest entry and return the chunk ids it owned"""
+        entry = self.files.pop(key, None)
+        return list(entry["chunk_ids"]) if entry else []
+
+    def missing_files(self) -> List[str]:
+        """Manifest keys whose PDF no longer exists on disk"""
+        return [key for key in self.files if not Path(key).exists()]
+
+    def documents(self) -> List[Dict]:
+        """Name, chunk count and centroid (None if unknown) of every ingested PDF"""
+        return [
+            {"name": entry["name"], "chunks": len(entry["chunk_ids"]), "centroid": entry.get("centroid")}
+            for entry in self.files.values()
+        ]
+
+    def total_chunks(self) -> int:
+        """Number of chunks recorded across all files"""
+        return sum(len(entry["chunk_ids"]) for entry in self.files.values())
@@ -0,0 +1,328 @@
+"""
+Streaming ingestion: page ranges -> chunks -> embedding batches -> vector store
+
+Each stage runs in its own thread and hands work to the next through a
+bounded queue, so a slow stage makes the ones before it wait instead of
+buffering. Memory therefore stays roughly constant - a few page ranges,
+queued chunk lists and embedding batches - however many PDFs are loaded,
+and each batch is searchable as soon as it is stored.
+"""
+import hashlib
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+
+from .config import Config
+from .ingest_manifest import IngestManifest
+from .telemetry import telemetry
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+    from .pdf_processor import PDFProcessor
+
+_DONE = object()
+
+
+class _Stopped(Exception):
+    """Raised inside a stage thread when the pipeline is shutting down"""
+
+
+def chunk_id_prefix(pdf_path: Path, digest: str) -> str:
+    """
+    Prefix of a PDF's chunk ids.
+
+    Ids are derived from the path and content hash so re-ingesting is
+    idempotent and identical PDFs at different paths do not collide.
+    """
+    return hashlib.sha256(f"{IngestManifest.key_for(pdf_path)}:{digest}".encode()).hexdigest()[:16]
+
+
+class IngestPipeline:
+    """Streams PDFs (or already extracted pages) into a PDFProcessor's stores"""
+
+    # Seconds between progress lines while a load is running
+    PROGRESS_INTERVAL = 5.0
+
+    def __init__(
+        self,
+        processor: "PDFProcessor",
+        embed_batch: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        verbose: bool = False
+    ):
+        """
+        Args:
+            processor: Processor whose vector store, BM25 index and manifest are updated
+            embed_batch: Chunks per embedding call and vector store upsert
+            queue_size: Items held between two stages before the earlier one waits
+            verbose: Report per-page OCR activity
+        """
+        self.processor = processor
+        self.embed_batch = min(embed_batch or Config.INGEST_EMBED_BATCH, processor.ADD_BATCH_SIZE)
+        self.queue_size = queue_size or Config.INGEST_QUEUE_SIZE
+        self.verbose = verbose
+        self._stop = threading.Event()
+
+    # --- Sources (run in the first stage thread) ---
+
+    def _pdf_items(self, pending: List[Tuple[Path, str]]) -> Iterator[Tuple]:
+        """Extract, OCR and split PDFs one page range at a time"""
+        from . import pdf_extractor
+
+        digests = dict(pending)
+        chunkers = {}  # pdf_path -> chunker; chunks may continue across page ranges
+        failed = set()
+        ranges = telemetry.timed_iter(
+            "load.extract", self.processor.extractor.iter_ranges([pdf_path for pdf_path, _ in pending])
+        )
+        for pdf_path, pages, error, last in ranges:
+            if pdf_path in failed:
+                continue
+            if error:
+                failed.add(pdf_path)
+                chunkers.pop(pdf_path, None)
+                yield ("error", pdf_path, error)
+                continue
+
+            pages, ocr_stats = self.processor.apply_ocr(pdf_path, digests[pdf_path], pages)
+            if self.verbose:
+                self._report_pages(pages, ocr_stats)
+
+            documents = pdf_extractor.pages_to_documents(pdf_path, pages)
+            if pdf_path not in chunkers:
+                chunkers[pdf_path] = self.processor.new_chunker()
+            with telemetry.span("load.split"):
+                chunks = chunkers[pdf_path].feed(documents)
+                if last:
+                    chunks += chunkers.pop(pdf_path).finish()
+            yield ("chunks", pdf_path, digests[pdf_path], chunks, len(documents), ocr_stats, last)
+
+    def _document_items(self, pdf_path: Path, digest: str, documents: List["Document"]) -> Iterator[Tuple]:
+        """Split page documents that were extracted elsewhere"""
+        chunker = self.processor.new_chunker()
+        with telemetry.span("load.split"):
+            chunks = chunker.feed(documents) + chunker.finish()
+        yield ("chunks", pdf_path, digest, chunks, len(documents), {}, True)
+
+    def _report_pages(self, pages: List, ocr_stats: Dict[str, int]):
+        from . import pdf_extractor
+
+        for page_num, _, state in pages:
+            if state == pdf_extractor.OCR:
+                print(f"Page {page_num + 1}: No text found, extracted with OCR")
+            elif state == pdf_extractor.BLANK:
+                print(f"Page {page_num + 1}: Blank page, skipped")
+            elif state == pdf_extractor.EMPTY and not self.processor.tesseract_available:
+                print(f"Page {page_num + 1}: No text found and OCR (Tesseract) is not installed.")
+        if ocr_stats["cached"]:
+            print(f"OCR results reused from cache: {ocr_stats['cached']} page(s)")
+
+    # --- Stages ---
+
+    def _put(self, outbox: queue.Queue, item):
+        """Block until the next stage has room, giving up if the pipeline stops"""
+        while not self._stop.is_set():
+            try:
+                outbox.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise _Stopped()
+
+    def _get(self, inbox: queue.Queue):
+        """Wait for the previous stage's next item, giving up if the pipeline stops"""
+        while not self._stop.is_set():
+            try:
+                return inbox.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        raise _Stopped()
+
+    def _stage(self, target, *args):
+        """Run a stage body, passing any failure downstream so the caller can raise it"""
+        outbox = args[-1]
+        try:
+            target(*args)
+        except _Stopped:
+            return
+        except BaseException as e:
+            try:
+                self._put(outbox, ("fatal", e))
+            except _Stopped:
+                return
+        try:
+            self._put(outbox, _DONE)
+        except _Stopped:
+            pass
+
+    def _source_stage(self, items: Iterator[Tuple], outbox: queue.Queue):
+        for item in items:
+            self._put(outbox, item)
+
+    def _embed_stage(self, inbox: queue.Queue, outbox: queue.Queue):
+        """Number chunks per PDF and embed them in fixed-size batches"""
+        state = {}  # pdf_path -> [prefix, next index, buffered chunks, pages, ocr stats]
+
+        def flush(pdf_path: Path, chunks: List["Document"]):
+            prefix, start = state[pdf_path][0], state[pdf_path][1]
+            ids = [f"{prefix}:{start + i}" for i in range(len(chunks))]
+            state[pdf_path][1] += len(chunks)
+            texts = [chunk.page_content for chunk in chunks]
+            metadatas = []
+            for chunk_id, chunk in zip(ids, chunks):
+                chunk.metadata["chunk_id"] = chunk_id
+                metadatas.append(chunk.metadata)
+            with telemetry.span("load.embed"):
+                vectors = self.processor.embeddings.embed_documents(texts)
+            self._put(outbox, ("batch", pdf_path, ids, texts, metadatas, vectors))
+
+        while True:
+            item = self._get(inbox)
+            if item is _DONE:
+                return
+            if item[0] != "chunks":
+                # Errors are forwarded; chunks of that PDF already sent are dropped downstream
+                state.pop(item[1], None)
+                self._put(outbox, item)
+                continue
+
+            _, pdf_path, digest, chunks, pages, ocr_stats, last = item
+            if pdf_path not in state:
+                state[pdf_path] = [chunk_id_prefix(pdf_path, digest), 0, [], 0, {}]
+            entry = state[pdf_path]
+            entry[2].extend(chunks)
+            entry[3] += pages
+            for name, count in ocr_stats.items():
+                entry[4][name] = entry[4].get(name, 0) + count
+
+            while len(entry[2]) >= self.embed_batch:
+                batch, entry[2] = entry[2][:self.embed_batch], entry[2][self.embed_batch:]
+                flush(pdf_path, batch)
+            if last:
+                if entry[2]:
+                    flush(pdf_path, entry[2])
+                state.pop(pdf_path)
+                self._put(outbox, ("done", pdf_path, digest, entry[3], entry[1], entry[4]))
+
+    def _store(self, inbox: queue.Queue) -> Dict[Path, Dict]:
+        """Upsert embedded batches and record finished PDFs (runs in the calling thread)"""
+        processor = self.processor
+        results = {}
+        written = {}  # pdf_path -> chunk ids stored so far
+        vector_sums = {}  # pdf_path -> sum of its chunk embeddings (document centroid)
+        pdfs_done = 0
+        chunks_done = 0
+        started = time.perf_counter()
+        last_report = started
+
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                return results
+            kind = item[0]
+            if kind == "fatal":
+                raise item[1]
+
+            if kind == "batch":
+                _, pdf_path, ids, texts, metadatas, vectors = item
+                with telemetry.span("load.store"):
+                    processor.vectorstore.upsert(ids, vectors, texts, metadatas)
+                for chunk_id, text, metadata in zip(ids, texts, metadatas):
+                    processor.lexical_index.add(chunk_id, text, metadata)
+                written.setdefault(pdf_path, []).extend(ids)
+                batch_sum = np.asarray(vectors, dtype=np.float64).sum(axis=0)
+                vector_sums[pdf_path] = vector_sums.get(pdf_path, 0.0) + batch_sum
+                chunks_done += len(ids)
+
+                now = time.perf_counter()
+                if now - last_report >= self.PROGRESS_INTERVAL:
+                    rate = chunks_done / (now - started)
+                    print(f"  Progress: {pdfs_done} PDF(s) done, {chunks_done} chunks stored ({rate:.0f} chunks/s)")
+                    last_report = now
+                continue
+
+            pdf_path = item[1]
+            new_ids = written.pop(pdf_path, [])
+            vector_sum = vector_sums.pop(pdf_path, None)
+            if kind == "error":
+                # Keep the previous version searchable rather than half of the new one
+                old_ids = set(processor.manifest.chunk_ids(pdf_path))
+                processor.delete_chunks([chunk_id for chunk_id in new_ids if chunk_id not in old_ids])
+                results[pdf_path] = {"pages": 0, "chunks": 0, "error": item[2], "ocr": {}}
+                continue
+
+            _, pdf_path, digest, pages, chunk_count, ocr_stats = item
+            results[pdf_path] = {"pages": pages, "chunks": chunk_count, "error": None, "ocr": ocr_stats}
+            if not chunk_count:
+                continue
+
+            # The new version is complete; drop chunks of the previous one
+            current = set(new_ids)
+            processor.delete_chunks(
+                [chunk_id for chunk_id in processor.manifest.chunk_ids(pdf_path) if chunk_id not in current]
+            )
+            centroid = vector_sum / max(np.linalg.norm(vector_sum), 1e-12)
+            processor.manifest.record(pdf_path, digest, new_ids, pages, centroid.round(5).tolist())
+            pdfs_done += 1
+
+            # Persist progress so an interrupted load resumes where it stopped
+            # (the BM25 index is resynchronized from the store if it lags)
+            with telemetry.span("load.persist"):
+                processor.vectorstore.persist()
+                processor.manifest.save()
+
+    def run(self, items: Iterator[Tuple]) -> Dict[Path, Dict]:
+        """
+        Drive items from a source through the embed and store stages.
+
+        Args:
+            items: Iterator of ("chunks", ...) and ("error", ...) tuples
+
+        Returns:
+            Per-PDF results: {"pages", "chunks", "error", "ocr"}
+        """
+        self._stop.clear()
+        chunk_queue = queue.Queue(maxsize=self.queue_size)
+        batch_queue = queue.Queue(maxsize=self.queue_size)
+        threads = [
+            threading.Thread(
+                target=self._stage, args=(self._source_stage, items, chunk_queue),
+                name="edubridge-ingest-split", daemon=True
+            ),
+            threading.Thread(
+                target=self._stage, args=(self._embed_stage, chunk_queue, batch_queue),
+                name="edubridge-ingest-embed", daemon=True
+            ),
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            return self._store(batch_queue)
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+    def ingest(self, pending: List[Tuple[Path, str]]) -> Dict[Path, Dict]:
+        """
+        Stream new or changed PDFs into the stores.
+
+        Args:
+            pending: (pdf_path, content digest) pairs
+
+        Returns:
+            Per-PDF results: {"pages", "chunks", "error", "ocr"}
+        """
+        return self.run(self._pdf_items(pending))
+
+    def index_documents(self, pdf_path: Path, digest: str, documents: List["Document"]) -> int:
+        """
+        Replace the stored chunks of a PDF with already extracted page documents.
+
+        Returns:
+            Number of chunks stored
+        """
+        return self.run(self._document_items(pdf_path, digest, documents))[pdf_path]["chunks"]
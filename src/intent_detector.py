@@ -1,8 +1,10 @@
 """
 Intent Detection and Question Classification
 """
+import re
 from enum import Enum
-from typing import Tuple
+from typing import Dict, Iterable, Optional, Tuple
+from .config import Config
 
 
 class IntentType(Enum):
@@ -13,6 +15,50 @@ class IntentType(Enum):
     SYSTEM = "system"          # Commands like load, help, exit
 
 
+def _trie_pattern(phrases: Iterable[str]) -> str:
+    """
+    Regex alternation factored by common prefixes ("code", "concept of" -> "co(?:de|ncept of)")
+    
+    At each input position the regex engine then follows at most one branch
+    per character, so matching costs O(len(input)) however many phrases there are.
+    """
+    trie: Dict = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}  # End of a phrase
+    
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if "" in node:
+            # A phrase ends here but longer ones continue: greedy optional tail
+            return "(?:" + "|".join(branches) + ")?"
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    
+    return build(trie)
+
+
+class IntentPlan:
+    """How a question of one intent is answered: retrieval depth, context budget and model"""
+    
+    def __init__(
+        self,
+        top_k: int,
+        context_budget: int,
+        model: str,
+        fallback_model: Optional[str] = None,
+        extractive: bool = False
+    ):
+        self.top_k = top_k
+        self.context_budget = context_budget
+        self.model = model
+        self.fallback_model = fallback_model  # Larger model to escalate to, if model is the fast one
+        self.extractive = extractive  # Try answering with a retrieved sentence before the LLM
+
+
 class IntentDetector:
     """Detects user intent from CLI input"""
     
@@ -36,6 +82,17 @@ class IntentDetector:
         "clear": "clear_context"
     }
     
+    # Question intents in priority order, used when keywords of several match
+    KEYWORD_PRIORITY = [IntentType.CONCEPTUAL, IntentType.TECHNICAL]
+    
+    def __init__(self):
+        self.keyword_intents = {}
+        for intent, keywords in ((IntentType.TECHNICAL, self.TECHNICAL_KEYWORDS),
+                                 (IntentType.CONCEPTUAL, self.CONCEPTUAL_KEYWORDS)):
+            self.keyword_intents.update((keyword, intent) for keyword in keywords)
+        # One compiled pass over the input finds every keyword; keywords start at a word boundary
+        self.keyword_pattern = re.compile(r"\b" + _trie_pattern(self.keyword_intents))
+    
     def detect(self, user_input: str) -> Tuple[IntentType, str]:
         """
         Detect intent from user input
@@ -54,17 +111,53 @@ class IntentDetector:
         if first_word in self.SYSTEM_COMMANDS:
             return IntentType.SYSTEM, user_input
         
-        # Check for conceptual questions
-        if any(kw in lower_input for kw in self.CONCEPTUAL_KEYWORDS):
-            return IntentType.CONCEPTUAL, user_input
-        
-        # Check for technical questions
-        if any(kw in lower_input for kw in self.TECHNICAL_KEYWORDS):
-            return IntentType.TECHNICAL, user_input
+        # Conceptual keywords win over technical ones
+        found = set()
+        for match in self.keyword_pattern.finditer(lower_input):
+            intent = self.keyword_intents[match.group()]
+            if intent == self.KEYWORD_PRIORITY[0]:
+                return intent, user_input
+            found.add(intent)
+        for intent in self.KEYWORD_PRIORITY:
+            if intent in found:
+                return intent, user_input
         
         # Default to PDF-based if PDF is loaded
         return IntentType.PDF_BASED, user_input
     
+    def plan(self, intent: IntentType, query: str) -> IntentPlan:
+        """
+        Choose retrieval depth, context budget and model for a question
+        
+        Conceptual questions may be answered extractively (Config.EXTRACTIVE_ANSWERS),
+        and short ones go to Config.FAST_MODEL, if one is set, with
+        Config.OLLAMA_MODEL as the model to escalate to.
+        
+        Args:
+            intent: Detected intent
+            query: Processed question
+            
+        Returns:
+            IntentPlan for the question
+        """
+        if intent == IntentType.CONCEPTUAL:
+            top_k, budget = Config.CONCEPTUAL_TOP_K, Config.CONCEPTUAL_CONTEXT_BUDGET
+        elif intent == IntentType.TECHNICAL:
+            top_k, budget = Config.TECHNICAL_TOP_K, Config.TECHNICAL_CONTEXT_BUDGET
+        else:
+            top_k, budget = Config.MAX_CONTEXT_DOCS, Config.CONTEXT_TOKEN_BUDGET
+        
+        extractive = Config.EXTRACTIVE_ANSWERS and intent == IntentType.CONCEPTUAL
+        fast = (
+            Config.FAST_MODEL
+            and Config.FAST_MODEL != Config.OLLAMA_MODEL
+            and intent == IntentType.CONCEPTUAL
+            and len(query.split()) <= Config.FAST_MODEL_MAX_WORDS
+        )
+        if fast:
+            return IntentPlan(top_k, budget, Config.FAST_MODEL, Config.OLLAMA_MODEL, extractive)
+        return IntentPlan(top_k, budget, Config.OLLAMA_MODEL, extractive=extractive)
+    
     def is_system_command(self, user_input: str) -> Tuple[bool, str]:
         """
         Check if input is a system command
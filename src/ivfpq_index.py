@@ -0,0 +1,368 @@
+"""
+IVF-PQ Vector Index - compressed approximate search for very large corpora
+
+Builds on the flat index files (which keep full vectors on disk for
+re-ranking) and adds, per row, the coarse cluster it belongs to and a
+product-quantized code of its residual from that cluster's centroid:
+
+    lists.bin        int32 coarse cluster of each row
+    codes.bin        uint8 PQ code of each row (IVFPQ_M bytes)
+    ivfpq_model.npz  coarse centroids and PQ codebooks
+
+Of the vector data only the codes and cluster ids stay in RAM (IVFPQ_M +
+4 bytes per chunk instead of 4 bytes per dimension). A query scans the IVFPQ_NPROBE closest
+clusters with asymmetric distance computation - the query is never
+quantized; its dot products with every codebook entry are tabulated once
+and each row's score is a sum of IVFPQ_M table lookups - then re-ranks the
+best IVFPQ_SHORTLIST candidates exactly from the memory-mapped vectors.
+
+The model is trained when the index is persisted with at least
+IVFPQ_MIN_TRAIN rows, and retrained once the corpus has grown fourfold;
+until then searches fall back to the exact flat scan.
+"""
+import os
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .config import Config
+from .flat_index import FlatVectorStore, normalize
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+CODEBOOK_SIZE = 256  # Entries per sub-quantizer, so each code fits in a byte
+
+
+def _nearest(data: np.ndarray, centroids: np.ndarray, block: int = 8192) -> np.ndarray:
+    """Index of the closest centroid (L2) for each row"""
+    norms = (centroids ** 2).sum(axis=1)
+    assignment = np.empty(len(data), dtype=np.int32)
+    for start in range(0, len(data), block):
+        scores = norms - 2.0 * (data[start:start + block] @ centroids.T)
+        assignment[start:start + block] = np.argmin(scores, axis=1)
+    return assignment
+
+
+def kmeans(data: np.ndarray, k: int, iterations: int = 15, seed: int = 0) -> np.ndarray:
+    """
+    Lloyd's k-means with empty clusters re-seeded from random rows
+
+    Args:
+        data: (n, d) float32 training rows, n >= k
+        k: Number of centroids
+        iterations: Assignment/update rounds
+
+    Returns:
+        (k, d) float32 centroids
+    """
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(len(data), k, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = _nearest(data, centroids)
+        counts = np.bincount(assignment, minlength=k)
+        # Sum each cluster's rows in one pass over the rows sorted by cluster
+        order = np.argsort(assignment, kind="stable")
+        starts = np.flatnonzero(np.r_[True, np.diff(assignment[order]) != 0])
+        clusters = assignment[order][starts]
+        centroids[clusters] = np.add.reduceat(data[order], starts, axis=0) / counts[clusters, None]
+        filled = counts > 0
+        if not filled.all():
+            centroids[~filled] = data[rng.choice(len(data), int((~filled).sum()), replace=False)]
+    return centroids
+
+
+class IVFPQStore(FlatVectorStore):
+    """Vector store backend (see vector_store.py) with an IVF-PQ search path"""
+
+    FILES = FlatVectorStore.FILES + ("lists.bin", "codes.bin", "ivfpq_model.npz")
+    # Retrain when the corpus has grown this much since the last training
+    RETRAIN_GROWTH = 4
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        nlist: Optional[int] = None,
+        m: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        shortlist: Optional[int] = None,
+        min_train: Optional[int] = None
+    ):
+        """
+        Args:
+            path: Directory holding the index files (defaults to Config.IVFPQ_INDEX_PATH)
+            nlist: Coarse clusters (0 = about 4 * sqrt(rows) at training time)
+            m: Sub-quantizers, i.e. code bytes per chunk (lowered to a divisor of the dimension)
+            nprobe: Clusters scanned per query
+            shortlist: Candidates re-ranked with exact scores
+            min_train: Rows needed before a model is trained
+        """
+        self.nlist = Config.IVFPQ_NLIST if nlist is None else nlist
+        self.m = m or Config.IVFPQ_M
+        self.nprobe = nprobe or Config.IVFPQ_NPROBE
+        self.shortlist = shortlist or Config.IVFPQ_SHORTLIST
+        self.min_train = max(CODEBOOK_SIZE, min_train or Config.IVFPQ_MIN_TRAIN)
+        # Full vectors are only read for re-ranking, so half precision is enough
+        super().__init__(path or Config.IVFPQ_INDEX_PATH, "float16")
+
+    # --- Files ---
+
+    def _open(self):
+        super()._open()
+        self.centroids = None
+        self.codebooks = None
+        self._lists = np.zeros(0, dtype=np.int32)
+        self._codes = None
+        self._inverted = None  # (rows ordered by cluster, start offset of each cluster)
+
+        model = self.meta.get("ivfpq")
+        model_path = self._file("ivfpq_model.npz")
+        if not model or not model_path.exists():
+            return
+        with np.load(model_path) as saved:
+            self.centroids = saved["centroids"]
+            self.codebooks = saved["codebooks"]
+        # Small enough to keep in RAM, which is the point of the compression
+        self._lists = np.fromfile(self._file("lists.bin"), dtype="<i4", count=self._rows)
+        self._codes = np.fromfile(self._file("codes.bin"), dtype=np.uint8, count=self._rows * model["m"]).reshape(
+            self._rows, model["m"]
+        )
+
+    def _committed_sizes(self) -> Dict[str, int]:
+        sizes = super()._committed_sizes()
+        model = self.meta.get("ivfpq")
+        if model:
+            sizes["lists.bin"] = self.meta["rows"] * 4
+            sizes["codes.bin"] = self.meta["rows"] * model["m"]
+        return sizes
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def persist(self):
+        with self._lock:
+            live = self.count()
+            if live >= self.min_train and (
+                not self.trained or live >= self.RETRAIN_GROWTH * self.meta["ivfpq"]["trained_rows"]
+            ):
+                self.train()
+            super().persist()
+
+    def _compact(self):
+        live = np.flatnonzero(self.alive)
+        if self.trained:
+            lists, codes = self._lists[live], self._codes[live]
+        super()._compact()
+        if self.trained:
+            self._write_codes(lists, codes)
+
+    def _write_codes(self, lists: np.ndarray, codes: np.ndarray):
+        """Replace lists.bin and codes.bin (rows not yet committed by meta.json)"""
+        for name, array in (("lists.bin", lists.astype("<i4")), ("codes.bin", codes)):
+            tmp_path = self._file(name + ".tmp")
+            array.tofile(tmp_path)
+            os.replace(tmp_path, self._file(name))
+        self._lists = lists
+        self._codes = codes
+        self._inverted = None
+
+    # --- Training and encoding ---
+
+    def _subspaces(self, dim: int) -> int:
+        m = min(self.m, dim)
+        while dim % m:
+            m -= 1
+        return m
+
+    def train(self, sample_size: Optional[int] = None):
+        """
+        Fit coarse centroids and PQ codebooks on a sample, then encode every row.
+
+        Args:
+            sample_size: Rows used for training (defaults to Config.IVFPQ_TRAIN_SAMPLE)
+        """
+        with self._lock:
+            live = np.flatnonzero(self.alive)
+            if len(live) < CODEBOOK_SIZE:
+                raise ValueError(f"Need at least {CODEBOOK_SIZE} vectors to train, have {len(live)}")
+            started = time.perf_counter()
+            dim = self.meta["dim"]
+            m = self._subspaces(dim)
+            nlist = self.nlist or int(4 * np.sqrt(len(live)))
+            nlist = max(1, min(nlist, len(live) // 8, 65536))
+
+            rng = np.random.default_rng(0)
+            sample_rows = np.sort(rng.choice(live, min(len(live), sample_size or Config.IVFPQ_TRAIN_SAMPLE), replace=False))
+            sample = np.asarray(self._vectors[sample_rows], dtype=np.float32)
+
+            centroids = kmeans(sample, nlist)
+            residuals = sample - centroids[_nearest(sample, centroids)]
+            sub = dim // m
+            codebooks = np.stack([
+                kmeans(np.ascontiguousarray(residuals[:, j * sub:(j + 1) * sub]), CODEBOOK_SIZE, seed=j)
+                for j in range(m)
+            ])
+
+            self.centroids = centroids.astype(np.float32)
+            self.codebooks = codebooks.astype(np.float32)
+            lists, codes = [], []
+            for start in range(0, self._rows, self.BLOCK_ROWS):
+                block_lists, block_codes = self._encode(np.asarray(self._vectors[start:start + self.BLOCK_ROWS], dtype=np.float32))
+                lists.append(block_lists)
+                codes.append(block_codes)
+            self._write_codes(np.concatenate(lists), np.concatenate(codes))
+
+            tmp_path = self._file("ivfpq_model.tmp.npz")
+            np.savez(tmp_path, centroids=self.centroids, codebooks=self.codebooks)
+            os.replace(tmp_path, self._file("ivfpq_model.npz"))
+            self.meta["ivfpq"] = {"nlist": int(nlist), "m": int(m), "trained_rows": int(len(live))}
+            print(
+                f"  Trained IVF-PQ index on {len(sample_rows)} of {len(live)} vectors "
+                f"({nlist} clusters, {m} bytes/chunk) in {time.perf_counter() - started:.1f}s"
+            )
+
+    def _encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Coarse cluster and PQ code of each (unit-length) vector"""
+        lists = _nearest(vectors, self.centroids)
+        residuals = vectors - self.centroids[lists]
+        m, _, sub = self.codebooks.shape
+        codes = np.empty((len(vectors), m), dtype=np.uint8)
+        for j in range(m):
+            codes[:, j] = _nearest(np.ascontiguousarray(residuals[:, j * sub:(j + 1) * sub]), self.codebooks[j])
+        return lists, codes
+
+    def _appended(self, vectors: np.ndarray):
+        if not self.trained:
+            return
+        lists, codes = self._encode(vectors)
+        with open(self._file("lists.bin"), "ab") as f:
+            lists.astype("<i4").tofile(f)
+        with open(self._file("codes.bin"), "ab") as f:
+            codes.tofile(f)
+        self._lists = np.concatenate([self._lists, lists])
+        self._codes = np.concatenate([self._codes, codes])
+        self._inverted = None
+
+    def _inverted_lists(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows grouped by coarse cluster, rebuilt after writes"""
+        if self._inverted is None:
+            order = np.argsort(self._lists, kind="stable").astype(np.int64)
+            starts = np.searchsorted(self._lists[order], np.arange(len(self.centroids) + 1))
+            self._inverted = (order, starts)
+        return self._inverted
+
+    # --- Search ---
+
+    def search_batch(
+        self,
+        embeddings: Sequence[Sequence[float]],
+        k: int,
+        sources: Optional[Sequence[str]] = None,
+        nprobe: Optional[int] = None,
+        exact: bool = False
+    ) -> List[List[Tuple["Document", float]]]:
+        """
+        Approximate top-k by cosine similarity (exact scores for returned rows)
+
+        Args:
+            embeddings: Query embeddings (normalized here)
+            k: Results per query
+            sources: Only search chunks of these source documents (None = all)
+            nprobe: Clusters scanned per query (defaults to the configured value)
+            exact: Scan every row instead, as the flat index does
+
+        Returns:
+            One list of (document, cosine similarity) per query, best first
+        """
+        if exact or not self.trained:
+            return super().search_batch(embeddings, k, sources)
+        with self._lock:
+            vectors, table, text, ids, alive = self._vectors, self._table, self._text, self.ids, self.alive
+            lists, codes = self._lists, self._codes
+            order, starts = self._inverted_lists()
+            centroids, codebooks = self.centroids, self.codebooks
+            allowed = None
+            if sources is not None:
+                allowed = np.zeros(len(self._source_names) + 1, dtype=bool)
+                allowed[[self._sources[name] for name in sources if name in self._sources]] = True
+        if not self.count() or k <= 0:
+            return [[] for _ in embeddings]
+
+        queries = normalize(embeddings)
+        m, _, sub = codebooks.shape
+        nprobe = min(nprobe or self.nprobe, len(centroids))
+        centroid_norms = (centroids ** 2).sum(axis=1)
+        results = []
+        for query in queries:
+            centroid_scores = centroids @ query
+            # Closest clusters by L2, as rows were assigned
+            probe = np.argpartition(centroid_norms - 2.0 * centroid_scores, nprobe - 1)[:nprobe]
+            rows = np.concatenate([order[starts[c]:starts[c + 1]] for c in probe])
+            rows = rows[alive[rows]]
+            if allowed is not None:
+                rows = rows[allowed[table["source"][rows]]]
+            if not len(rows):
+                results.append([])
+                continue
+
+            # ADC: x = centroid + residual, so q.x = q.c + sum_j q_j . codebook_j[code_j]
+            lookup = np.einsum("jd,jcd->jc", query.reshape(m, sub), codebooks)
+            approx = centroid_scores[lists[rows]] + lookup[np.arange(m), codes[rows]].sum(axis=1)
+
+            keep = min(len(rows), max(k, self.shortlist))
+            candidates = rows[np.argpartition(-approx, keep - 1)[:keep]]
+            candidates.sort()  # Sequential reads from the memory map
+            exact_scores = np.asarray(vectors[candidates], dtype=np.float32) @ query
+            best = np.argsort(-exact_scores, kind="stable")[:k]
+            results.append([
+                (self._document(int(candidates[i]), table, text, ids), float(exact_scores[i]))
+                for i in best
+            ])
+        return results
+
+    def recall_report(self, queries: int = 200, k: int = 10, nprobes: Sequence[int] = None) -> Dict:
+        """
+        Recall@k of the approximate search against the exact scan.
+
+        Queries are stored vectors plus noise, so they land near real
+        chunks the way questions land near their answers.
+
+        Returns:
+            Dict with index shape, vector bytes per chunk (PQ code vs float32) and,
+            per nprobe, recall and latency
+        """
+        if not self.trained:
+            return {"trained": False, "rows": self.count(), "min_train": self.min_train}
+
+        rng = np.random.default_rng(1)
+        live = np.flatnonzero(self.alive)
+        base = np.asarray(self._vectors[np.sort(rng.choice(live, min(queries, len(live)), replace=False))], dtype=np.float32)
+        sample = normalize(base + 0.5 * rng.normal(size=base.shape) / np.sqrt(base.shape[1]))
+
+        start = time.perf_counter()
+        truth = [{doc.metadata["chunk_id"] for doc, _ in hits} for hits in self.search_batch(sample, k, exact=True)]
+        exact_ms = (time.perf_counter() - start) * 1000 / len(sample)
+
+        model = self.meta["ivfpq"]
+        report = {
+            "trained": True,
+            "rows": self.count(),
+            "nlist": model["nlist"],
+            "m": model["m"],
+            "k": k,
+            "queries": len(sample),
+            "pq_code_bytes": model["m"],
+            "float32_bytes": self.meta["dim"] * 4,
+            "exact_ms": round(exact_ms, 3),
+            "nprobe": {},
+        }
+        for nprobe in nprobes or sorted({1, self.nprobe, 2 * self.nprobe, 4 * self.nprobe}):
+            start = time.perf_counter()
+            found = self.search_batch(sample, k, nprobe=nprobe)
+            elapsed_ms = (time.perf_counter() - start) * 1000 / len(sample)
+            recall = np.mean([
+                len(expected & {doc.metadata["chunk_id"] for doc, _ in hits}) / max(1, len(expected))
+                for expected, hits in zip(truth, found)
+            ])
+            report["nprobe"][str(nprobe)] = {"recall": round(float(recall), 4), "ms": round(elapsed_ms, 3)}
+        return report
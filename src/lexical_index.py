@@ -0,0 +1,193 @@
+"""
+Lexical Index - BM25 inverted index over stored chunks
+"""
+import json
+import math
+import re
+from collections import Counter
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+from .config import Config
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+
+# Words, identifiers (get_text, OCR_DPI) and dotted numbers (3.2.1) stay whole
+TOKEN_PATTERN = re.compile(r"[a-z0-9_]+(?:\.[a-z0-9_]+)*")
+
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from how i in is it its of on or
+that the their then there these this to was what when where which who why
+will with you your
+""".split())
+
+# Metadata fields holding each retriever's own score for a search hit:
+# cosine similarity (dense) and fraction of query terms matched (lexical)
+SCORE_FIELDS = ("dense_score", "lexical_score")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase text and split it into index terms"""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    In-memory BM25 index persisted as JSON next to the vector store.
+
+    Postings are stored as well as the chunk text, so loading the index is
+    a single JSON read with no re-tokenization.
+    """
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.5, b: float = 0.75):
+        self.path = Path(path or Config.LEXICAL_INDEX_PATH)
+        self.k1 = k1
+        self.b = b
+        self.docs: Dict[str, Dict] = {}  # chunk id -> {text, metadata, length}
+        self.postings: Dict[str, Dict[str, int]] = {}  # term -> {chunk id: term frequency}
+        self.total_length = 0
+        self._load()
+
+    def _load(self):
+        """Read the index from disk, starting empty if missing or corrupt"""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.docs = data["docs"]
+            self.postings = data["postings"]
+            self.total_length = data["total_length"]
+        except (OSError, ValueError, KeyError):
+            self.clear()
+
+    def save(self):
+        """Atomically write the index to disk"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "docs": self.docs,
+                "postings": self.postings,
+                "total_length": self.total_length,
+            }, f)
+        tmp_path.replace(self.path)
+
+    def clear(self):
+        """Remove every chunk"""
+        self.docs = {}
+        self.postings = {}
+        self.total_length = 0
+
+    def add(self, chunk_id: str, text: str, metadata: Dict):
+        """Index a chunk, replacing any previous chunk with the same id"""
+        if chunk_id in self.docs:
+            self.remove([chunk_id])
+
+        terms = tokenize(text)
+        for term, count in Counter(terms).items():
+            self.postings.setdefault(term, {})[chunk_id] = count
+        self.docs[chunk_id] = {"text": text, "metadata": metadata, "length": len(terms)}
+        self.total_length += len(terms)
+
+    def remove(self, chunk_ids: Iterable[str]):
+        """Drop chunks from the index"""
+        for chunk_id in chunk_ids:
+            doc = self.docs.pop(chunk_id, None)
+            if doc is None:
+                continue
+            self.total_length -= doc["length"]
+            for term in set(tokenize(doc["text"])):
+                postings = self.postings.get(term)
+                if postings is not None:
+                    postings.pop(chunk_id, None)
+                    if not postings:
+                        del self.postings[term]
+
+    def search(self, query: str, k: int, sources: Optional[Iterable[str]] = None) -> List[Tuple["Document", float]]:
+        """
+        Rank chunks by BM25 score
+
+        Args:
+            query: Search query
+            k: Number of results to return
+            sources: Only rank chunks of these source documents (None = all)
+
+        Returns:
+            List of (document, BM25 score), best first
+        """
+        from langchain_core.documents import Document
+
+        if not self.docs:
+            return []
+
+        if sources is not None:
+            sources = set(sources)
+        n_docs = len(self.docs)
+        avg_length = self.total_length / n_docs or 1.0
+        scores: Dict[str, float] = {}
+
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for chunk_id, tf in postings.items():
+                if sources is not None and self.docs[chunk_id]["metadata"].get("source") not in sources:
+                    continue
+                length = self.docs[chunk_id]["length"]
+                norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [
+            (
+                Document(
+                    page_content=self.docs[chunk_id]["text"],
+                    metadata=dict(self.docs[chunk_id]["metadata"])
+                ),
+                score
+            )
+            for chunk_id, score in ranked
+        ]
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+
+def reciprocal_rank_fusion(
+    result_lists: List[List[Tuple["Document", float]]],
+    k: int,
+    rrf_k: int = 60
+) -> List[Tuple["Document", float]]:
+    """
+    Merge ranked result lists with reciprocal-rank fusion
+
+    The retrievers' scores are on different scales (cosine similarity, term
+    coverage), so they are not merged into one number: each stays in the
+    metadata field its retriever set (SCORE_FIELDS), combined onto one
+    document per chunk.
+
+    Args:
+        result_lists: Ranked (document, score) lists from different retrievers
+        k: Number of results to return
+        rrf_k: Rank offset dampening the weight of top positions
+
+    Returns:
+        Fused list of (document, fused rank score), best first
+    """
+    fused: Dict[str, float] = {}
+    documents: Dict[str, "Document"] = {}
+    for results in result_lists:
+        for rank, (doc, _) in enumerate(results):
+            key = doc.metadata.get("chunk_id") or doc.page_content
+            fused[key] = fused.get(key, 0.0) + 1.0 / (rrf_k + rank + 1)
+            first = documents.setdefault(key, doc)
+            if first is not doc:
+                first.metadata.update(
+                    (field, doc.metadata[field]) for field in SCORE_FIELDS if field in doc.metadata
+                )
+
+    ranked = sorted(fused, key=fused.get, reverse=True)[:k]
+    return [(documents[key], fused[key]) for key in ranked]
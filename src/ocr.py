@@ -0,0 +1,172 @@
+"""
+OCR Stage - parallel, cached Tesseract OCR for scanned PDF pages
+"""
+import json
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from PIL import Image, ImageStat
+import pytesseract
+import fitz
+
+from .config import Config
+from .pdf_extractor import OCR, BLANK, EMPTY
+
+
+def _ocr_page(task: Tuple[str, int, int, str, float]) -> Tuple[int, str, str]:
+    """
+    Worker: OCR one page, skipping Tesseract for visually blank pages.
+
+    Args:
+        task: (pdf path, page number, render DPI, tesseract command, blank stddev threshold)
+
+    Returns:
+        Tuple of (page_num, text, state); state is EMPTY if OCR failed
+    """
+    pdf_path, page_num, dpi, tesseract_cmd, blank_threshold = task
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+    try:
+        doc = fitz.open(pdf_path)
+    except Exception:
+        return page_num, "", EMPTY
+    try:
+        page = doc.load_page(page_num)
+
+        # Cheap blank check on a tiny grayscale thumbnail before the full render
+        thumb = page.get_pixmap(dpi=Config.OCR_BLANK_CHECK_DPI, colorspace=fitz.csGRAY)
+        gray = Image.frombytes("L", [thumb.width, thumb.height], thumb.samples)
+        if ImageStat.Stat(gray).stddev[0] < blank_threshold:
+            return page_num, "", BLANK
+
+        pix = page.get_pixmap(dpi=dpi)
+        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+        return page_num, pytesseract.image_to_string(img).strip(), OCR
+    except Exception:
+        return page_num, "", EMPTY
+    finally:
+        doc.close()
+
+
+class OCRCache:
+    """
+    On-disk OCR results keyed by (document hash, page, render DPI, tesseract version).
+
+    One JSON file per document hash keeps lookups to a single read per PDF.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or Config.OCR_CACHE_PATH)
+
+    def _file_for(self, digest: str) -> Path:
+        return self.path / f"{digest}.json"
+
+    @staticmethod
+    def _key(page_num: int, dpi: int, version: str) -> str:
+        return f"{page_num}:{dpi}:{version}"
+
+    def _read(self, digest: str) -> Dict[str, List]:
+        try:
+            with open(self._file_for(digest), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get_many(self, digest: str, page_nums: List[int], dpi: int, version: str) -> Dict[int, Tuple[str, str]]:
+        """Cached (text, state) for whichever of the pages are present"""
+        entries = self._read(digest)
+        found = {}
+        for page_num in page_nums:
+            entry = entries.get(self._key(page_num, dpi, version))
+            if entry is not None:
+                found[page_num] = (entry[0], entry[1])
+        return found
+
+    def put_many(self, digest: str, results: Dict[int, Tuple[str, str]], dpi: int, version: str):
+        """Merge new OCR results into the document's cache file"""
+        if not results:
+            return
+        entries = self._read(digest)
+        for page_num, (text, state) in results.items():
+            entries[self._key(page_num, dpi, version)] = [text, state]
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        cache_file = self._file_for(digest)
+        tmp_file = cache_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        tmp_file.replace(cache_file)
+
+
+class OCRStage:
+    """
+    Runs Tesseract over the pages text extraction left empty.
+
+    Cached pages cost a lookup only; the rest are spread over a process pool
+    of `workers` processes (in-process when there is a single page or worker).
+    """
+
+    def __init__(self, workers: Optional[int] = None, dpi: Optional[int] = None):
+        self.workers = workers if workers is not None else Config.OCR_WORKERS
+        self.dpi = dpi or Config.OCR_DPI
+        self.cache = OCRCache()
+        self._version = None
+
+    def tesseract_version(self) -> str:
+        """Installed Tesseract version, part of every cache key"""
+        if self._version is None:
+            self._version = str(pytesseract.get_tesseract_version())
+        return self._version
+
+    def _run(self, tasks: List[Tuple]) -> List[Tuple[int, str, str]]:
+        """OCR tasks on the pool, falling back to serial execution"""
+        if self.workers <= 1 or len(tasks) <= 1:
+            return [_ocr_page(task) for task in tasks]
+
+        try:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks))) as pool:
+                return list(pool.map(_ocr_page, tasks))
+        except (BrokenProcessPool, OSError) as e:
+            print(f"  Warning: parallel OCR unavailable ({e}), continuing serially")
+            return [_ocr_page(task) for task in tasks]
+
+    def run(
+        self,
+        pdf_path: Path,
+        digest: str,
+        page_nums: List[int],
+        tesseract_cmd: str
+    ) -> Tuple[Dict[int, Tuple[str, str]], int]:
+        """
+        OCR the given pages of a PDF.
+
+        Args:
+            pdf_path: Path to PDF file
+            digest: Content hash of the PDF (cache key)
+            page_nums: Zero-based page numbers that need OCR
+            tesseract_cmd: Tesseract executable for the workers
+
+        Returns:
+            Tuple of ({page_num: (text, state)}, number of pages served from cache)
+        """
+        version = self.tesseract_version()
+        results = self.cache.get_many(digest, page_nums, self.dpi, version)
+        cached = len(results)
+
+        tasks = [
+            (str(pdf_path), page_num, self.dpi, tesseract_cmd, Config.OCR_BLANK_STDDEV)
+            for page_num in page_nums
+            if page_num not in results
+        ]
+        fresh = {page_num: (text, state) for page_num, text, state in self._run(tasks)}
+        # Failed pages are retried on the next load rather than cached
+        self.cache.put_many(
+            digest,
+            {page_num: result for page_num, result in fresh.items() if result[1] != EMPTY},
+            self.dpi,
+            version
+        )
+
+        results.update(fresh)
+        return results, cached
@@ -0,0 +1,454 @@
+"""
+Ollama Client - pooled keep-alive HTTP access to one or more Ollama instances
+"""
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Optional, Union
+import requests
+from requests.adapters import HTTPAdapter
+from .config import Config
+
+
+class OllamaError(Exception):
+    """Raised when Ollama returns an error or an unusable response"""
+
+
+class NodeError(OllamaError):
+    """Raised when an Ollama node fails in a way another node may not (5xx)"""
+
+
+class LatencyStats:
+    """Running latency totals for cold (model load) and warm requests"""
+
+    def __init__(self):
+        self.count = {"cold": 0, "warm": 0}
+        self.total = {"cold": 0.0, "warm": 0.0}
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, seconds: float):
+        with self._lock:
+            self.count[kind] += 1
+            self.total[kind] += seconds
+
+    def summary(self) -> str:
+        parts = []
+        for kind in ("cold", "warm"):
+            if self.count[kind]:
+                average = self.total[kind] / self.count[kind]
+                parts.append(f"{kind} {average:.2f}s (n={self.count[kind]})")
+        return " | ".join(parts) if parts else "No requests yet"
+
+
+class Endpoint:
+    """One Ollama instance with its load and circuit-breaker state"""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.outstanding = 0  # Requests currently in flight
+        self.served = 0
+        self.failures = 0  # Consecutive failures
+        self.open_until = 0.0  # Circuit open (node evicted) until this monotonic time; 0 = closed
+
+    def status(self, now: float) -> str:
+        if not self.open_until:
+            return "up"
+        if now < self.open_until:
+            return "evicted"
+        return "probing"
+
+
+class OllamaClient:
+    """
+    Thin client for Ollama's /api/generate with a pooled HTTP session.
+
+    Connections are reused across questions, `keep_alive` tells Ollama how
+    long to keep the model loaded, and `warm_up` loads the model ahead of
+    the first question. A request counts as cold when Ollama reports that
+    it had to load the model for it. Provides the `invoke` / `stream`
+    methods AITutor uses.
+
+    With several endpoints each request goes to the node with the fewest
+    outstanding requests. Connection errors, timeouts and 5xx responses
+    count against a node; after OLLAMA_CIRCUIT_FAILURES in a row it is
+    evicted for OLLAMA_CIRCUIT_COOLDOWN seconds, then must pass an
+    /api/tags probe before it gets traffic again. Failed requests are
+    retried on the remaining nodes. With OLLAMA_HEDGE enabled, a request
+    still waiting past the p95 of recent latencies (time to first token
+    when streaming) is duplicated on another node and the first to
+    respond wins.
+    """
+
+    # load_duration above this means the model was loaded for the request
+    COLD_LOAD_SECONDS = 0.5
+    # Recent latencies kept for the hedging budget, and how many are needed first
+    LATENCY_WINDOW = 200
+    HEDGE_MIN_SAMPLES = 20
+    HEDGE_PERCENTILE = 0.95
+
+    def __init__(self, base_url: Union[str, List[str], None] = None, model: Optional[str] = None):
+        urls = base_url or Config.OLLAMA_BASE_URL
+        if isinstance(urls, str):
+            urls = [url.strip() for url in urls.split(",") if url.strip()]
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.model = model or Config.OLLAMA_MODEL
+        self.timeout = (Config.OLLAMA_CONNECT_TIMEOUT, Config.OLLAMA_READ_TIMEOUT)
+        self.latency = LatencyStats()
+        self.warmup_seconds = None
+        self.hedges = {"fired": 0, "won": 0}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(self.endpoints), pool_maxsize=Config.OLLAMA_POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._recent_totals = deque(maxlen=self.LATENCY_WINDOW)
+        self._recent_first_token = deque(maxlen=self.LATENCY_WINDOW)
+        self._hedge_pool = None
+
+    @property
+    def base_url(self) -> str:
+        return self.endpoints[0].url
+
+    @property
+    def last_stats(self) -> Dict:
+        """Ollama's counters (prompt_eval_count, eval_count, ...) for this thread's last request"""
+        return getattr(self._local, "stats", {})
+
+    # ------------------------------------------------------------------
+    # Routing and circuit breaking
+    # ------------------------------------------------------------------
+
+    def _probe(self, endpoint: Endpoint, timeout: float = 2) -> Optional[int]:
+        """GET /api/tags on one node; returns the status code or None if unreachable"""
+        try:
+            return self.session.get(f"{endpoint.url}/api/tags", timeout=timeout).status_code
+        except requests.RequestException:
+            return None
+
+    def _release(self, endpoint: Endpoint, ok: bool, busy: bool = True):
+        """Finish a request on a node, updating its circuit breaker"""
+        with self._lock:
+            if busy:
+                endpoint.outstanding -= 1
+            if ok:
+                endpoint.failures = 0
+                endpoint.open_until = 0.0
+            else:
+                endpoint.failures += 1
+                if endpoint.failures >= Config.OLLAMA_CIRCUIT_FAILURES:
+                    endpoint.open_until = time.monotonic() + Config.OLLAMA_CIRCUIT_COOLDOWN
+
+    def _acquire(self, exclude: List[Endpoint]) -> Optional[Endpoint]:
+        """Reserve the least-loaded available node not in exclude"""
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                remaining = [e for e in self.endpoints if e not in exclude]
+                if not remaining:
+                    return None
+                # With every node evicted, probe one early rather than fail outright
+                candidates = [e for e in remaining if e.open_until <= now] or remaining
+                endpoint = min(candidates, key=lambda e: (e.outstanding, e.served))
+                if not endpoint.open_until:
+                    endpoint.outstanding += 1
+                    endpoint.served += 1
+                    return endpoint
+                # Cooldown over: hold the node back while it is probed
+                endpoint.open_until = now + Config.OLLAMA_CIRCUIT_COOLDOWN
+
+            if self._probe(endpoint) == 200:
+                self._release(endpoint, ok=True, busy=False)
+            else:
+                self._release(endpoint, ok=False, busy=False)
+                exclude = exclude + [endpoint]
+
+    def _call(self, request: Callable[[Endpoint], object], tried: List[Endpoint], release: bool = True):
+        """
+        Run request(endpoint) on the least-loaded node, failing over to the others
+
+        Args:
+            request: Function performing the HTTP call against one node
+            tried: Nodes already used for this request; appended to as nodes are tried
+            release: Release the node when request returns (False for streams,
+                whose caller releases it once the stream is consumed)
+
+        Returns:
+            Tuple of (request result, node it ran on)
+        """
+        last_error = None
+        while True:
+            endpoint = self._acquire(tried)
+            if endpoint is None:
+                raise last_error or OllamaError("No healthy Ollama node available")
+            tried.append(endpoint)
+            try:
+                result = request(endpoint)
+            except (requests.RequestException, NodeError) as e:
+                self._release(endpoint, ok=False)
+                last_error = e if isinstance(e, OllamaError) else OllamaError(f"{endpoint.url}: {e}")
+                continue
+            except Exception:
+                self._release(endpoint, ok=True)
+                raise
+            if release:
+                self._release(endpoint, ok=True)
+            return result, endpoint
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    def _payload(self, prompt: str, stream: bool, model: Optional[str] = None, **options) -> Dict:
+        return {
+            "model": model or self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": Config.OLLAMA_KEEP_ALIVE,
+            "options": dict({
+                "temperature": Config.TEMPERATURE,
+                "num_predict": Config.OLLAMA_NUM_PREDICT,
+                "num_ctx": Config.OLLAMA_NUM_CTX,
+            }, **options),
+        }
+
+    def _post(self, endpoint: Endpoint, payload: Dict, stream: bool) -> requests.Response:
+        response = self.session.post(
+            f"{endpoint.url}/api/generate",
+            json=payload,
+            stream=stream,
+            timeout=self.timeout
+        )
+        if response.status_code != 200:
+            try:
+                message = response.json().get("error", response.text)
+            except ValueError:
+                message = response.text
+            response.close()
+            error = NodeError if response.status_code >= 500 else OllamaError
+            raise error(f"Ollama returned {response.status_code}: {message}")
+        return response
+
+    def _finish(self, final: Dict, started: float) -> bool:
+        """
+        Record latency and counters from the final response object
+
+        Returns:
+            bool: True if the request was cold (Ollama loaded the model for it)
+        """
+        self._local.stats = {
+            key: final.get(key)
+            for key in ("prompt_eval_count", "eval_count", "load_duration", "total_duration")
+        }
+        cold = (final.get("load_duration") or 0) / 1e9 > self.COLD_LOAD_SECONDS
+        self.latency.record("cold" if cold else "warm", time.perf_counter() - started)
+        return cold
+
+    def _hedge_budget(self, recent: deque) -> Optional[float]:
+        """Seconds to wait before hedging, or None if hedging is off or not calibrated yet"""
+        if not Config.OLLAMA_HEDGE or len(self.endpoints) < 2 or len(recent) < self.HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(recent)
+        return ordered[int(self.HEDGE_PERCENTILE * (len(ordered) - 1))]
+
+    def _hedged(self, attempt: Callable[[List[Endpoint]], object], budget: float, discard: Callable):
+        """
+        Run attempt, and a second copy on another node if the first takes longer than budget
+
+        Args:
+            attempt: Function taking the list of nodes to avoid
+            budget: Seconds to wait before hedging
+            discard: Called with the losing attempt's result
+
+        Returns:
+            Result of the first attempt to succeed
+        """
+        if self._hedge_pool is None:
+            with self._lock:
+                if self._hedge_pool is None:
+                    self._hedge_pool = ThreadPoolExecutor(
+                        max_workers=Config.OLLAMA_POOL_SIZE, thread_name_prefix="edubridge-hedge"
+                    )
+
+        tried = []
+        first = self._hedge_pool.submit(attempt, tried)
+        done, _ = wait([first], timeout=budget)
+        if done:
+            return first.result()
+
+        second = self._hedge_pool.submit(attempt, list(tried))
+        with self._lock:
+            self.hedges["fired"] += 1
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                if future is second:
+                    with self._lock:
+                        self.hedges["won"] += 1
+                for loser in pending:
+                    loser.add_done_callback(lambda f: f.exception() is None and discard(f.result()))
+                return future.result()
+        raise error
+
+    def invoke(self, prompt: str, model: Optional[str] = None, **options) -> str:
+        """Generate a complete response for a prompt (with `model` instead of the client's default, if given)"""
+        payload = self._payload(prompt, False, model, **options)
+        started = time.perf_counter()
+
+        def attempt(tried):
+            data, _ = self._call(lambda e: self._post(e, payload, stream=False).json(), tried)
+            return data
+
+        budget = self._hedge_budget(self._recent_totals)
+        if budget is None:
+            data = attempt([])
+        else:
+            data = self._hedged(attempt, budget, discard=lambda _: None)
+        if not self._finish(data, started):
+            self._recent_totals.append(time.perf_counter() - started)
+        return data.get("response", "")
+
+    def _open_stream(self, payload: Dict, tried: List[Endpoint]):
+        """Start a streamed generation and wait for its first line"""
+        def start(endpoint):
+            response = self._post(endpoint, payload, stream=True)
+            try:
+                lines = response.iter_lines()
+                first = next((line for line in lines if line), b"")
+            except Exception:
+                response.close()
+                raise
+            return response, first, lines
+
+        (response, first, lines), endpoint = self._call(start, tried, release=False)
+        return response, endpoint, first, lines
+
+    def _close_stream(self, opened, ok: bool = True):
+        response, endpoint, _, _ = opened
+        response.close()
+        self._release(endpoint, ok=ok)
+
+    def stream(self, prompt: str, model: Optional[str] = None, **options) -> Iterator[str]:
+        """Generate a response, yielding text chunks as Ollama produces them"""
+        payload = self._payload(prompt, True, model, **options)
+        started = time.perf_counter()
+
+        budget = self._hedge_budget(self._recent_first_token)
+        if budget is None:
+            opened = self._open_stream(payload, [])
+        else:
+            opened = self._hedged(lambda tried: self._open_stream(payload, tried), budget, self._close_stream)
+        first_token = time.perf_counter() - started
+
+        _, _, first, lines = opened
+        ok = True
+        try:
+            for line in self._chain(first, lines):
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise OllamaError(chunk["error"])
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    # Like invoke: a cold model load would inflate the hedge budget
+                    if not self._finish(chunk, started):
+                        self._recent_first_token.append(first_token)
+                    break
+        except Exception:
+            ok = False
+            raise
+        finally:
+            self._close_stream(opened, ok=ok)
+
+    @staticmethod
+    def _chain(first: bytes, lines: Iterator[bytes]) -> Iterator[bytes]:
+        yield first
+        yield from lines
+
+    # ------------------------------------------------------------------
+    # Health and warm-up
+    # ------------------------------------------------------------------
+
+    def check(self, timeout: float = 2) -> Optional[int]:
+        """
+        Probe /api/tags on every node, evicting or restoring nodes accordingly
+
+        Returns:
+            200 if any node is healthy, else the last HTTP status code, or None
+            if no node can be reached
+        """
+        status_codes = []
+        for endpoint in self.endpoints:
+            status_code = self._probe(endpoint, timeout)
+            self._release(endpoint, ok=status_code == 200, busy=False)
+            status_codes.append(status_code)
+        if 200 in status_codes:
+            return 200
+        return next((code for code in reversed(status_codes) if code is not None), None)
+
+    def _warm_endpoint(self, endpoint: Endpoint, model: Optional[str] = None) -> bool:
+        try:
+            response = self.session.post(
+                f"{endpoint.url}/api/generate",
+                json={"model": model or self.model, "keep_alive": Config.OLLAMA_KEEP_ALIVE},
+                timeout=self.timeout
+            )
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        self._release(endpoint, ok=ok, busy=False)
+        return ok
+
+    def warm_up(self, model: Optional[str] = None) -> bool:
+        """
+        Ask every node to load the model without generating anything
+
+        Args:
+            model: Model to load (defaults to the client's model)
+
+        Returns:
+            bool: True if the model is loaded on at least one node
+        """
+        started = time.perf_counter()
+        if len(self.endpoints) == 1:
+            ok = self._warm_endpoint(self.endpoints[0], model)
+        else:
+            with ThreadPoolExecutor(max_workers=len(self.endpoints)) as pool:
+                ok = any(list(pool.map(lambda endpoint: self._warm_endpoint(endpoint, model), self.endpoints)))
+        if ok and model is None:
+            self.warmup_seconds = time.perf_counter() - started
+        return ok
+
+    def latency_summary(self) -> str:
+        """Cold vs warm request latency for status output"""
+        summary = self.latency.summary()
+        if self.warmup_seconds is not None:
+            summary += f" | warm-up {self.warmup_seconds:.2f}s"
+        return summary
+
+    def nodes_summary(self) -> str:
+        """Per-node state and load for status output"""
+        now = time.monotonic()
+        with self._lock:
+            up = sum(1 for e in self.endpoints if e.status(now) == "up")
+            parts = [f"{up}/{len(self.endpoints)} up"]
+            if len(self.endpoints) > 1:
+                parts.extend(
+                    f"{e.url} {e.status(now)}, {e.outstanding} active, {e.served} served"
+                    for e in self.endpoints
+                )
+            fired, won = self.hedges["fired"], self.hedges["won"]
+        if fired:
+            parts.append(f"hedged {fired} (won {won})")
+        return " | ".join(parts)
@@ -0,0 +1,186 @@
+"""
+Parallel PDF Page Extraction
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple
+import fitz
+
+from .config import Config
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+
+# Page states: extracted text layer, OCR output, skipped as visually blank,
+# or no text found (OCR not run or failed)
+TEXT = "text"
+OCR = "ocr"
+BLANK = "blank"
+EMPTY = "empty"
+
+
+def _extract_range(task: Tuple[str, int, int]) -> Tuple[List[Tuple[int, str, str]], Optional[str]]:
+    """
+    Worker: extract the text layer of a range of pages with its own PyMuPDF handle.
+
+    Pages without a text layer come back EMPTY; OCR is a separate stage.
+
+    Args:
+        task: (pdf path, first page, end page)
+
+    Returns:
+        Tuple of ([(page_num, text, state), ...], error message or None)
+    """
+    pdf_path, start, end = task
+
+    results = []
+    try:
+        doc = fitz.open(pdf_path)
+        try:
+            for page_num in range(start, end):
+                text = doc.load_page(page_num).get_text("text").strip()
+                results.append((page_num, text, TEXT if text else EMPTY))
+        finally:
+            doc.close()
+    except Exception as e:
+        return results, str(e)
+    return results, None
+
+
+def pages_to_documents(pdf_path: Path, pages: List[Tuple[int, str, str]]) -> List["Document"]:
+    """Wrap extracted page text in Documents with source/page metadata"""
+    from langchain_core.documents import Document
+
+    return [
+        Document(
+            page_content=text,
+            metadata={
+                "source": pdf_path.name,
+                "page": page_num + 1
+            }
+        )
+        for page_num, text, _ in pages
+        if text
+    ]
+
+
+class PageExtractor:
+    """
+    Fans PDF page extraction out across a process pool.
+
+    Every PDF is split into page ranges of at most `pages_per_task` pages so
+    a single large PDF also spreads over several workers. Results are always
+    reassembled in input order, so the documents produced are identical to a
+    serial run; with one worker (or if the pool cannot start) extraction runs
+    in-process.
+    """
+
+    def __init__(self, workers: Optional[int] = None, pages_per_task: Optional[int] = None):
+        self.workers = workers if workers is not None else Config.EXTRACT_WORKERS
+        self.pages_per_task = pages_per_task or Config.EXTRACT_PAGES_PER_TASK
+
+    def _plan(self, pdf_paths: List[Path]):
+        """Split PDFs into page-range tasks, recording PDFs that cannot be opened"""
+        tasks = []
+        owners = []
+        errors = {}
+        for index, pdf_path in enumerate(pdf_paths):
+            try:
+                doc = fitz.open(str(pdf_path))
+                page_count = 0 if doc.is_closed else doc.page_count
+                doc.close()
+            except Exception as e:
+                errors[index] = str(e)
+                continue
+
+            if page_count == 0:
+                errors[index] = "PDF document is empty or could not be opened."
+                continue
+
+            for start in range(0, page_count, self.pages_per_task):
+                end = min(start + self.pages_per_task, page_count)
+                tasks.append((str(pdf_path), start, end))
+                owners.append(index)
+        return tasks, owners, errors
+
+    def _run(self, tasks: List[Tuple]) -> Iterator[Tuple[List[Tuple[int, str, str]], Optional[str]]]:
+        """Run tasks on the pool in order, falling back to serial execution"""
+        if self.workers <= 1 or len(tasks) <= 1:
+            for task in tasks:
+                yield _extract_range(task)
+            return
+
+        done = 0
+        # Only a few ranges are submitted ahead of the consumer, so results of a
+        # large corpus never pile up in memory when downstream stages are slower
+        max_ahead = self.workers * 2
+        try:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks))) as pool:
+                inflight = deque()
+                submitted = 0
+                while done < len(tasks):
+                    while submitted < len(tasks) and len(inflight) < max_ahead:
+                        inflight.append(pool.submit(_extract_range, tasks[submitted]))
+                        submitted += 1
+                    result = inflight.popleft().result()
+                    done += 1
+                    yield result
+        except (BrokenProcessPool, OSError) as e:
+            print(f"  Warning: parallel extraction unavailable ({e}), continuing serially")
+            for task in tasks[done:]:
+                yield _extract_range(task)
+
+    def iter_ranges(
+        self,
+        pdf_paths: List[Path]
+    ) -> Iterator[Tuple[Path, List[Tuple[int, str, str]], Optional[str], bool]]:
+        """
+        Extract pages from PDFs one page range at a time, in input order.
+
+        Args:
+            pdf_paths: PDFs to extract, in the order results should be returned
+
+        Returns:
+            Iterator of (pdf_path, [(page_num, text, state), ...], error or None,
+            whether this is the PDF's last range)
+        """
+        tasks, owners, errors = self._plan(pdf_paths)
+        results = self._run(tasks)
+
+        position = 0
+        for index, pdf_path in enumerate(pdf_paths):
+            if index in errors:
+                yield pdf_path, [], errors[index], True
+                continue
+
+            while position < len(owners) and owners[position] == index:
+                position += 1
+                range_pages, range_error = next(results)
+                last = position == len(owners) or owners[position] != index
+                yield pdf_path, range_pages, range_error, last
+
+    def iter_pages(
+        self,
+        pdf_paths: List[Path]
+    ) -> Iterator[Tuple[Path, List[Tuple[int, str, str]], Optional[str]]]:
+        """
+        Extract pages from PDFs, yielding each PDF as soon as all its ranges finish.
+
+        Args:
+            pdf_paths: PDFs to extract, in the order results should be returned
+
+        Returns:
+            Iterator of (pdf_path, [(page_num, text, state), ...], error or None)
+        """
+        pages = []
+        error = None
+        for pdf_path, range_pages, range_error, last in self.iter_ranges(pdf_paths):
+            pages.extend(range_pages)
+            error = error or range_error
+            if last:
+                yield pdf_path, [] if error else pages, error
+                pages = []
+                error = None
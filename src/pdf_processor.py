@@ -1,46 +1,116 @@
 """
 PDF Processing and Vector Store Management
+
+Heavy dependencies (PyMuPDF, Tesseract, Chroma, sentence-transformers) are
+imported on first use so that the CLI starts instantly.
 """
 import os
 import sys
+import json
+import hashlib
 import logging
+import threading
 from pathlib import Path
-from typing import List
-from PIL import Image
-import pytesseract
-
-# Suppress pymupdf warnings if needed (modern versions use different methods)
-import fitz
-
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_core.documents import Document
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from .config import Config
+from .ingest_manifest import IngestManifest
+from .telemetry import telemetry
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
 
 
 class PDFProcessor:
     """Handles PDF loading, chunking, and vector store creation using PyMuPDF and OCR fallback"""
     
+    # Chunks per vector store insert, kept below Chroma's maximum batch size
+    ADD_BATCH_SIZE = 1000
+    
     def __init__(self):
-        # Point to default Tesseract installation path on Windows
-        self._set_tesseract_path()
-        
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2",
-            model_kwargs={'device': 'cpu'}
-        )
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=Config.CHUNK_SIZE,
-            chunk_overlap=Config.CHUNK_OVERLAP,
-            separators=["\n\n", "\n", ". ", " ", ""]
-        )
         self.vectorstore = None
         self.current_pdf = None
-        self._tesseract_available = self._check_tesseract()
+        self.manifest = IngestManifest()
+        
+        # Built on first use (see the properties below)
+        self._embeddings = None
+        self._text_splitter = None
+        self._extractor = None
+        self._ocr_stage = None
+        self._tesseract_available = None
+        self._lexical_index = None
+        self._router = None
+        self._restored = False
+        self._init_lock = threading.RLock()
+    
+    @property
+    def embeddings(self):
+        """Sentence-transformers embedding model, loaded on first use"""
+        if self._embeddings is None:
+            with self._init_lock:
+                if self._embeddings is None:
+                    from langchain_community.embeddings import HuggingFaceEmbeddings
+                    # Unit-length vectors make Chroma's L2 distance map to cosine similarity
+                    self._embeddings = HuggingFaceEmbeddings(
+                        model_name=Config.EMBEDDING_MODEL,
+                        model_kwargs={'device': 'cpu'},
+                        encode_kwargs={'normalize_embeddings': True}
+                    )
+        return self._embeddings
+    
+    @property
+    def text_splitter(self):
+        """Chunk splitter, created on first use"""
+        if self._text_splitter is None:
+            from langchain_text_splitters import RecursiveCharacterTextSplitter
+            self._text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=Config.CHUNK_SIZE,
+                chunk_overlap=Config.CHUNK_OVERLAP,
+                separators=["\n\n", "\n", ". ", " ", ""]
+            )
+        return self._text_splitter
+    
+    def new_chunker(self):
+        """
+        Chunker for one PDF, as selected by Config.CHUNKER
+        
+        Returns:
+            Object with feed(page documents) -> chunks and finish() -> remaining chunks
+        """
+        from .chunker import CHUNKERS, PageAwareChunker, PageSplitter
+        if Config.CHUNKER == "page_aware":
+            return PageAwareChunker()
+        if Config.CHUNKER == "recursive":
+            return PageSplitter(self.text_splitter)
+        raise ValueError(f"Unknown CHUNKER '{Config.CHUNKER}', expected one of: {', '.join(CHUNKERS)}")
+    
+    @property
+    def extractor(self):
+        """Parallel page extractor, created on first use"""
+        if self._extractor is None:
+            from .pdf_extractor import PageExtractor
+            self._extractor = PageExtractor()
+        return self._extractor
+    
+    @property
+    def ocr_stage(self):
+        """OCR stage for scanned pages, created on first use"""
+        if self._ocr_stage is None:
+            from .ocr import OCRStage
+            self._ocr_stage = OCRStage()
+        return self._ocr_stage
+    
+    @property
+    def tesseract_available(self) -> bool:
+        """Whether Tesseract-OCR can be used, checked on first use"""
+        if self._tesseract_available is None:
+            # Point to default Tesseract installation path on Windows
+            self._set_tesseract_path()
+            self._tesseract_available = self._check_tesseract()
+        return self._tesseract_available
     
     def _set_tesseract_path(self):
         """Set Tesseract path explicitly for Windows if not in PATH"""
+        import pytesseract
         default_path = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
         if os.name == 'nt' and os.path.exists(default_path):
             pytesseract.pytesseract.tesseract_cmd = default_path
@@ -48,16 +118,191 @@ class PDFProcessor:
     def _check_tesseract(self) -> bool:
         """Check if Tesseract-OCR is installed and accessible"""
         try:
+            import pytesseract
             # Try to get version to verify it works
             pytesseract.get_tesseract_version()
             return True
         except Exception:
             return False
 
+    def _new_vectorstore(self):
+        """Open the configured vector store backend (Chroma or the flat index)"""
+        from .vector_store import open_vector_store
+        return open_vector_store(self.embeddings)
+    
+    def warm_start(self) -> bool:
+        """
+        Mark the vector store persisted by a previous session as loaded.
+        
+        The store is only reused if the manifest was written with the current
+        chunking settings and embedding model. Only the manifest is read here;
+        the collection itself is opened on first search (or by prewarm) and
+        its chunk count checked against the manifest then, so a stale or
+        foreign store is never queried.
+        
+        Returns:
+            bool: True if the knowledge base is ready for questions
+        """
+        if not self.manifest.files or not self.manifest.settings_match():
+            return False
+        
+        self._restored = True
+        names = [entry["name"] for entry in self.manifest.files.values()]
+        self.current_pdf = names[0] if len(names) == 1 else f"{len(names)} PDFs from previous session"
+        return True
+    
+    def _ensure_vectorstore(self):
+        """Return the vector store, opening a restored one on first use"""
+        if self.vectorstore is not None or not self._restored:
+            return self.vectorstore
+        
+        with self._init_lock:
+            if self.vectorstore is None and self._restored:
+                self._restored = False
+                try:
+                    vectorstore = self._new_vectorstore()
+                    stored = vectorstore.count()
+                except Exception as e:
+                    print(f"Warning: Could not open saved knowledge base: {str(e)}")
+                    self.current_pdf = None
+                    return None
+                
+                if stored != self.manifest.total_chunks():
+                    print("Warning: Saved knowledge base does not match its manifest, run 'load' to rebuild")
+                    self.current_pdf = None
+                    return None
+                
+                self.vectorstore = vectorstore
+                self._sync_lexical_index()
+        return self.vectorstore
+    
+    @property
+    def lexical_index(self):
+        """BM25 index over the stored chunks, loaded from disk on first use"""
+        if self._lexical_index is None:
+            with self._init_lock:
+                if self._lexical_index is None:
+                    from .lexical_index import BM25Index
+                    self._lexical_index = BM25Index()
+        return self._lexical_index
+    
+    def _sync_lexical_index(self):
+        """Rebuild the BM25 index from the vector store if it is out of step"""
+        if len(self.lexical_index) == self.manifest.total_chunks():
+            return
+        
+        print("Rebuilding keyword index from the knowledge base...")
+        ids, texts, metadatas = self.vectorstore.get_all()
+        self.lexical_index.clear()
+        for chunk_id, text, metadata in zip(ids, texts, metadatas):
+            self.lexical_index.add(chunk_id, text, metadata)
+        self.lexical_index.save()
+    
+    @property
+    def router(self):
+        """Document router over the centroids in the manifest, rebuilt after each load"""
+        if self._router is None:
+            from .doc_router import DocumentRouter
+            self._router = DocumentRouter(self.manifest.documents())
+        return self._router
+    
+    def documents(self) -> List[Dict]:
+        """Name and chunk count of every loaded document"""
+        return [{"name": doc["name"], "chunks": doc["chunks"]} for doc in self.manifest.documents()]
+    
+    def _save_indexes(self):
+        """Persist the manifest and the BM25 index after a load"""
+        self._router = None
+        with telemetry.span("load.persist"):
+            self.vectorstore.persist()
+            self.manifest.save()
+            self.lexical_index.save()
+    
+    def prewarm(self):
+        """Load the embedding model and open a restored store ahead of first use"""
+        self.embeddings
+        self._ensure_vectorstore()
+    
+    def _open_vectorstore(self):
+        """Open the persisted Chroma collection, rebuilding it if settings changed"""
+        with self._init_lock:
+            self._restored = False
+            if self.vectorstore is None:
+                self.vectorstore = self._new_vectorstore()
+        
+        if not self.manifest.settings_match():
+            # Chunks built with other settings (or before the manifest existed)
+            # cannot be reused - start over with an empty collection
+            if self.manifest.settings or self.vectorstore.count():
+                print("Chunking, embedding or vector store settings changed, rebuilding knowledge base...")
+            self.vectorstore.reset()
+            self.manifest.reset()
+            self.lexical_index.clear()
+        
+        self._sync_lexical_index()
+    
+    def apply_ocr(self, pdf_path: Path, digest: str, pages: List) -> Tuple[List, Dict[str, int]]:
+        """
+        Run the OCR stage over pages that had no text layer.
+        
+        Args:
+            pdf_path: Path to PDF file
+            digest: Content hash of the PDF (OCR cache key)
+            pages: Extracted (page_num, text, state) tuples
+            
+        Returns:
+            Tuple of (pages with OCR text filled in, OCR counters)
+        """
+        from . import pdf_extractor
+        import pytesseract
+        
+        empty = [page_num for page_num, _, state in pages if state == pdf_extractor.EMPTY]
+        stats = {"ocr": 0, "cached": 0, "blank": 0, "missing": 0}
+        if not empty:
+            return pages, stats
+        
+        if not self.tesseract_available:
+            stats["missing"] = len(empty)
+            return pages, stats
+        
+        with telemetry.span("load.ocr"):
+            ocr_results, stats["cached"] = self.ocr_stage.run(
+                pdf_path, digest, empty, pytesseract.pytesseract.tesseract_cmd
+            )
+        for _, state in ocr_results.values():
+            if state == pdf_extractor.OCR:
+                stats["ocr"] += 1
+            elif state == pdf_extractor.BLANK:
+                stats["blank"] += 1
+        
+        merged = []
+        for page_num, text, state in pages:
+            if page_num in ocr_results:
+                text, state = ocr_results[page_num]
+            merged.append((page_num, text, state))
+        return merged, stats
+    
+    def delete_chunks(self, chunk_ids: List[str]):
+        """Remove chunks from the vector store by id"""
+        if chunk_ids:
+            self.vectorstore.delete(chunk_ids)
+            self.lexical_index.remove(chunk_ids)
+    
+    def _purge_missing(self) -> int:
+        """Remove chunks of PDFs that were deleted from disk"""
+        missing = self.manifest.missing_files()
+        for key in missing:
+            print(f"  Removing deleted PDF from knowledge base: {Path(key).name}")
+            self.delete_chunks(self.manifest.remove(key))
+        return len(missing)
+    
     def load_pdf(self, pdf_path: str) -> bool:
         """
         Load PDF using PyMuPDF (fitz) with OCR fallback for scanned content.
         
+        Unchanged PDFs are skipped using the ingestion manifest; a changed
+        PDF has its previous chunks replaced.
+        
         Args:
             pdf_path: Path to PDF file
             
@@ -73,52 +318,31 @@ class PDFProcessor:
             if not pdf_path.suffix.lower() == '.pdf':
                 print(f"Error: File must be a PDF")
                 return False
-
+            
+            with telemetry.span("load.open"):
+                self._open_vectorstore()
+            self._purge_missing()
+            
+            state, digest = self.manifest.check(pdf_path)
+            if state == IngestManifest.UNCHANGED:
+                self._save_indexes()
+                self.current_pdf = pdf_path.name
+                print(f"{pdf_path.name} is unchanged, using existing knowledge base")
+                return True
+            
             print(f"Analyzing PDF: {pdf_path.name}...")
             
-            documents = []
-            try:
-                # fitz.open handles internal repair automatically
-                doc = fitz.open(str(pdf_path))
-                
-                if doc.is_closed or doc.page_count == 0:
-                    raise Exception("PDF document is empty or could not be opened.")
-
-                for page_num in range(doc.page_count):
-                    page = doc.load_page(page_num)
-                    
-                    # 1. Try standard text extraction
-                    text = page.get_text("text").strip()
-                    
-                    # 2. Fall back to OCR if no text found and Tesseract is available
-                    if not text:
-                        if self._tesseract_available:
-                            print(f"Page {page_num + 1}: No text found, attempting OCR...")
-                            # Render page to image
-                            pix = page.get_pixmap(matrix=fitz.Matrix(2, 2)) # Higher resolution for better OCR
-                            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                            text = pytesseract.image_to_string(img).strip()
-                        else:
-                            print(f"Page {page_num + 1}: No text found and OCR (Tesseract) is not installed.")
-                    
-                    if text:
-                        documents.append(
-                            Document(
-                                page_content=text,
-                                metadata={
-                                    "source": pdf_path.name,
-                                    "page": page_num + 1
-                                }
-                            )
-                        )
-                doc.close()
-                
-            except Exception as e:
-                print(f"Error during PDF processing: {str(e)}")
+            # Pages are extracted, split, embedded and stored in a streaming pipeline
+            from .ingest_pipeline import IngestPipeline
+            result = IngestPipeline(self, verbose=True).ingest([(pdf_path, digest)])[pdf_path]
+            self._save_indexes()
+            
+            if result["error"]:
+                print(f"Error during PDF processing: {result['error']}")
                 return False
-
-            if not documents:
-                if not self._tesseract_available:
+            
+            if not result["pages"]:
+                if not self.tesseract_available:
                     print("\n[IMPORTANT] This PDF appears to be a scanned image.")
                     print("To extract text, please install Tesseract-OCR on your system:")
                     print("1. Download from: https://github.com/UB-Mannheim/tesseract/wiki")
@@ -128,25 +352,14 @@ class PDFProcessor:
                     print("Error: No text content could be extracted even after OCR attempt.")
                 return False
             
-            # Split into chunks
-            chunks = self.text_splitter.split_documents(documents)
-            
-            if not chunks:
+            if not result["chunks"]:
                 print("Error: Failed to create text chunks from PDF content.")
                 return False
-
-            # Create vector store
-            print(f"Creating knowledge base for {pdf_path.name}...")
-            self.vectorstore = Chroma.from_documents(
-                documents=chunks,
-                embedding=self.embeddings,
-                persist_directory=Config.VECTOR_STORE_PATH
-            )
             
             self.current_pdf = pdf_path.name
             print(f"Successfully loaded: {pdf_path.name}")
-            print(f"Pages processed: {len(documents)}")
-            print(f"Chunks created: {len(chunks)}")
+            print(f"Pages processed: {result['pages']}")
+            print(f"Chunks created: {result['chunks']}")
             
             return True
             
@@ -158,6 +371,9 @@ class PDFProcessor:
         """
         Load multiple PDFs into a single vector store
         
+        Only new or changed PDFs are extracted and embedded; PDFs removed
+        from disk since the last load are purged from the store.
+        
         Args:
             pdf_paths: List of Path objects to PDF files
             
@@ -165,11 +381,18 @@ class PDFProcessor:
             bool: True if successful, False otherwise
         """
         try:
-            all_documents = []
+            with telemetry.span("load.open"):
+                self._open_vectorstore()
+            purged = self._purge_missing()
+            
             total_pages = 0
+            total_chunks = 0
+            skipped = 0
+            available = 0
+            pending = []
             
-            for pdf_path in pdf_paths:
-                print(f"\n[{pdf_paths.index(pdf_path) + 1}/{len(pdf_paths)}] Processing: {pdf_path.name}")
+            for index, pdf_path in enumerate(pdf_paths, start=1):
+                print(f"[{index}/{len(pdf_paths)}] Checking: {pdf_path.name}")
                 
                 if not pdf_path.exists():
                     print(f"  Warning: PDF file not found at {pdf_path}")
@@ -179,72 +402,59 @@ class PDFProcessor:
                     print(f"  Warning: File must be a PDF, skipping")
                     continue
                 
-                documents = []
-                try:
-                    doc = fitz.open(str(pdf_path))
-                    
-                    if doc.is_closed or doc.page_count == 0:
-                        print(f"  Warning: PDF is empty or could not be opened")
-                        continue
-                    
-                    for page_num in range(doc.page_count):
-                        page = doc.load_page(page_num)
-                        
-                        # 1. Try standard text extraction
-                        text = page.get_text("text").strip()
-                        
-                        # 2. Fall back to OCR if no text found and Tesseract is available
-                        if not text and self._tesseract_available:
-                            # Render page to image
-                            pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
-                            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                            text = pytesseract.image_to_string(img).strip()
-                        
-                        if text:
-                            documents.append(
-                                Document(
-                                    page_content=text,
-                                    metadata={
-                                        "source": pdf_path.name,
-                                        "page": page_num + 1
-                                    }
-                                )
-                            )
-                    doc.close()
-                    
-                    if documents:
-                        all_documents.extend(documents)
-                        total_pages += len(documents)
-                        print(f"  Extracted {len(documents)} pages")
-                    else:
-                        print(f"  Warning: No text content could be extracted")
-                    
-                except Exception as e:
-                    print(f"  Error processing {pdf_path.name}: {str(e)}")
+                state, digest = self.manifest.check(pdf_path)
+                if state == IngestManifest.UNCHANGED:
+                    print(f"  Unchanged, skipping")
+                    skipped += 1
+                    available += 1
                     continue
+                
+                pending.append((pdf_path, digest))
             
-            if not all_documents:
-                print("\nError: No text content could be extracted from any PDF")
-                return False
+            if pending:
+                print(
+                    f"\nIngesting {len(pending)} PDF(s) with {self.extractor.workers} extraction worker(s), "
+                    f"{Config.INGEST_EMBED_BATCH} chunks per embedding batch..."
+                )
+                from .ingest_pipeline import IngestPipeline
+                results = IngestPipeline(self).ingest(pending)
+            else:
+                results = {}
             
-            # Split into chunks
-            print(f"\nCreating knowledge base from {len(pdf_paths)} PDF(s)...")
-            chunks = self.text_splitter.split_documents(all_documents)
+            for pdf_path, _ in pending:
+                result = results[pdf_path]
+                if result["error"]:
+                    print(f"  Error processing {pdf_path.name}: {result['error']}")
+                    continue
+                
+                ocr_stats = result["ocr"]
+                if ocr_stats.get("ocr") or ocr_stats.get("blank"):
+                    print(
+                        f"  {pdf_path.name} OCR: {ocr_stats['ocr']} page(s), {ocr_stats['blank']} blank, "
+                        f"{ocr_stats['cached']} from cache"
+                    )
+                if not result["chunks"]:
+                    print(f"  Warning: No text content could be extracted from {pdf_path.name}")
+                    continue
+                
+                print(f"  {pdf_path.name}: {result['pages']} pages, {result['chunks']} chunks")
+                total_pages += result["pages"]
+                total_chunks += result["chunks"]
+                available += 1
             
-            if not chunks:
-                print("Error: Failed to create text chunks from PDF content")
-                return False
+            self._save_indexes()
             
-            # Create vector store with all documents
-            self.vectorstore = Chroma.from_documents(
-                documents=chunks,
-                embedding=self.embeddings,
-                persist_directory=Config.VECTOR_STORE_PATH
-            )
+            if not available:
+                print("\nError: No text content could be extracted from any PDF")
+                return False
             
             self.current_pdf = f"{len(pdf_paths)} PDFs from syllabus"
+            print(f"\nKnowledge base updated from {len(pdf_paths)} PDF(s)")
+            print(f"Unchanged PDFs skipped: {skipped}")
+            if purged:
+                print(f"Deleted PDFs purged: {purged}")
             print(f"Total pages processed: {total_pages}")
-            print(f"Total chunks created: {len(chunks)}")
+            print(f"Total chunks created: {total_chunks}")
             
             return True
             
@@ -252,26 +462,199 @@ class PDFProcessor:
             print(f"Fatal error loading PDFs: {str(e)}")
             return False
     
-    def search(self, query: str, k: int = None) -> List[Document]:
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a query with the same model used for the stored chunks"""
+        return self.embeddings.embed_query(query)
+    
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed many queries in one batched model call"""
+        # The model uses no query prefix, so document embedding gives the same vectors
+        return self.embeddings.embed_documents(queries)
+    
+    def _dense_search(
+        self,
+        query: str,
+        k: int,
+        embedding: List[float] = None,
+        sources: List[str] = None
+    ) -> List[Tuple["Document", float]]:
+        """
+        Nearest chunks by embedding similarity
+        
+        Returns:
+            List of (document, cosine similarity), best first; the similarity
+            is also kept in the document's "dense_score" metadata
+        """
+        if embedding is None:
+            embedding = self.embed_query(query)
+        results = self.vectorstore.search(embedding, k, sources)
+        for doc, score in results:
+            doc.metadata["dense_score"] = score
+        return results
+    
+    def _lexical_search(self, query: str, k: int, sources: List[str] = None) -> List[Tuple["Document", float]]:
+        """
+        Best BM25 matches for exact terms
+        
+        Returns:
+            List of (document, fraction of query terms it contains), best BM25 first;
+            the fraction is also kept in the document's "lexical_score" metadata
+        """
+        from .lexical_index import tokenize
+        
+        query_terms = set(tokenize(query))
+        if not query_terms:
+            return []
+        
+        results = []
+        for doc, _ in self.lexical_index.search(query, k, sources):
+            coverage = len(query_terms & set(tokenize(doc.page_content))) / len(query_terms)
+            doc.metadata["lexical_score"] = coverage
+            results.append((doc, coverage))
+        return results
+    
+    @staticmethod
+    def _lexical_threshold(query: str) -> float:
+        """
+        Query-term coverage a keyword hit needs
+        
+        At least Config.LEXICAL_MIN_COVERAGE of the terms and at least
+        Config.LEXICAL_MIN_TERMS of them (every term of shorter queries), so
+        a short off-topic query cannot pass on one shared common word.
+        """
+        from .lexical_index import tokenize
+        
+        terms = len(set(tokenize(query)))
+        if not terms:
+            return 1.0
+        return max(Config.LEXICAL_MIN_COVERAGE, min(Config.LEXICAL_MIN_TERMS, terms) / terms)
+    
+    @staticmethod
+    def _keep_relevant(results: List[Tuple["Document", float]], threshold: float) -> List[Tuple["Document", float]]:
+        """Drop results below the absolute threshold or well below the best result"""
+        if not results:
+            return []
+        best = max(score for _, score in results)
+        cutoff = max(threshold, best * Config.RELATIVE_SCORE_CUTOFF)
+        return [(doc, score) for doc, score in results if score >= cutoff]
+    
+    def search_with_scores(
+        self,
+        query: str,
+        k: int = None,
+        embedding: List[float] = None,
+        mode: str = None,
+        gated: bool = True,
+        sources: List[str] = None
+    ) -> List[Tuple["Document", float]]:
+        """
+        Search for relevant documents with relevance scores
+        
+        With gating, dense hits below Config.RELEVANCE_THRESHOLD (cosine) and
+        keyword hits covering less than Config.LEXICAL_MIN_COVERAGE of the
+        query terms or fewer than Config.LEXICAL_MIN_TERMS of them are
+        dropped, as are hits scoring well below the best one, so an
+        off-topic query returns an empty list.
+        
+        Unless `sources` names the documents to search, the query is first
+        routed to the Config.ROUTE_TOP_DOCS documents whose centroid is
+        closest to it, and only their chunks are searched.
+        
+        Args:
+            query: Search query
+            k: Maximum number of results to return
+            embedding: Precomputed query embedding, to avoid embedding twice
+            mode: "dense", "lexical" or "hybrid" (defaults to Config.RETRIEVAL_MODE)
+            gated: Apply relevance thresholds
+            sources: Only search these documents (source file names)
+            
+        Returns:
+            List of (document, score) pairs, best first. The score is the
+            cosine similarity in dense mode, the query-term coverage in lexical
+            mode and the fused rank score in hybrid mode; every hit also keeps
+            the scores of the retrievers that found it in its "dense_score" /
+            "lexical_score" metadata.
+        """
+        if not self._ensure_vectorstore():
+            return []
+        
+        k = k or Config.MAX_CONTEXT_DOCS
+        mode = mode or Config.RETRIEVAL_MODE
+        candidates = k if mode != "hybrid" else max(k, Config.HYBRID_CANDIDATES)
+        
+        if sources is None and Config.ROUTE_TOP_DOCS > 0 and len(self.router) > Config.ROUTE_TOP_DOCS:
+            if embedding is None and mode != "lexical":
+                embedding = self.embed_query(query)
+            if embedding is not None:
+                with telemetry.span("search.route"):
+                    sources = self.router.route(embedding, Config.ROUTE_TOP_DOCS)
+        
+        dense = []
+        if mode in ("dense", "hybrid"):
+            with telemetry.span("search.dense"):
+                dense = self._dense_search(query, candidates, embedding, sources)
+            if gated:
+                dense = self._keep_relevant(dense, Config.RELEVANCE_THRESHOLD)
+        
+        lexical = []
+        if mode in ("lexical", "hybrid"):
+            with telemetry.span("search.lexical"):
+                lexical = self._lexical_search(query, candidates, sources)
+            if gated:
+                lexical = self._keep_relevant(lexical, self._lexical_threshold(query))
+        
+        if mode != "hybrid":
+            return (dense or lexical)[:k]
+        
+        # Hybrid: fuse both rankings so exact-term hits and semantic hits both surface
+        from .lexical_index import reciprocal_rank_fusion
+        return reciprocal_rank_fusion([dense, lexical], k, Config.RRF_K)
+    
+    def search(
+        self,
+        query: str,
+        k: int = None,
+        embedding: List[float] = None,
+        mode: str = None,
+        sources: List[str] = None
+    ) -> List["Document"]:
         """
         Search vector store for relevant documents
         
         Args:
             query: Search query
             k: Number of results to return
+            embedding: Precomputed query embedding, to avoid embedding twice
+            mode: "dense", "lexical" or "hybrid" (defaults to Config.RETRIEVAL_MODE)
+            sources: Only search these documents (default: route to the closest ones)
             
         Returns:
             List of relevant documents
         """
-        if not self.vectorstore:
-            return []
+        return [doc for doc, _ in self.search_with_scores(query, k, embedding, mode, gated=False, sources=sources)]
+    
+    def recall_report(self, k: int = 10) -> Optional[Dict]:
+        """
+        Recall@k of an approximate vector index against exact search
         
-        k = k or Config.MAX_CONTEXT_DOCS
-        return self.vectorstore.similarity_search(query, k=k)
+        Returns:
+            Report dict, or None if the vector store searches exactly
+        """
+        vectorstore = self._ensure_vectorstore()
+        if vectorstore is None or not hasattr(vectorstore, "recall_report"):
+            return None
+        return vectorstore.recall_report(k=k)
+    
+    def corpus_fingerprint(self) -> str:
+        """Hash identifying the exact set of ingested PDF contents and settings"""
+        digest = hashlib.sha256(json.dumps(self.manifest.settings, sort_keys=True).encode())
+        for key in sorted(self.manifest.files):
+            digest.update(self.manifest.files[key]["sha256"].encode())
+        return digest.hexdigest()
     
     def is_loaded(self) -> bool:
-        """Check if a PDF is currently loaded"""
-        return self.vectorstore is not None
+        """Check if a PDF is currently loaded (or restored from the previous session)"""
+        return self.vectorstore is not None or self._restored
     
     def get_current_pdf(self) -> str:
         """Get name of currently loaded PDF"""
@@ -0,0 +1,242 @@
+"""
+HTTP Server Mode - serve one shared AITutor to many students
+"""
+import asyncio
+import re
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+from aiohttp import web
+from .config import Config
+from .ai_tutor import AITutor, QuestionPlan
+from .telemetry import telemetry
+
+
+class QueueFullError(Exception):
+    """Raised when the LLM queue cannot accept another question"""
+
+
+class ReadWriteLock:
+    """
+    asyncio reader/writer lock: many readers or one writer.
+
+    Question planning reads the vector store, BM25 index and manifest that a
+    load rewrites, so plans hold the read side and loads the write side. A
+    waiting writer holds back new readers, so a stream of questions cannot
+    starve a load.
+    """
+
+    def __init__(self):
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @asynccontextmanager
+    async def read(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._writing and not self._writers_waiting)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._readers -= 1
+                self._condition.notify_all()
+
+    @asynccontextmanager
+    async def write(self):
+        async with self._condition:
+            self._writers_waiting += 1
+            try:
+                await self._condition.wait_for(lambda: not self._writing and not self._readers)
+            finally:
+                self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class TutorServer:
+    """
+    asyncio HTTP service exposing ask / load / status on top of one AITutor.
+
+    The vector store and embedding model are shared across requests.
+    Questions that need the LLM go through a bounded queue drained by
+    `workers` generation workers; when the queue is full new questions are
+    rejected with 429. Identical questions arriving while one is already
+    being answered are coalesced onto the same generation. Planning and
+    loads share a ReadWriteLock, so a load never runs under a search.
+    """
+
+    def __init__(self, tutor: AITutor, workers: Optional[int] = None, queue_size: Optional[int] = None):
+        self.tutor = tutor
+        self.workers = workers or Config.SERVER_WORKERS
+        self.queue_size = queue_size or Config.SERVER_QUEUE_SIZE
+
+        self.queue: Optional[asyncio.Queue] = None
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"asked": 0, "coalesced": 0, "rejected": 0, "llm_calls": 0}
+
+        # Retrieval and generation are blocking calls; keep them off the event loop
+        self._plan_pool = ThreadPoolExecutor(max_workers=self.workers * 2, thread_name_prefix="edubridge-plan")
+        self._llm_pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="edubridge-llm")
+        self._worker_tasks = []
+        self._store_lock: Optional[ReadWriteLock] = None
+
+    @staticmethod
+    def _question_key(question: str) -> str:
+        """Normalize a question so trivially different spellings coalesce"""
+        return re.sub(r"\s+", " ", question.strip().lower()).rstrip("?!. ")
+
+    async def _worker(self):
+        """Drain the queue, running one LLM generation at a time"""
+        loop = asyncio.get_running_loop()
+        while True:
+            plan, future = await self.queue.get()
+            try:
+                self.stats["llm_calls"] += 1
+                answer = await loop.run_in_executor(self._llm_pool, self.tutor.generate, plan)
+                if not future.done():
+                    future.set_result(answer)
+            except Exception as e:
+                if not future.done():
+                    future.set_result(f"Error generating response: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+    async def _answer(self, question: str) -> Dict:
+        """Plan a question and, if it needs the LLM, enqueue it"""
+        loop = asyncio.get_running_loop()
+        if self.queue.full():
+            raise QueueFullError()
+
+        async with self._store_lock.read():
+            plan: QuestionPlan = await loop.run_in_executor(self._plan_pool, self.tutor.plan_question, question)
+        if plan.prompt is None:
+            return {"answer": plan.response, "sources": plan.sources(), "cache_hit": plan.cache_hit, "prompt_tokens": 0}
+
+        future = loop.create_future()
+        try:
+            self.queue.put_nowait((plan, future))
+        except asyncio.QueueFull:
+            raise QueueFullError()
+        answer = await future
+        return {"answer": answer, "sources": plan.sources(), "cache_hit": False, "prompt_tokens": plan.prompt_tokens}
+
+    async def handle_ask(self, request: web.Request) -> web.Response:
+        """POST /ask {"question": "..."}"""
+        try:
+            body = await request.json()
+            question = str(body.get("question", "")).strip()
+        except Exception:
+            question = ""
+        if not question:
+            return web.json_response({"error": "Missing 'question'"}, status=400)
+
+        self.stats["asked"] += 1
+        key = self._question_key(question)
+
+        shared = self.inflight.get(key)
+        if shared is not None:
+            self.stats["coalesced"] += 1
+            coalesced = True
+        else:
+            shared = asyncio.ensure_future(self._answer(question))
+            self.inflight[key] = shared
+            shared.add_done_callback(lambda _: self.inflight.pop(key, None))
+            coalesced = False
+
+        try:
+            # shield: one client disconnecting must not cancel the others' answer
+            result = await asyncio.shield(shared)
+        except QueueFullError:
+            self.stats["rejected"] += 1
+            return web.json_response(
+                {"error": "Server busy, try again shortly"},
+                status=429,
+                headers={"Retry-After": "1"}
+            )
+        except Exception as e:
+            return web.json_response({"error": str(e)}, status=500)
+
+        return web.json_response(dict(result, coalesced=coalesced))
+
+    async def handle_load(self, request: web.Request) -> web.Response:
+        """POST /load {"path": "optional/file.pdf"} - default loads src/syllabus"""
+        try:
+            body = await request.json()
+        except Exception:
+            body = {}
+        path = body.get("path") if isinstance(body, dict) else None
+
+        loop = asyncio.get_running_loop()
+        async with self._store_lock.write():
+            if path:
+                success = await loop.run_in_executor(self._plan_pool, self.tutor.load_pdf, path)
+                count = 1 if success else 0
+            else:
+                success, count = await loop.run_in_executor(self._plan_pool, self.tutor.load_all_pdfs)
+
+        return web.json_response({"success": success, "count": count}, status=200 if success else 500)
+
+    async def handle_status(self, request: web.Request) -> web.Response:
+        """GET /status"""
+        status = dict(self.tutor.get_status())
+        status["Server"] = dict(
+            self.stats,
+            queued=self.queue.qsize(),
+            queue_size=self.queue_size,
+            inflight=len(self.inflight),
+            workers=self.workers
+        )
+        return web.json_response(status)
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        """GET /metrics - stage timings in Prometheus text format"""
+        return web.Response(text=telemetry.to_prometheus(), content_type="text/plain")
+
+    async def _on_startup(self, app: web.Application):
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self._store_lock = ReadWriteLock()
+        self._worker_tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def _on_cleanup(self, app: web.Application):
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._plan_pool.shutdown(wait=False)
+        self._llm_pool.shutdown(wait=False)
+
+    def create_app(self) -> web.Application:
+        """Build the aiohttp application"""
+        app = web.Application()
+        app.router.add_post("/ask", self.handle_ask)
+        app.router.add_post("/load", self.handle_load)
+        app.router.add_get("/status", self.handle_status)
+        app.router.add_get("/metrics", self.handle_metrics)
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+
+def serve(host: Optional[str] = None, port: Optional[int] = None):
+    """Start the HTTP server with a shared tutor (blocks until interrupted)"""
+    Config.validate()
+    tutor = AITutor()
+    if tutor.restore_knowledge_base():
+        print(f"[OK] Knowledge base restored: {tutor.pdf_processor.get_current_pdf()}")
+    else:
+        print("[INFO] No knowledge base yet - POST /load to build one")
+    tutor.prewarm()
+
+    server = TutorServer(tutor)
+    web.run_app(
+        server.create_app(),
+        host=host or Config.SERVER_HOST,
+        port=port or Config.SERVER_PORT
+    )
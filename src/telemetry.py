@@ -0,0 +1,145 @@
+"""
+Telemetry - span timing aggregated into rolling histograms
+"""
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterable, Iterator, Optional
+from .config import Config
+
+# Histogram bucket upper bounds in seconds (Prometheus "le" labels)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_NOOP = nullcontext()
+
+
+class RollingHistogram:
+    """
+    Durations of one span: cumulative bucket counts plus a window of recent samples.
+
+    Buckets, count and sum cover everything since start (as Prometheus
+    expects); percentiles are computed over the last `window` samples so
+    they follow recent behaviour.
+    """
+
+    def __init__(self, window: int):
+        self.buckets = [0] * (len(BUCKETS) + 1)  # Last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=window)
+
+    def add(self, seconds: float):
+        index = 0
+        while index < len(BUCKETS) and seconds > BUCKETS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+
+    def summary(self) -> Dict:
+        """Count, mean and recent p50/p95/p99 in milliseconds"""
+        ordered = sorted(self.recent)
+
+        def pct(fraction: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 2)
+
+        return {
+            "count": self.count,
+            "total_s": round(self.total, 3),
+            "mean_ms": round(self.total / self.count * 1000, 2),
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+        }
+
+
+class Telemetry:
+    """
+    Collects named spans ("question.embed", "load.split", ...).
+
+    When disabled, `span` returns a shared no-op context manager and
+    `record` returns immediately, so instrumented code pays one attribute
+    check per span.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None, window: Optional[int] = None):
+        self.enabled = Config.TELEMETRY_ENABLED if enabled is None else enabled
+        self.window = window or Config.TELEMETRY_WINDOW
+        self.histograms: Dict[str, RollingHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float):
+        """Add one duration to a span's histogram"""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = RollingHistogram(self.window)
+            histogram.add(seconds)
+
+    def span(self, name: str):
+        """Context manager timing the enclosed block"""
+        if not self.enabled:
+            return _NOOP
+        return self._span(name)
+
+    @contextmanager
+    def _span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def timed_iter(self, name: str, iterable: Iterable) -> Iterator:
+        """Yield from iterable, recording the time spent producing each item"""
+        if not self.enabled:
+            yield from iterable
+            return
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.record(name, time.perf_counter() - start)
+            yield item
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Per-span summaries, sorted by span name"""
+        with self._lock:
+            return {name: self.histograms[name].summary() for name in sorted(self.histograms)}
+
+    def to_json(self) -> str:
+        return json.dumps({"enabled": self.enabled, "spans": self.snapshot()}, indent=2)
+
+    def to_prometheus(self) -> str:
+        """Histograms in the Prometheus text exposition format"""
+        lines = [
+            "# HELP edubridge_stage_seconds Time spent in each EduBridge stage",
+            "# TYPE edubridge_stage_seconds histogram",
+        ]
+        with self._lock:
+            for name in sorted(self.histograms):
+                histogram = self.histograms[name]
+                cumulative = 0
+                for bound, count in zip(BUCKETS + (float("inf"),), histogram.buckets):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'edubridge_stage_seconds_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+                lines.append(f'edubridge_stage_seconds_sum{{stage="{name}"}} {histogram.total}')
+                lines.append(f'edubridge_stage_seconds_count{{stage="{name}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+
+# Shared by the tutor, PDF processor, CLI and server
+telemetry = Telemetry()
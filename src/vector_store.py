@@ -0,0 +1,113 @@
+"""
+Vector Store Backends
+
+PDFProcessor talks to its vector store through a small interface:
+
+    count() -> int
+    upsert(ids, embeddings, documents, metadatas)
+    delete(ids)
+    get_all() -> (ids, texts, metadatas)
+    search(embedding, k, sources=None) -> [(document, cosine similarity), ...]
+    search_batch(embeddings, k, sources=None) -> one result list per query
+    reset()    # remove every chunk
+    persist()  # make writes since the last call durable
+
+`sources` restricts a search to the chunks of the named documents (the
+per-document shards chosen by the router or a user filter).
+
+`Config.VECTOR_BACKEND` selects the implementation: "chroma" (the
+default), "flat", a memory-mapped NumPy matrix scanned by brute force
+(see flat_index.py), or "ivfpq", the same files plus a compressed
+IVF-PQ search path for very large corpora (see ivfpq_index.py).
+"""
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+from .config import Config
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+BACKENDS = ["chroma", "flat", "ivfpq"]
+
+
+class ChromaStore:
+    """Chroma collection persisted at VECTOR_STORE_PATH"""
+
+    def __init__(self, embeddings):
+        """
+        Args:
+            embeddings: LangChain embedding model (used by Chroma for text queries)
+        """
+        self.embeddings = embeddings
+        self._store = self._open()
+
+    def _open(self):
+        from langchain_community.vectorstores import Chroma
+        return Chroma(
+            persist_directory=Config.VECTOR_STORE_PATH,
+            embedding_function=self.embeddings
+        )
+
+    def count(self) -> int:
+        return self._store._collection.count()
+
+    def upsert(self, ids: List[str], embeddings: List[List[float]], documents: List[str], metadatas: List[Dict]):
+        self._store._collection.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def delete(self, ids: List[str]):
+        self._store.delete(ids=ids)
+
+    def get_all(self) -> Tuple[List[str], List[str], List[Dict]]:
+        stored = self._store.get(include=["documents", "metadatas"])
+        return stored["ids"], stored["documents"], stored["metadatas"]
+
+    def search(
+        self,
+        embedding: Sequence[float],
+        k: int,
+        sources: Optional[Sequence[str]] = None
+    ) -> List[Tuple["Document", float]]:
+        search_filter = None
+        if sources is not None:
+            if not sources:
+                return []
+            search_filter = {"source": {"$in": list(sources)}}
+        results = self._store.similarity_search_by_vector_with_relevance_scores(
+            list(embedding), k=k, filter=search_filter
+        )
+        # Chroma returns squared L2 distances; for unit vectors d = 2 - 2 * cos
+        return [(doc, 1.0 - distance / 2.0) for doc, distance in results]
+
+    def search_batch(
+        self,
+        embeddings: Sequence[Sequence[float]],
+        k: int,
+        sources: Optional[Sequence[str]] = None
+    ) -> List[List[Tuple["Document", float]]]:
+        return [self.search(embedding, k, sources) for embedding in embeddings]
+
+    def reset(self):
+        self._store.delete_collection()
+        self._store = self._open()
+
+    def persist(self):
+        """Chroma writes through on every call"""
+
+
+def open_vector_store(embeddings, backend: str = None):
+    """
+    Open the configured vector store backend.
+
+    Args:
+        embeddings: LangChain embedding model
+        backend: One of BACKENDS (defaults to Config.VECTOR_BACKEND)
+    """
+    backend = backend or Config.VECTOR_BACKEND
+    if backend == "flat":
+        from .flat_index import FlatVectorStore
+        return FlatVectorStore()
+    if backend == "ivfpq":
+        from .ivfpq_index import IVFPQStore
+        return IVFPQStore()
+    if backend == "chroma":
+        return ChromaStore(embeddings)
+    raise ValueError(f"Unknown VECTOR_BACKEND '{backend}', expected one of: {', '.join(BACKENDS)}")
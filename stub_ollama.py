@@ -0,0 +1,220 @@
+"""
+Stub Ollama Server
+Answers the Ollama HTTP API with canned responses so EduBridge can be run
+and tested without a real model.
+
+Latency before the first token can follow a fixed, uniform, exponential or
+lognormal distribution, tokens are streamed at a configurable rate, and a
+share of requests can fail with an HTTP error or break off mid-stream.
+
+Usage: python stub_ollama.py [--port 11435] [--latency 0.5] [--latency-dist fixed]
+                             [--jitter 0.5] [--token-rate 0] [--error-rate 0]
+                             [--abort-rate 0] [--seed N]
+Then:  OLLAMA_BASE_URL=http://localhost:11435 python main.py
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from aiohttp import web
+
+CANNED_RESPONSE = (
+    "Answer: This is a stub answer generated without a language model.\n\n"
+    "Explanation: The stub Ollama server returns the same text for every prompt "
+    "so the rest of the pipeline can be exercised.\n\n"
+    "Source: stub.pdf, Page 1"
+)
+
+LATENCY_DISTRIBUTIONS = ["fixed", "uniform", "exponential", "lognormal"]
+
+
+class StubOllama:
+    """Minimal implementation of /api/tags and /api/generate"""
+
+    def __init__(
+        self,
+        model: str,
+        latency: float,
+        response: str = CANNED_RESPONSE,
+        latency_dist: str = "fixed",
+        jitter: float = 0.5,
+        token_rate: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        abort_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            model: Model name reported by the server
+            latency: Mean seconds before the first token
+            response: Text returned for every prompt
+            latency_dist: One of LATENCY_DISTRIBUTIONS
+            jitter: Spread of the distribution (uniform: +/- fraction of the mean,
+                lognormal: sigma); ignored by fixed and exponential
+            token_rate: Streamed tokens (words) per second; 0 = as fast as possible
+            error_rate: Fraction of generate requests answered with error_status
+            error_status: HTTP status used for injected errors
+            abort_rate: Fraction of streamed responses that end with an error midway
+            seed: Random seed for reproducible runs
+        """
+        self.model = model
+        self.latency = latency
+        self.response = response
+        self.latency_dist = latency_dist
+        self.jitter = jitter
+        self.token_rate = token_rate
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.abort_rate = abort_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.aborts = 0
+
+    def _sample_latency(self) -> float:
+        """Seconds to wait before the first token"""
+        if self.latency <= 0:
+            return 0.0
+        if self.latency_dist == "uniform":
+            spread = self.latency * self.jitter
+            return max(0.0, self.random.uniform(self.latency - spread, self.latency + spread))
+        if self.latency_dist == "exponential":
+            return self.random.expovariate(1.0 / self.latency)
+        if self.latency_dist == "lognormal":
+            # Parameterized so the mean stays at self.latency
+            sigma = self.jitter
+            return self.random.lognormvariate(math.log(self.latency) - sigma ** 2 / 2, sigma)
+        return self.latency
+
+    def _chunk(self, text: str, done: bool, **extra) -> dict:
+        chunk = {
+            "model": self.model,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "response": text,
+            "done": done,
+        }
+        chunk.update(extra)
+        return chunk
+
+    def _text_for(self, options: dict) -> str:
+        """Canned response cut at the first stop sequence and at num_predict words"""
+        text = self.response
+        for stop in options.get("stop") or []:
+            if stop in text:
+                text = text[:text.index(stop)]
+        limit = options.get("num_predict")
+        if limit and limit > 0:
+            text = " ".join(text.split(" ")[:limit])
+        return text
+
+    def _final_fields(self, prompt: str, text: str, started: float) -> dict:
+        elapsed_ns = int((time.perf_counter() - started) * 1e9)
+        return {
+            "done_reason": "stop",
+            "context": [],
+            "total_duration": elapsed_ns,
+            "load_duration": 0,
+            "prompt_eval_count": len(prompt.split()),
+            "prompt_eval_duration": 0,
+            "eval_count": len(text.split()),
+            "eval_duration": elapsed_ns,
+        }
+
+    async def handle_tags(self, request: web.Request) -> web.Response:
+        return web.json_response({"models": [{"name": self.model, "model": self.model}]})
+
+    async def handle_generate(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        prompt = body.get("prompt", "")
+        self.requests += 1
+        started = time.perf_counter()
+        await asyncio.sleep(self._sample_latency())
+
+        if not prompt:
+            # Ollama treats an empty prompt as "load the model" and replies once
+            return web.json_response(self._chunk("", True, done_reason="load"))
+
+        if self.random.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({"error": "injected failure"}, status=self.error_status)
+
+        text = self._text_for(body.get("options") or {})
+        words = text.split(" ")
+        delay = 1.0 / self.token_rate if self.token_rate > 0 else 0.0
+
+        if not body.get("stream", True):
+            await asyncio.sleep(delay * len(words))
+            return web.json_response(
+                self._chunk(text, True, **self._final_fields(prompt, text, started))
+            )
+
+        abort_at = len(words) // 2 if self.random.random() < self.abort_rate else None
+        stream = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await stream.prepare(request)
+        for index, word in enumerate(words):
+            if index == abort_at:
+                self.aborts += 1
+                await stream.write((json.dumps({"error": "injected stream abort"}) + "\n").encode())
+                await stream.write_eof()
+                return stream
+            await stream.write((json.dumps(self._chunk(word + " ", False)) + "\n").encode())
+            if delay:
+                await asyncio.sleep(delay)
+        final = self._chunk("", True, **self._final_fields(prompt, text, started))
+        await stream.write((json.dumps(final) + "\n").encode())
+        await stream.write_eof()
+        return stream
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        """GET /stub/stats - counters for load tests"""
+        return web.json_response({"requests": self.requests, "errors": self.errors, "aborts": self.aborts})
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/api/tags", self.handle_tags)
+        app.router.add_post("/api/generate", self.handle_generate)
+        app.router.add_get("/stub/stats", self.handle_stats)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub Ollama server for local testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--model", default="llama3.2:1b")
+    parser.add_argument("--latency", type=float, default=0.5, help="Mean seconds before the first token")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--jitter", type=float, default=0.5,
+                        help="Distribution spread (uniform: +/- fraction of mean, lognormal: sigma)")
+    parser.add_argument("--token-rate", type=float, default=0.0, help="Tokens per second (0 = unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status for injected failures")
+    parser.add_argument("--abort-rate", type=float, default=0.0, help="Fraction of streams cut off midway")
+    parser.add_argument("--seed", type=int, help="Random seed")
+    args = parser.parse_args()
+
+    stub = StubOllama(
+        args.model,
+        args.latency,
+        latency_dist=args.latency_dist,
+        jitter=args.jitter,
+        token_rate=args.token_rate,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        abort_rate=args.abort_rate,
+        seed=args.seed
+    )
+    print(
+        f"Stub Ollama listening on http://{args.host}:{args.port} (model {args.model}, "
+        f"{args.latency_dist} latency {args.latency}s, token rate {args.token_rate or 'unlimited'})"
+    )
+    web.run_app(stub.create_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
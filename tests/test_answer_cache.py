@@ -0,0 +1,35 @@
+"""
+Answer cache: what is stored, and when stored answers are dropped
+"""
+from src.ai_tutor import AITutor
+from src.config import Config
+
+
+class RecordingCache:
+    def __init__(self):
+        self.stored = []
+
+    def store(self, question, embedding, answer, fingerprint):
+        self.stored.append(answer)
+
+
+def test_not_found_is_not_cached():
+    tutor = AITutor()
+    tutor._answer_cache = RecordingCache()
+
+    tutor._remember(("q", [1.0], "fp"), "Not Found")
+    tutor._remember(("q", [1.0], "fp"), "Answer: yes")
+
+    assert tutor._answer_cache.stored == ["Answer: yes"]
+
+
+def test_fingerprint_follows_every_answer_path(monkeypatch):
+    tutor = AITutor()
+    monkeypatch.setattr(tutor.pdf_processor, "corpus_fingerprint", lambda: "corpus")
+    base = tutor._cache_fingerprint()
+
+    monkeypatch.setattr(Config, "FAST_MODEL", "tiny:1b")
+    with_fast = tutor._cache_fingerprint()
+    monkeypatch.setattr(Config, "EXTRACTIVE_ANSWERS", not Config.EXTRACTIVE_ANSWERS)
+
+    assert len({base, with_fast, tutor._cache_fingerprint()}) == 3
@@ -0,0 +1,118 @@
+"""
+Page-aware chunker: page boundaries and the token budget
+"""
+from langchain_core.documents import Document
+
+from src.chunker import PageAwareChunker, split_documents
+from src.config import Config
+from src.ingest_manifest import IngestManifest
+
+PAGES = [
+    """Introduction to Networks
+Networks connect computers so they can exchange data. A packet is a unit of data sent over a net-
+work. Routers forward packets between networks. Switches connect devices within one network and
+learn which port each device is on.
+
+12
+Protocols
+A protocol is a set of rules for communication. TCP provides reliable delivery by numbering every byte and
+retransmitting lost segments. UDP is faster but offers no delivery""",
+    """guarantee at all. DNS maps names to addresses.
+Page 2 of 3
+Security
+Firewalls filter traffic. Encryption protects data in transit.""",
+]
+
+
+def pages(texts, source="net.pdf"):
+    return [Document(page_content=text, metadata={"source": source, "page": number})
+            for number, text in enumerate(texts, start=1)]
+
+
+def chunk(texts, chunk_tokens=400, overlap_tokens=0, across_pages=True):
+    chunker = PageAwareChunker(chunk_tokens, overlap_tokens, across_pages)
+    out = []
+    for document in pages(texts):
+        out.extend(chunker.feed([document]))
+    return out + chunker.finish()
+
+
+def test_sentence_continues_across_page_break():
+    chunks = chunk(PAGES)
+    text = " ".join(document.page_content for document in chunks)
+
+    assert "offers no delivery guarantee at all." in text
+    assert chunks[0].metadata["page"] == 1
+    assert chunks[-1].metadata["page_end"] == 2
+
+
+def test_page_numbers_dropped_and_hyphens_joined():
+    text = " ".join(document.page_content for document in chunk(PAGES))
+
+    assert "Page 2 of 3" not in text
+    assert "\n12\n" not in text
+    assert "network." in text
+
+
+def test_chunks_stay_within_pages_when_not_across_pages():
+    chunks = chunk(PAGES, across_pages=False)
+
+    assert all(document.metadata["page"] == document.metadata["page_end"] for document in chunks)
+    assert {document.metadata["page"] for document in chunks} == {1, 2}
+    assert chunks[-2].page_content.endswith("offers no delivery")
+
+
+def test_chunks_respect_token_budget_and_end_on_sentences():
+    chunk_tokens = 40
+    chunks = chunk(PAGES, chunk_tokens=chunk_tokens, overlap_tokens=10)
+    limit = PageAwareChunker.TAIL_GROW * chunk_tokens * Config.CHARS_PER_TOKEN
+
+    assert len(chunks) > 2
+    for document in chunks:
+        assert len(document.page_content) <= limit
+        assert document.page_content.endswith((".", "delivery", "Networks", "Protocols", "Security"))
+
+
+def test_overlap_repeats_whole_sentences():
+    chunks = chunk(PAGES, chunk_tokens=40, overlap_tokens=20)
+
+    repeated = [
+        (before, after) for before, after in zip(chunks, chunks[1:])
+        if after.page_content.split(". ")[0] in before.page_content
+    ]
+    assert repeated
+    for _, after in repeated:
+        assert after.page_content[0].isupper()
+
+
+def test_short_tail_folded_into_previous_chunk():
+    body = "Alpha beta gamma delta epsilon zeta eta theta. " * 5
+    chunks = chunk([body + "Short end."], chunk_tokens=50)
+
+    assert chunks[-1].page_content.endswith("Short end.")
+    assert len(chunks[-1].page_content) > len("Short end.")
+
+
+def test_text_without_sentence_ends_is_cut_between_words():
+    words = " ".join(f"cell{number}" for number in range(400))
+    chunks = chunk([words], chunk_tokens=50)
+    target = 50 * Config.CHARS_PER_TOKEN
+
+    assert len(chunks) > 1
+    assert all(len(document.page_content) <= target for document in chunks[:-1])
+    assert " ".join(document.page_content for document in chunks) == words
+
+
+def test_split_documents_uses_one_chunker_per_source():
+    documents = pages(PAGES[:1], "a.pdf") + pages(PAGES[:1], "b.pdf")
+    chunks = split_documents(lambda: PageAwareChunker(400, 0, True), documents)
+
+    assert [document.metadata["source"] for document in chunks] == ["a.pdf", "b.pdf"]
+
+
+def test_recursive_default_keeps_manifest_settings(monkeypatch):
+    monkeypatch.setattr(Config, "CHUNKER", "recursive")
+    assert "chunker" not in IngestManifest.current_settings()
+
+    monkeypatch.setattr(Config, "CHUNKER", "page_aware")
+    assert IngestManifest.current_settings()["chunker"] == "page_aware"
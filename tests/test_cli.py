@@ -0,0 +1,46 @@
+"""
+CLI: question-like commands only run with valid arguments
+"""
+import pytest
+
+from src.cli import EduBridgeCLI
+from src.doc_router import DocumentRouter
+
+
+@pytest.fixture
+def cli(monkeypatch):
+    cli = EduBridgeCLI()
+    router = DocumentRouter([{"name": "biology.pdf"}, {"name": "chapter2-physics.pdf"}])
+    monkeypatch.setattr(type(cli.tutor.pdf_processor), "router", property(lambda self: router))
+    asked, commands = [], []
+    monkeypatch.setattr(cli, "_answer_question", asked.append)
+    monkeypatch.setattr(cli, "_set_focus", commands.append)
+    monkeypatch.setattr(cli, "_show_recall", commands.append)
+    cli.asked, cli.commands = asked, commands
+    return cli
+
+
+@pytest.mark.parametrize("question", [
+    "focus on the main idea of chapter 2?",
+    "docs describing mitosis",
+    "stats show what about variance?",
+    "recall the causes of World War I",
+])
+def test_questions_starting_with_a_command_word_are_answered(cli, question):
+    cli._process_input(question)
+
+    assert cli.asked == [question]
+    assert cli.commands == []
+
+
+@pytest.mark.parametrize("command, argument", [
+    ("focus biology", "biology"),
+    ("focus biology, physics", "biology, physics"),
+    ("focus off", "off"),
+    ("recall 20", "20"),
+])
+def test_commands_with_valid_arguments_run(cli, command, argument):
+    cli._process_input(command)
+
+    assert cli.asked == []
+    assert cli.commands == [argument]
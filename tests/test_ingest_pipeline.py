@@ -0,0 +1,70 @@
+"""
+Ingest pipeline: already extracted pages are chunked, embedded and stored
+"""
+import hashlib
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from src.config import Config
+from src.ingest_pipeline import IngestPipeline
+from src.pdf_processor import PDFProcessor
+
+PAGES = [
+    "Photosynthesis turns light into chemical energy. Chlorophyll absorbs red and blue light.",
+    "Respiration releases that energy again. Mitochondria are where it happens.",
+]
+
+
+class HashingEmbeddings:
+    """Bag-of-words vectors; enough to store and search offline"""
+
+    def embed_query(self, text):
+        vector = np.zeros(64)
+        for word in text.lower().split():
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % 64] += 1
+        return (vector / (np.linalg.norm(vector) or 1.0)).tolist()
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "VECTOR_BACKEND", "flat")
+    monkeypatch.setattr(Config, "FLAT_INDEX_PATH", str(tmp_path / "flat_index"))
+    monkeypatch.setattr(Config, "MANIFEST_PATH", str(tmp_path / "manifest.json"))
+    monkeypatch.setattr(Config, "LEXICAL_INDEX_PATH", str(tmp_path / "lexical.json"))
+
+    processor = PDFProcessor()
+    processor._embeddings = HashingEmbeddings()
+    processor._open_vectorstore()
+    return processor
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = tmp_path / "biology.pdf"
+    path.write_bytes(b"%PDF-1.4")
+    return path
+
+
+def documents(pdf_path, texts):
+    return [Document(page_content=text, metadata={"source": pdf_path.name, "page": page})
+            for page, text in enumerate(texts, start=1)]
+
+
+def test_index_documents_stores_chunks(processor, pdf_path):
+    stored = IngestPipeline(processor).index_documents(pdf_path, "digest", documents(pdf_path, PAGES))
+
+    assert stored == processor.vectorstore.count() == len(processor.lexical_index) == 2
+    assert processor.manifest.total_chunks() == 2
+
+
+def test_index_documents_replaces_previous_chunks(processor, pdf_path):
+    pipeline = IngestPipeline(processor)
+    pipeline.index_documents(pdf_path, "old", documents(pdf_path, PAGES))
+    stored = pipeline.index_documents(pdf_path, "new", documents(pdf_path, PAGES[:1]))
+
+    assert stored == processor.vectorstore.count() == len(processor.lexical_index) == 1
@@ -0,0 +1,45 @@
+"""
+Ollama client: cold model loads stay out of the hedge calibration samples
+"""
+import json
+
+import pytest
+
+from src.ollama_client import OllamaClient
+
+
+class FakeResponse:
+    """Streamed generation that loaded the model for `load_seconds`"""
+
+    def __init__(self, load_seconds: float):
+        self.lines = [
+            json.dumps({"response": "Hi", "done": False}).encode(),
+            json.dumps({"response": "", "done": True, "load_duration": int(load_seconds * 1e9)}).encode(),
+        ]
+
+    def iter_lines(self):
+        return iter(self.lines)
+
+    def json(self):
+        return json.loads(self.lines[-1])
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize("load_seconds, samples", [(0.0, 1), (30.0, 0)])
+def test_stream_samples_first_token_only_when_warm(monkeypatch, load_seconds, samples):
+    client = OllamaClient("http://localhost:11434")
+    monkeypatch.setattr(client, "_post", lambda endpoint, payload, stream: FakeResponse(load_seconds))
+
+    assert "".join(client.stream("prompt")) == "Hi"
+    assert len(client._recent_first_token) == samples
+
+
+@pytest.mark.parametrize("load_seconds, samples", [(0.0, 1), (30.0, 0)])
+def test_invoke_samples_total_only_when_warm(monkeypatch, load_seconds, samples):
+    client = OllamaClient("http://localhost:11434")
+    monkeypatch.setattr(client, "_post", lambda endpoint, payload, stream: FakeResponse(load_seconds))
+
+    client.invoke("prompt")
+    assert len(client._recent_totals) == samples
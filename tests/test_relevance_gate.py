@@ -0,0 +1,61 @@
+"""
+Relevance gating: off-topic questions are answered "Not Found" without the LLM
+"""
+import hashlib
+
+import numpy as np
+import pytest
+
+from src.ai_tutor import AITutor
+from src.config import Config
+from src.lexical_index import BM25Index
+
+CHUNKS = [
+    "Slow cooking keeps meat tender because collagen melts at low heat.",
+    "Cooking rice needs about two cups of water for every cup of rice.",
+]
+
+
+class HashingEmbeddings:
+    """Bag-of-words vectors; enough to run the question path offline"""
+
+    def embed_query(self, text):
+        vector = np.zeros(64)
+        for word in text.lower().split():
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % 64] += 1
+        return (vector / (np.linalg.norm(vector) or 1.0)).tolist()
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+@pytest.fixture
+def tutor(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "MANIFEST_PATH", str(tmp_path / "manifest.json"))
+    monkeypatch.setattr(Config, "LEXICAL_INDEX_PATH", str(tmp_path / "lexical.json"))
+    monkeypatch.setattr(Config, "RETRIEVAL_MODE", "lexical")
+    monkeypatch.setattr(Config, "ANSWER_CACHE_ENABLED", False)
+
+    tutor = AITutor()
+    processor = tutor.pdf_processor
+    processor._embeddings = HashingEmbeddings()
+    processor.vectorstore = object()  # Loaded; lexical mode never searches it
+    processor._lexical_index = BM25Index()
+    for index, text in enumerate(CHUNKS):
+        processor.lexical_index.add(f"cooking.pdf:{index}", text, {"source": "cooking.pdf", "page": 1})
+    return tutor
+
+
+def test_off_topic_two_word_question_is_not_found(tutor):
+    # "cooking" is in the corpus, "quantum" is not: one shared word is not a match
+    plan = tutor.plan_question("quantum cooking")
+
+    assert plan.response == "Not Found"
+    assert plan.prompt is None
+
+
+def test_on_topic_two_word_question_reaches_the_llm(tutor):
+    plan = tutor.plan_question("cooking rice")
+
+    assert plan.response is None
+    assert plan.prompt is not None
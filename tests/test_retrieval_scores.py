@@ -0,0 +1,29 @@
+"""
+Dense and lexical scores stay separate through hybrid fusion
+"""
+from langchain_core.documents import Document
+
+from src.ai_tutor import QuestionPlan
+from src.lexical_index import reciprocal_rank_fusion
+
+
+def _hit(chunk_id: str, **scores) -> Document:
+    return Document(page_content=chunk_id, metadata=dict(scores, chunk_id=chunk_id))
+
+
+def test_fusion_keeps_each_retrievers_score():
+    dense = [(_hit("a", dense_score=0.42), 0.42), (_hit("b", dense_score=0.31), 0.31)]
+    lexical = [(_hit("c", lexical_score=1.0), 1.0), (_hit("a", lexical_score=0.5), 0.5)]
+
+    fused = {doc.metadata["chunk_id"]: doc.metadata for doc, _ in reciprocal_rank_fusion([dense, lexical], 3)}
+
+    assert fused["a"]["dense_score"] == 0.42 and fused["a"]["lexical_score"] == 0.5
+    assert "dense_score" not in fused["c"]
+
+
+def test_keyword_only_match_is_not_a_strong_semantic_hit():
+    lexical = [(_hit("c", lexical_score=1.0), 1.0)]
+    plan = QuestionPlan("what is entropy")
+    plan.docs = reciprocal_rank_fusion([[], lexical], 3)
+
+    assert plan.dense_relevance() == 0.0
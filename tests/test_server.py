@@ -0,0 +1,65 @@
+"""
+Server concurrency: loads must not run while questions are being planned
+"""
+import asyncio
+import threading
+import time
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.ai_tutor import QuestionPlan
+from src.server import TutorServer
+
+
+class RecordingTutor:
+    """Stands in for AITutor; records whether a load ever overlapped a plan"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.planning = 0
+        self.loading = 0
+        self.overlaps = 0
+
+    def _enter(self, attribute: str, other: str):
+        with self.lock:
+            if getattr(self, other):
+                self.overlaps += 1
+            setattr(self, attribute, getattr(self, attribute) + 1)
+
+    def _leave(self, attribute: str):
+        with self.lock:
+            setattr(self, attribute, getattr(self, attribute) - 1)
+
+    def plan_question(self, question: str) -> QuestionPlan:
+        self._enter("planning", "loading")
+        try:
+            time.sleep(0.02)
+        finally:
+            self._leave("planning")
+        plan = QuestionPlan(question)
+        plan.response = "Not Found"
+        return plan
+
+    def load_all_pdfs(self):
+        self._enter("loading", "planning")
+        try:
+            time.sleep(0.05)
+        finally:
+            self._leave("loading")
+        return True, 1
+
+
+def test_load_waits_for_plans_and_plans_wait_for_load():
+    tutor = RecordingTutor()
+
+    async def run():
+        server = TutorServer(tutor, workers=2, queue_size=16)
+        async with TestClient(TestServer(server.create_app())) as client:
+            asks = [client.post("/ask", json={"question": f"question {index}"}) for index in range(6)]
+            loads = [client.post("/load", json={}) for _ in range(2)]
+            responses = await asyncio.gather(*asks[:3], *loads, *asks[3:])
+            return [response.status for response in responses]
+
+    statuses = asyncio.run(run())
+    assert statuses == [200] * 8
+    assert tutor.overlaps == 0
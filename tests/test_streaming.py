@@ -0,0 +1,42 @@
+"""
+Streaming: stream_answer returns exactly what generate would
+"""
+import pytest
+from langchain_core.documents import Document
+
+from src.ai_tutor import AITutor, QuestionPlan
+
+
+class ScriptedLLM:
+    """Answers every prompt with the same text, streamed a few characters at a time"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.last_stats = {}
+
+    def invoke(self, prompt, model=None, **options):
+        return self.text
+
+    def stream(self, prompt, model=None, **options):
+        for start in range(0, len(self.text), 3):
+            yield self.text[start:start + 3]
+
+
+def _plan(question: str) -> QuestionPlan:
+    plan = QuestionPlan(question)
+    plan.prompt = "prompt"
+    plan.docs = [(Document(page_content="text", metadata={"source": "bio.pdf", "page": 3}), 0.9)]
+    return plan
+
+
+@pytest.mark.parametrize("text", ["No", "Not Found", "unknown", "Photosynthesis turns light into sugar."])
+def test_stream_matches_generate(monkeypatch, text):
+    tutor = AITutor()
+    tutor._llm = ScriptedLLM(text)
+    monkeypatch.setattr(tutor, "plan_question", _plan)
+
+    streamed = "".join(tutor.stream_answer("q"))
+    generated = tutor.generate(_plan("q"))
+
+    assert streamed == generated
+    assert ("Source: bio.pdf, Page 3" in streamed) == (generated != "Not Found")
@@ -0,0 +1,63 @@
+"""
+Vector backend parity: the flat index returns the chunks Chroma returns
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("chromadb")
+pytest.importorskip("langchain_community")
+
+from src.config import Config
+from src.flat_index import FlatVectorStore
+from src.vector_store import ChromaStore
+
+CHUNKS = 1000
+DIM = 64
+QUERIES = 50
+K = 5
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    """Unit vectors around topic centroids (like chunk embeddings), and queries near them"""
+    rng = np.random.default_rng(7)
+    centroids = rng.normal(size=(CHUNKS // 50, DIM))
+    vectors = centroids[rng.integers(len(centroids), size=CHUNKS)] + 0.6 * rng.normal(size=(CHUNKS, DIM))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [f"parity:{i}" for i in range(CHUNKS)]
+    texts = [f"Synthetic chunk {i}" for i in range(CHUNKS)]
+    metadatas = [{"source": f"doc{i % 7}.pdf", "page": i // 7 + 1, "chunk_id": ids[i]} for i in range(CHUNKS)]
+
+    queries = vectors[rng.integers(CHUNKS, size=QUERIES)] + 0.5 * rng.normal(size=(QUERIES, DIM)) / np.sqrt(DIM)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return ids, vectors.astype(np.float32), texts, metadatas, queries
+
+
+def build(store, ids, vectors, texts, metadatas, batch=500):
+    for offset in range(0, len(ids), batch):
+        end = offset + batch
+        store.upsert(ids[offset:end], vectors[offset:end].tolist(), texts[offset:end], metadatas[offset:end])
+    store.persist()
+    return store
+
+
+# HNSW in Chroma is approximate, so allow a small recall gap; scores of chunks
+# both return must match up to float16 rounding
+@pytest.mark.parametrize("dtype, tolerance", [("float32", 1e-4), ("float16", 1e-2)])
+def test_flat_index_matches_chroma(tmp_path, monkeypatch, corpus, dtype, tolerance):
+    ids, vectors, texts, metadatas, queries = corpus
+    monkeypatch.setattr(Config, "VECTOR_STORE_PATH", str(tmp_path / "chroma"))
+    chroma = build(ChromaStore(None), ids, vectors, texts, metadatas)
+    flat = build(FlatVectorStore(str(tmp_path / "flat"), dtype), ids, vectors, texts, metadatas)
+
+    overlaps, score_diffs = [], []
+    for query in queries.tolist():
+        chroma_scores = {doc.metadata["chunk_id"]: score for doc, score in chroma.search(query, K)}
+        flat_scores = {doc.metadata["chunk_id"]: score for doc, score in flat.search(query, K)}
+        common = set(chroma_scores) & set(flat_scores)
+        overlaps.append(len(common) / K)
+        score_diffs.extend(abs(chroma_scores[chunk_id] - flat_scores[chunk_id]) for chunk_id in common)
+
+    assert np.mean(overlaps) >= 0.95
+    assert max(score_diffs) <= tolerance
+